@@ -0,0 +1,156 @@
+# benchmarks/bench_core.py
+
+"""
+Benchmarks of plan, lock and generator hot paths on synthetic stacks.
+
+    python -m benchmarks.bench_core                          # 10/100/1000 packages
+    python -m benchmarks.bench_core --sizes 100 -o new.json
+    python -m benchmarks.bench_core --compare old.json       # print the change against old results
+
+Each case runs 'repeat' times, min/median/mean seconds are stored. Results are JSON:
+
+    {"suite": "core", "edpm_version": ..., "python": ..., "platform": ..., "timestamp": ...,
+     "results": [{"name": "lock_load", "packages": 100, "repeat": 5, "min": ..., "median": ..., "mean": ...}]}
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from edpm.engine.api import EdpmApi
+from edpm.engine.generators.cmake_generator import CmakeGenerator
+from edpm.engine.generators.environment_generator import EnvironmentGenerator
+from edpm.engine.lockfile import LockfileConfig
+from edpm.engine.planfile import PlanFile
+from edpm.version import version
+
+from benchmarks.synthetic import make_stack, package_names
+
+DEFAULT_SIZES = [10, 100, 1000]
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_case(func: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {"min": min(times), "median": statistics.median(times), "mean": statistics.mean(times)}
+
+
+def _cli_runner(stack: Dict[str, str], args: List[str]) -> Callable[[], None]:
+    """Runs edpm in a fresh interpreter, so imports and plan/lock loading are included"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_ROOT, env.get("PYTHONPATH")]))
+    cmd = [sys.executable, "-m", "edpm", "--plan", stack["plan"], "--lock", stack["lock"], *args]
+
+    def run():
+        subprocess.run(cmd, env=env, check=True, stdout=subprocess.DEVNULL)
+    return run
+
+
+def cases(stack: Dict[str, str], count: int, cold_start: bool) -> Dict[str, Callable[[], Any]]:
+    """{case name: function} for one stack"""
+    plan = PlanFile.load(stack["plan"])
+    lock = LockfileConfig()
+    lock.load(stack["lock"])
+    api = EdpmApi(stack["plan"], stack["lock"])
+    api.load_all()
+    env_gen = EnvironmentGenerator(plan, lock, api.recipe_manager)
+    cmake_gen = CmakeGenerator(plan, lock, api.recipe_manager)
+    names = package_names(count)
+    saved_lock = stack["lock"] + ".bench"
+
+    result = {
+        "plan_load": lambda: PlanFile.load(stack["plan"]),
+        "plan_packages": plan.packages,
+        "plan_find_package_all": lambda: [plan.find_package(name) for name in names],
+        "lock_load": lambda: LockfileConfig().load(stack["lock"]),
+        "lock_save": lambda: lock.save(saved_lock),
+        "env_bash": lambda: env_gen.build_env_text("bash"),
+        "env_csh": lambda: env_gen.build_env_text("csh"),
+        "cmake_toolchain": cmake_gen.build_toolchain_text,
+        "cmake_presets": cmake_gen.build_presets_json,
+    }
+    if cold_start:
+        result["cli_cold_help"] = _cli_runner(stack, ["--help"])
+        result["cli_cold_info"] = _cli_runner(stack, [])
+        result["cli_cold_env_bash"] = _cli_runner(stack, ["env", "bash"])
+    return result
+
+
+def run_suite(sizes: List[int], repeat: int = 3, cold_start: bool = True,
+              only: Optional[List[str]] = None, work_dir: str = "") -> Dict[str, Any]:
+    results = []
+    with tempfile.TemporaryDirectory(dir=work_dir or None) as tmp:
+        for count in sizes:
+            stack = make_stack(os.path.join(tmp, f"stack-{count}"), count)
+            for name, func in cases(stack, count, cold_start).items():
+                if only and name not in only:
+                    continue
+                timing = time_case(func, repeat)
+                results.append({"name": name, "packages": count, "repeat": repeat, **timing})
+                print(f"{name:<24} {count:>6} pkgs   min {timing['min'] * 1000:10.2f} ms"
+                      f"   median {timing['median'] * 1000:10.2f} ms", flush=True)
+    return {
+        "suite": "core",
+        "edpm_version": version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "results": results,
+    }
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Median change per case present in both results. ratio > 1 is slower"""
+    old_by_key = {(r["name"], r["packages"]): r for r in old["results"]}
+    changes = []
+    for r in new["results"]:
+        prev = old_by_key.get((r["name"], r["packages"]))
+        if prev and prev["median"] > 0:
+            changes.append({"name": r["name"], "packages": r["packages"],
+                            "old": prev["median"], "new": r["median"], "ratio": r["median"] / prev["median"]})
+    return changes
+
+
+def print_comparison(changes: List[Dict[str, Any]], threshold: float = 1.1):
+    print(f"\n{'case':<24} {'pkgs':>6} {'old ms':>10} {'new ms':>10}  change")
+    for c in changes:
+        flag = "  SLOWER" if c["ratio"] > threshold else ""
+        print(f"{c['name']:<24} {c['packages']:>6} {c['old'] * 1000:10.2f} {c['new'] * 1000:10.2f}"
+              f"  {(c['ratio'] - 1) * 100:+6.1f}%{flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="edpm plan/lock/generator benchmarks on synthetic stacks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Packages per stack")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case")
+    parser.add_argument("--only", nargs="+", help="Run only these cases")
+    parser.add_argument("--no-cold-start", action="store_true", help="Skip CLI cold start cases")
+    parser.add_argument("-o", "--output", default="bench-core.json", help="Where to write JSON results")
+    parser.add_argument("--compare", help="Previous JSON results to compare with")
+    parser.add_argument("--work-dir", default="", help="Where synthetic stacks are created. Default: system tmp")
+    args = parser.parse_args(argv)
+
+    data = run_suite(args.sizes, args.repeat, not args.no_cold_start, args.only, args.work_dir)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    print(f"Results: {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print_comparison(compare(json.load(f), data))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# benchmarks/bench_install.py
+
+"""
+Overhead of the install orchestrator per package, with 'fetch: simulate' and
+'make: simulate' packages (see edpm/engine/simulate.py), so nothing is compiled.
+
+    python -m benchmarks.bench_install                             # 10/50/200 packages
+    python -m benchmarks.bench_install --sizes 100 --build-seconds 0.2 --mode cpu
+    python -m benchmarks.bench_install --compare old.json
+
+Every package is installed with EdpmApi._install_single_dependency in plan order.
+Overhead is the wall time of the call minus the configured simulated time: env file
+generation, recipe setup, install tree indexing, manifest, lock file saves, view sync.
+Per package overheads are stored too, so growth with the lock size is visible.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+from edpm.engine.api import EdpmApi
+from edpm.engine.lockfile import LockfileConfig
+from edpm.version import version
+
+from benchmarks.bench_core import compare, print_comparison
+from benchmarks.synthetic import LOCK_FILE, PLAN_FILE, make_plan, package_names
+
+DEFAULT_SIZES = [10, 50, 200]
+
+
+def make_simulated_stack(root: str, count: int, params: Dict[str, Any]) -> EdpmApi:
+    """Plan with count simulated packages and an empty lock. Returns loaded EdpmApi"""
+    top_dir = os.path.join(root, "top")
+    os.makedirs(top_dir, exist_ok=True)
+    plan_path = os.path.join(root, PLAN_FILE)
+    make_plan(count, make="simulate", fetch="simulate", extra=params).save(plan_path)
+
+    lock = LockfileConfig()
+    lock.file_path = os.path.join(root, LOCK_FILE)
+    lock.top_dir = top_dir
+    lock.save()
+
+    api = EdpmApi(plan_path, lock.file_path)
+    api.load_all()
+    return api
+
+
+def simulated_seconds(params: Dict[str, Any]) -> float:
+    return sum(float(params.get(f"simulate_{step}_seconds", 0)) for step in ("fetch", "build", "install"))
+
+
+def run_installs(api: EdpmApi, names: List[str], params: Dict[str, Any]) -> List[float]:
+    """Installs packages one by one. Returns overhead seconds per package"""
+    simulated = simulated_seconds(params)
+    overheads = []
+    for name in names:
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            api._install_single_dependency(name, force=False)
+            elapsed = time.perf_counter() - start
+        if not api.lock.is_installed(name):
+            raise RuntimeError(f"Simulated package {name} was not installed")
+        overheads.append(elapsed - simulated)
+    return overheads
+
+
+def run_suite(sizes: List[int], params: Dict[str, Any], work_dir: str = "") -> Dict[str, Any]:
+    results = []
+    with tempfile.TemporaryDirectory(dir=work_dir or None) as tmp:
+        for count in sizes:
+            api = make_simulated_stack(os.path.join(tmp, f"stack-{count}"), count, params)
+            start = time.perf_counter()
+            overheads = run_installs(api, package_names(count), params)
+            total = time.perf_counter() - start
+            results.append({
+                "name": "install_overhead",
+                "packages": count,
+                "repeat": count,
+                "min": min(overheads),
+                "median": statistics.median(overheads),
+                "mean": statistics.mean(overheads),
+                "max": max(overheads),
+                "total": total,
+                "simulated_total": simulated_seconds(params) * count,
+                "per_package": overheads,
+            })
+            print(f"{count:>6} pkgs   total {total:8.2f} s   overhead per package: "
+                  f"median {statistics.median(overheads) * 1000:8.2f} ms, "
+                  f"first {overheads[0] * 1000:8.2f} ms, last {overheads[-1] * 1000:8.2f} ms", flush=True)
+    return {
+        "suite": "install",
+        "edpm_version": version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "params": params,
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="edpm install orchestrator overhead with simulated packages")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Packages per stack")
+    parser.add_argument("--mode", choices=["sleep", "cpu"], default="sleep", help="How simulated steps spend time")
+    parser.add_argument("--fetch-seconds", type=float, default=0, help="Simulated fetch time per package")
+    parser.add_argument("--build-seconds", type=float, default=0, help="Simulated build time per package")
+    parser.add_argument("--fetch-files", type=int, default=10, help="Source files per package")
+    parser.add_argument("--build-files", type=int, default=10, help="Build dir files per package")
+    parser.add_argument("--install-files", type=int, default=20, help="Installed files per package")
+    parser.add_argument("--no-manifest", action="store_true", help="Don't hash installed files")
+    parser.add_argument("-o", "--output", default="bench-install.json", help="Where to write JSON results")
+    parser.add_argument("--compare", help="Previous JSON results to compare with")
+    parser.add_argument("--work-dir", default="", help="Where synthetic stacks are created. Default: system tmp")
+    args = parser.parse_args(argv)
+
+    params = {
+        "simulate_mode": args.mode,
+        "simulate_fetch_seconds": args.fetch_seconds,
+        "simulate_build_seconds": args.build_seconds,
+        "simulate_fetch_files": args.fetch_files,
+        "simulate_build_files": args.build_files,
+        "simulate_install_files": args.install_files,
+        "manifest": not args.no_manifest,
+    }
+    data = run_suite(args.sizes, params, args.work_dir)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    print(f"Results: {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print_comparison(compare(json.load(f), data))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# benchmarks/synthetic.py
+
+"""
+Synthetic stacks for benchmarks: a plan, a lock file and fake install trees with
+N packages, laid out as 'edpm install' would leave them.
+
+Every package has bin/, lib/ with a couple of shared libraries, include/ and an
+exported lib/cmake/<Name>/<Name>Config.cmake, plus an environment block in the plan.
+Packages depend on the previous few, so depends_on chains look like a real stack.
+"""
+
+import os
+from typing import Any, Dict, List
+
+from edpm.engine.install_index import INDEX_KEY, index_install_tree
+from edpm.engine.lockfile import LockfileConfig
+from edpm.engine.planfile import PlanFile
+from edpm.engine.simulate import write_install_tree
+
+PLAN_FILE = "plan.edpm.yaml"
+LOCK_FILE = "plan-lock.edpm.yaml"
+
+
+def package_name(i: int) -> str:
+    return f"pkg{i:04d}"
+
+
+def make_install_tree(install_path: str, name: str, libs: int = 2):
+    write_install_tree(install_path, name, files=libs + 1)
+
+
+def plan_entry(i: int, make: str = "cmake", fetch: str = "git", extra: Dict[str, Any] = None) -> Dict[str, Any]:
+    name = package_name(i)
+    config = {
+        "fetch": fetch,
+        "make": make,
+        "url": f"https://example.com/{name}.git",
+        "branch": "v1.0",
+        "cmake_flags": f"-DWITH_{name.upper()}=ON",
+        "depends_on": [package_name(j) for j in range(max(0, i - 3), i)],
+        "environment": [
+            {"prepend": {"PATH": "$install_path/bin"}},
+            {"prepend": {"LD_LIBRARY_PATH": "$install_path/lib"}},
+            {"set": {f"{name.upper()}_HOME": "$install_path"}},
+        ],
+    }
+    config.update(extra or {})
+    return {name: config}
+
+
+def make_plan(count: int, make: str = "cmake", fetch: str = "git", extra: Dict[str, Any] = None) -> PlanFile:
+    return PlanFile({
+        "global": {
+            "config": {"cxx_standard": 17, "build_threads": 4},
+            "environment": [{"set": {"SYNTHETIC_STACK": "1"}}],
+        },
+        "packages": [plan_entry(i, make, fetch, extra) for i in range(count)],
+    })
+
+
+def make_stack(root: str, count: int, installed: bool = True, indexed: bool = True) -> Dict[str, str]:
+    """
+    Writes plan, lock and (with installed=True) install trees of count packages into root.
+    Returns {'plan': ..., 'lock': ..., 'top_dir': ...}
+    """
+    top_dir = os.path.join(root, "top")
+    os.makedirs(top_dir, exist_ok=True)
+    plan = make_plan(count)
+    plan_path = os.path.join(root, PLAN_FILE)
+    plan.save(plan_path)
+
+    lock = LockfileConfig()
+    lock.file_path = os.path.join(root, LOCK_FILE)
+    lock.top_dir = top_dir
+    if installed:
+        for package in plan.packages():
+            app_path = os.path.join(top_dir, package.name)
+            install_path = os.path.join(app_path, "install")
+            make_install_tree(install_path, package.name)
+            entry = {
+                "install_path": install_path,
+                "owned": True,
+                "built_with_config": {
+                    **package.config,
+                    "app_path": app_path,
+                    "source_path": os.path.join(app_path, "src"),
+                    "build_path": os.path.join(app_path, "build"),
+                    "install_path": install_path,
+                },
+            }
+            if indexed:
+                entry[INDEX_KEY] = index_install_tree(install_path)
+            lock.update_package(package.name, entry)
+    lock.save()
+    return {"plan": plan_path, "lock": lock.file_path, "top_dir": top_dir}
+
+
+def package_names(count: int) -> List[str]:
+    return [package_name(i) for i in range(count)]
@@ -5,9 +5,13 @@ Image chain (each layer depends on the previous one):
 
     ubuntu-root  ->  eic-base  ->  eic-full
 
+Images are scheduled by their ``depends_on`` parent: an image starts as soon
+as its parent is built, so independent images build concurrently. Output of
+each build goes to its own log file (--log-dir).
+
 Usage examples:
 
-    # Build all three images sequentially (default)
+    # Build all images (default)
     python3 build_images.py
 
     # Build only ubuntu-root and eic-base
@@ -21,6 +25,9 @@ Usage examples:
 
     # Multi-platform build + push  (requires buildx builder with multi-arch)
     python3 build_images.py --platform linux/amd64,linux/arm64 --push
+
+    # Show the schedule without Docker
+    python3 build_images.py --dry-run
 """
 
 from __future__ import annotations
@@ -32,10 +39,12 @@ import os
 import shlex
 import subprocess
 import sys
+import threading
 import time
 from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import List, Optional, Sequence
 
@@ -50,7 +59,8 @@ log = logging.getLogger("build_images")
 SCRIPT_DIR = Path(__file__).resolve().parent
 
 # Ordered dict: name -> (org, subdir, depends_on)
-# The order defines the default build sequence.
+# The order defines the default build sequence and the start order of images
+# that are ready at the same time.
 IMAGE_CHAIN: OrderedDict[str, dict] = OrderedDict([
     ("ubuntu-root", {
         "org": "eicdev",
@@ -113,8 +123,15 @@ class BuildResult:
 # ---------------------------------------------------------------------------
 #  Helpers
 # ---------------------------------------------------------------------------
-def _run(cmd: str | list[str], *, dry_run: bool = False) -> BuildResult:
-    """Run *cmd*, stream output live, return a BuildResult."""
+_console_lock = threading.Lock()
+
+
+def _run(cmd: str | list[str], *, dry_run: bool = False,
+         log_path: Optional[Path] = None, prefix: str = "") -> BuildResult:
+    """Run *cmd*, stream output live (and to *log_path*), return a BuildResult.
+
+    With *prefix* every console line is prefixed, so concurrent builds can be told apart.
+    """
 
     if isinstance(cmd, str):
         cmd = shlex.split(cmd)
@@ -122,30 +139,46 @@ def _run(cmd: str | list[str], *, dry_run: bool = False) -> BuildResult:
     header = " ".join(cmd)
     log.info("=" * min(len(header) + 6, 120))
     log.info("RUN:  %s", header)
+    if log_path:
+        log.info("LOG:  %s", log_path)
     log.info("=" * min(len(header) + 6, 120))
 
-    if dry_run:
-        log.info("[dry-run] skipped")
-        now = datetime.now()
-        return BuildResult("dry-run", "", 0, now, now)
+    log_file = None
+    if log_path:
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        log_file = open(log_path, "w", encoding="utf-8")
+        log_file.write(f"RUN:  {header}\n")
 
     start = datetime.now()
-
-    proc = subprocess.Popen(
-        cmd,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-    )
-    assert proc.stdout is not None
-    for raw_line in iter(proc.stdout.readline, b""):
-        line = raw_line.decode("utf-8", errors="replace")
-        sys.stdout.write(line)
-        sys.stdout.flush()
-
-    proc.wait()
+    try:
+        if dry_run:
+            log.info("[dry-run] skipped")
+            if log_file:
+                log_file.write("[dry-run] skipped\n")
+            return BuildResult("dry-run", "", 0, start, datetime.now())
+
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+        assert proc.stdout is not None
+        for raw_line in iter(proc.stdout.readline, b""):
+            line = raw_line.decode("utf-8", errors="replace")
+            if log_file:
+                log_file.write(line)
+            with _console_lock:
+                sys.stdout.write(f"[{prefix}] {line}" if prefix else line)
+                sys.stdout.flush()
+
+        proc.wait()
+    finally:
+        if log_file:
+            log_file.close()
     end = datetime.now()
 
-    log.info("--- done (retcode %d, %s) ---\n", proc.returncode, str(end - start).split(".")[0])
+    log.info("--- %sdone (retcode %d, %s) ---\n",
+             f"{prefix} " if prefix else "", proc.returncode, str(end - start).split(".")[0])
     return BuildResult("", "", proc.returncode, start, end)
 
 
@@ -163,6 +196,8 @@ class DockerBuilder:
         platform: Optional[str] = None,
         progress: str = "auto",
         dry_run: bool = False,
+        max_parallel: int = 0,
+        log_dir: Optional[Path] = None,
     ):
         self.images = list(images)
         self.no_cache = no_cache
@@ -171,22 +206,64 @@ class DockerBuilder:
         self.platform = platform
         self.progress = progress
         self.dry_run = dry_run
+        self.max_parallel = max_parallel
+        self.log_dir = log_dir
         self.results: list[BuildResult] = []
+        self.started: Optional[datetime] = None
+        self.finished: Optional[datetime] = None
 
     # -- public API ---------------------------------------------------------
 
     def build_all(self) -> int:
-        """Build every image in order.  Returns 0 on success, first non-zero retcode on failure."""
-        for img in self.images:
-            rc = self._build_one(img)
-            if rc != 0:
-                log.error("Build of %s FAILED (retcode %d) — aborting chain.", img.full_name, rc)
-                return rc
-        return 0
+        """Build every image, each one as soon as its parent is built.
+
+        Only parents that are among the images to build are waited for (others are
+        assumed to exist). If an image fails, images depending on it are skipped.
+        Returns 0 on success, first non-zero retcode on failure.
+        """
+        selected = {img.name for img in self.images}
+        pending = list(self.images)
+        running = {}
+        built: set[str] = set()
+        not_built: set[str] = set()     # failed or skipped
+        first_rc = 0
+
+        self.started = datetime.now()
+        max_workers = self.max_parallel or max(1, len(self.images))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while pending or running:
+                for img in list(pending):
+                    parent = img.depends_on if img.depends_on in selected else None
+                    if parent in not_built:
+                        log.error("Skipping %s: %s was not built.", img.full_name, parent)
+                        now = datetime.now()
+                        self.results.append(BuildResult("skipped", img.full_name, -1, now, now))
+                        not_built.add(img.name)
+                        pending.remove(img)
+                    elif (parent is None or parent in built) and len(running) < max_workers:
+                        log.info("Starting %s", img.full_name)
+                        running[executor.submit(self._build_one, img)] = img
+                        pending.remove(img)
+
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    img = running.pop(future)
+                    result = future.result()
+                    self.results.append(result)
+                    if result.retcode == 0:
+                        built.add(img.name)
+                    else:
+                        log.error("Build of %s FAILED (retcode %d).", img.full_name, result.retcode)
+                        not_built.add(img.name)
+                        first_rc = first_rc or result.retcode
+        self.finished = datetime.now()
+        return first_rc
 
     # -- internals ----------------------------------------------------------
 
-    def _build_one(self, img: ImageSpec) -> int:
+    def _build_one(self, img: ImageSpec) -> BuildResult:
         # Assemble the buildx command
         cmd: list[str] = ["docker", "buildx", "build"]
 
@@ -220,29 +297,36 @@ class DockerBuilder:
         cmd.append(str(img.path))
 
         # Run
-        result = _run(cmd, dry_run=self.dry_run)
-        result.action = "build+push" if self.push else "build"
+        log_path = self.log_dir / f"{img.name}.log" if self.log_dir else None
+        result = _run(cmd, dry_run=self.dry_run, log_path=log_path, prefix=img.name)
+        if not self.dry_run:
+            result.action = "build+push" if self.push else "build"
         result.image = img.full_name
-        self.results.append(result)
-
-        return result.retcode
+        return result
 
     # -- summary ------------------------------------------------------------
 
     def print_summary(self):
         log.info("")
         log.info("SUMMARY")
-        log.info("-" * 100)
-        log.info("%-14s %-40s %-9s %-12s %-20s %-20s",
-                 "ACTION", "IMAGE", "RETCODE", "DURATION", "START", "END")
-        log.info("-" * 100)
-        for r in self.results:
-            log.info("%-14s %-40s %-9d %-12s %-20s %-20s",
+        log.info("-" * 112)
+        log.info("%-14s %-40s %-9s %-12s %-10s %-20s %-20s",
+                 "ACTION", "IMAGE", "RETCODE", "DURATION", "OFFSET", "START", "END")
+        log.info("-" * 112)
+        for r in sorted(self.results, key=lambda r: r.start):
+            offset = str(r.start - self.started).split(".")[0] if self.started else ""
+            log.info("%-14s %-40s %-9d %-12s %-10s %-20s %-20s",
                      r.action, r.image, r.retcode,
                      r.duration_str,
+                     offset,
                      r.start.strftime("%Y-%m-%d %H:%M:%S"),
                      r.end.strftime("%Y-%m-%d %H:%M:%S"))
-        log.info("-" * 100)
+        log.info("-" * 112)
+        if self.started and self.finished:
+            wall = self.finished - self.started
+            total = sum((r.duration for r in self.results), timedelta())
+            log.info("Wall time: %s   Sum of build times: %s",
+                     str(wall).split(".")[0], str(total).split(".")[0])
 
 
 # ---------------------------------------------------------------------------
@@ -279,7 +363,11 @@ def main(argv: Sequence[str] | None = None) -> int:
     parser.add_argument("-j", "--jobs", type=int, default=cpu_count,
                         help=f"BUILD_THREADS passed to cmake (default: {cpu_count})")
     parser.add_argument("--dry-run", action="store_true",
-                        help="Print commands without executing")
+                        help="Print commands and the build schedule without executing")
+    parser.add_argument("--max-parallel", type=int, default=0,
+                        help="Max images built at the same time (default: no limit, only dependencies)")
+    parser.add_argument("--log-dir", type=Path, default=Path("build-logs"),
+                        help="Directory for per-image build logs (default: ./build-logs)")
     parser.add_argument("--log-file", type=str, default=None,
                         help="Also write log output to this file")
 
@@ -324,7 +412,8 @@ def main(argv: Sequence[str] | None = None) -> int:
         )
         specs.append(spec)
 
-    log.info("Images to build: %s", " -> ".join(s.full_name for s in specs))
+    log.info("Images to build: %s", ", ".join(
+        f"{s.full_name} (after {s.depends_on})" if s.depends_on in names else s.full_name for s in specs))
     log.info("Build threads:   %d", args.jobs)
     log.info("Push:            %s", args.push)
     log.info("No-cache:        %s", args.no_cache)
@@ -341,6 +430,8 @@ def main(argv: Sequence[str] | None = None) -> int:
         platform=args.platform,
         progress=args.progress,
         dry_run=args.dry_run,
+        max_parallel=args.max_parallel,
+        log_dir=args.log_dir,
     )
 
     retcode = builder.build_all()
@@ -3,6 +3,7 @@ import click
 
 from edpm.engine.api import EdpmApi, print_packets_info
 from edpm.engine.output import markup_print as mprint
+from edpm.engine.profiling import InvocationProfile, DEFAULT_PROFILE_FILE
 from edpm.version import version
 
 # CLI Commands from your submodules
@@ -16,6 +17,13 @@ from edpm.cli.info import info_command
 from edpm.cli.config import config_command
 from edpm.cli.init import init_command
 from edpm.cli.add import add_command
+from edpm.cli.view import view_group
+from edpm.cli.verify import verify_command
+from edpm.cli.gc import gc_command
+from edpm.cli.switch import switch_command
+from edpm.cli.dockerfile import dockerfile_command
+from edpm.cli.export import export_command
+from edpm.cli.cache import cache_group
 
 def print_first_time_message():
     mprint(
@@ -52,12 +60,37 @@ Project repository: https://gitlab.com/DraTeots/edpm
     click.echo()
 
 
-@click.group(invoke_without_command=True)
+class EdpmGroup(click.Group):
+    """Allows an optional value for --profile: '--profile' or '--profile=out.pstats'"""
+
+    def parse_args(self, ctx, args):
+        for i, arg in enumerate(args):
+            if arg in self.commands:
+                break       # the rest belongs to the subcommand
+            if arg.startswith("--profile="):
+                args = args[:i] + ["--profile", "--profile-file", arg.split("=", 1)[1]] + args[i + 1:]
+                break
+        return super().parse_args(ctx, args)
+
+
+def _finish_profile(ctx, profile: InvocationProfile):
+    elapsed = profile.stop()
+    api = ctx.obj
+    phases = api.phases if isinstance(api, EdpmApi) else None
+    if phases is not None:
+        click.echo(profile.report(phases, elapsed), err=True)
+
+
+@click.group(cls=EdpmGroup, invoke_without_command=True)
 @click.option('--plan', default="", help="The plan file. Default is plan.edpm.yaml")
 @click.option('--lock', default="", help="The lock file. Default is plan-lock.edpm.yaml")
 @click.option('--top-dir', default="", help="Where EDPM should install missing packages.")
+@click.option('--profile', is_flag=True, default=False,
+              help=f"Profile this run. Prints phase times and top functions to stderr, "
+                   f"saves cProfile stats to {DEFAULT_PROFILE_FILE} (or --profile=FILE).")
+@click.option('--profile-file', default=DEFAULT_PROFILE_FILE, hidden=True)
 @click.pass_context
-def edpm_cli(ctx, plan, lock, top_dir):
+def edpm_cli(ctx, plan, lock, top_dir, profile, profile_file):
     """
     EDPM stands for EIC Development Packet Manager.
     If you run this command with no subcommand, it prints the version
@@ -65,6 +98,12 @@ def edpm_cli(ctx, plan, lock, top_dir):
     """
     assert isinstance(ctx, click.Context), "EdpmApi context not available."
 
+    # Profile everything from here, including the subcommand
+    if profile:
+        invocation_profile = InvocationProfile(profile_file)
+        invocation_profile.start()
+        ctx.call_on_close(lambda: _finish_profile(ctx, invocation_profile))
+
     # Get plan file path from environment variable or use default
     plan_file = os.environ.get("EDPM_PLAN_FILE", "plan.edpm.yaml")
 
@@ -138,3 +177,10 @@ edpm_cli.add_command(info_command)
 edpm_cli.add_command(config_command)
 edpm_cli.add_command(init_command)
 edpm_cli.add_command(add_command)
+edpm_cli.add_command(view_group)
+edpm_cli.add_command(verify_command)
+edpm_cli.add_command(gc_command)
+edpm_cli.add_command(switch_command)
+edpm_cli.add_command(dockerfile_command)
+edpm_cli.add_command(export_command)
+edpm_cli.add_command(cache_group)
@@ -6,7 +6,7 @@ from edpm.engine.output import markup_print as mprint
 
 @click.command("add", help="Add a new dependency entry to the plan file.")
 @click.option("--fetch", default="", help="Fetcher type or URL (git/tarball/filesystem or autodetect from URL).")
-@click.option("--make", default="", help="Maker type (cmake/autotools/manual/custom).")
+@click.option("--make", default="", help="Maker type (cmake/autotools/meson/pip/manual/custom).")
 @click.option("--branch", default="", help="Branch/tag (main, master, v1.2, etc.) if git fetcher.")
 @click.option("--location", default="", help="Location/path if manual or filesystem fetcher.")
 @click.option("--url", default="", help="Repo or tarball URL if fetch=git or fetch=tarball.")
@@ -0,0 +1,144 @@
+# edpm/cli/cache.py
+
+import os
+
+import click
+
+from edpm.engine import binary_cache
+from edpm.engine.api import EdpmApi
+from edpm.engine.gc import human_size
+from edpm.engine.manifest import default_threads
+from edpm.engine.output import markup_print as mprint
+
+
+@click.group("cache")
+@click.pass_context
+def cache_group(ctx):
+    """
+    Shares built packages through a binary cache (a directory or an HTTP server).
+
+    Set 'binary_cache: <url>' in the global config and installs take packages
+    with the same inputs from the cache instead of building them.
+    With 'binary_cache_push: true' (e.g. on CI) built packages are pushed there.
+
+    Subcommands:
+      edpm cache push [pkg...]      -> upload installed packages
+      edpm cache pull [pkg...]      -> download packages into the local cache
+      edpm cache key <pkg>          -> print the cache key and what it is computed from
+      edpm cache serve <dir>        -> serve <dir> as a cache over HTTP
+    """
+    api = ctx.obj
+    assert isinstance(api, EdpmApi)
+
+
+def _cache_urls(api: EdpmApi, url: str) -> list:
+    urls = [url] if url else api.plan.global_config().get("binary_cache") or []
+    urls = [urls] if isinstance(urls, str) else list(urls)
+    if not urls:
+        mprint("<red>Error:</red> No cache. Set 'binary_cache' in the global config or use --to/--from")
+        raise click.Abort()
+    return urls
+
+
+def _package_names(api: EdpmApi, names) -> list:
+    if names:
+        return list(names)
+    return [p.name for p in api.plan.packages() if "existing" not in p.config]
+
+
+@cache_group.command("push")
+@click.argument("names", nargs=-1)
+@click.option("--to", "url", default="", help="Cache URL or dir. Default: 'binary_cache' from the plan.")
+@click.option("--force", is_flag=True, default=False, help="Replace artifacts that are in the cache already.")
+@click.pass_context
+def cache_push(ctx, names, url, force):
+    """Uploads installed packages (all by default) to the binary cache"""
+    api: EdpmApi = ctx.obj
+    url = _cache_urls(api, url)[0]
+    failed = 0
+    for name in _package_names(api, names):
+        if not api.lock.is_installed(name):
+            mprint("<yellow>{}</yellow> is not installed, skipped", name)
+            continue
+        try:
+            pushed = api.push_to_binary_cache(name, url, force=force)
+        except (binary_cache.CacheError, OSError) as ex:
+            mprint("<red>Error:</red> {}", ex)
+            failed += 1
+            continue
+        mprint("<blue>{:<20}</blue> {}", name, "pushed" if pushed else "already in the cache")
+    if failed:
+        raise click.ClickException(f"{failed} packages were not pushed")
+
+
+@cache_group.command("pull")
+@click.argument("names", nargs=-1)
+@click.option("--from", "url", default="", help="Cache URL or dir. Default: 'binary_cache' from the plan.")
+@click.option("--threads", "-j", default=0, type=int, help="Parallel downloads. Default: CPU count + 4.")
+@click.pass_context
+def cache_pull(ctx, names, url, threads):
+    """
+    Downloads packages (all by default) into the local cache, {top_dir}/.edpm/binary-cache.
+    'edpm install' then takes them from there, e.g. on a machine without network access
+    """
+    api: EdpmApi = ctx.obj
+    if not api.top_dir:
+        mprint("<red>Error:</red> No top_dir set")
+        raise click.Abort()
+    local = binary_cache.DirectoryStore(binary_cache.local_cache_dir(api.top_dir))
+    remotes = [binary_cache.open_store(u) for u in _cache_urls(api, url)]
+
+    keys = {}
+    for name in _package_names(api, names):
+        key_info = api.binary_cache_key(name)
+        if key_info:
+            keys[name] = key_info["key"]
+        else:
+            mprint("<yellow>{}</yellow> can't be cached (local sources or prerequisites)", name)
+
+    results = binary_cache.fetch_artifacts(local, remotes, keys, threads=threads or default_threads())
+    for name in keys:
+        result = results[name]
+        if isinstance(result, Exception):
+            mprint("<red>Error:</red> {}", result)
+        elif result:
+            mprint("<blue>{:<20}</blue> {}", name, human_size(result.get("size", 0)))
+        else:
+            mprint("<blue>{:<20}</blue> not in the cache", name)
+
+
+@cache_group.command("key")
+@click.argument("name")
+@click.pass_context
+def cache_key(ctx, name):
+    """Prints the cache key of a package and its inputs"""
+    api: EdpmApi = ctx.obj
+    key_info = api.binary_cache_key(name)
+    if not key_info:
+        mprint("<yellow>{}</yellow> can't be cached (local sources or prerequisites)", name)
+        return
+    mprint("<b><blue>{}</blue></b> {}", name, key_info["key"])
+    for field, value in key_info["inputs"].items():
+        mprint("  <blue>{}</blue>: {}", field, value)
+
+
+@cache_group.command("serve")
+@click.argument("directory", metavar="<dir>")
+@click.option("--host", default="127.0.0.1", help="Address to listen on.")
+@click.option("--port", default=8080, type=int, help="Port to listen on.")
+def cache_serve(directory, host, port):
+    """
+    Serves <dir> as a binary cache over HTTP: GET to download, PUT to upload.
+
+    A stand-in for a real cache server (no authentication), e.g. in a local network:
+        edpm cache serve /data/edpm-cache --host 0.0.0.0
+    """
+    os.makedirs(directory, exist_ok=True)
+    server = binary_cache.make_server(directory, host, port)
+    mprint("<green>Serving</green> {} at http://{}:{}", os.path.abspath(directory), host, server.server_address[1])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -1,9 +1,9 @@
 import os
-import shutil
 
 import click
 from edpm.engine.api import EdpmApi
 from edpm.engine.output import markup_print as mprint
+from edpm.engine.trash import remove_dir, start_background_delete
 
 
 @click.command("clean", help="Remove installed data for a package from disk (if EDPM owns it).")
@@ -45,7 +45,12 @@ def clean_command(ctx, dep_name):
         for path in dirs_to_remove:
             if path and os.path.isdir(path):
                 mprint("Removing <magenta>{}</magenta>...", path)
-                shutil.rmtree(path, ignore_errors=True)
+                try:
+                    remove_dir(path, api.top_dir)
+                except Exception as e:
+                    mprint("<red>Error removing</red> {}: {}", path, str(e))
+        # Dirs are in the trash now, the actual deletion runs in the background
+        start_background_delete(api.top_dir)
     else:
         mprint("<yellow>Note:</yellow> '{}' is not owned by EDPM. Remove manually:\n  {}", dep_name, install_path)
 
@@ -0,0 +1,53 @@
+# edpm/cli/dockerfile.py
+
+import os
+
+import click
+
+from edpm.engine.api import EdpmApi
+from edpm.engine.dockerfile import generate_dockerfile, DEFAULT_BASE_IMAGE, DEFAULT_TOP_DIR, DEFAULT_WORKDIR
+from edpm.engine.output import markup_print as mprint
+
+
+@click.command("dockerfile")
+@click.option("--output", "-o", default="", help="Write to this file instead of stdout.")
+@click.option("--base", "base_image", default=DEFAULT_BASE_IMAGE, show_default=True,
+              help="Build stage base image. Missing python/compilers/cmake/git are installed with apt-get, "
+                   "other system requirements must be in the image.")
+@click.option("--runtime-base", "runtime_image", default="", help="Final stage base image. Default: same as --base.")
+@click.option("--top-dir", default=DEFAULT_TOP_DIR, show_default=True, help="Where packages are installed in the image.")
+@click.option("--workdir", default=DEFAULT_WORKDIR, show_default=True, help="Where plan and lock files live in the image.")
+@click.option("--edpm-pip", default="edpm", show_default=True, help="pip requirement to install edpm in the image.")
+@click.option("--no-ccache", is_flag=True, default=False, help="Don't use ccache with a cache mount.")
+@click.pass_context
+def dockerfile_command(ctx, output, base_image, runtime_image, top_dir, workdir, edpm_pip, no_ccache):
+    """
+    Generates a Dockerfile with one layer per plan package.
+
+    Each layer adds only its package entry to the plan in the image and installs it,
+    so a package config change rebuilds this package layer and the layers after it.
+    Sources, build dirs and ccache are BuildKit cache mounts. The final stage copies
+    only install trees and generated env/CMake files.
+
+    Usage:
+        edpm dockerfile -o Dockerfile
+        edpm dockerfile --base eicdev/ubuntu-root:latest -o Dockerfile
+    """
+    api = ctx.obj
+    assert isinstance(api, EdpmApi)
+
+    text = generate_dockerfile(api.plan,
+                               base_image=base_image,
+                               runtime_image=runtime_image,
+                               top_dir=top_dir,
+                               workdir=workdir,
+                               edpm_pip=edpm_pip,
+                               ccache=not no_ccache,
+                               plan_name=os.path.basename(api.plan_file))
+    if not output:
+        click.echo(text, nl=False)
+        return
+
+    with open(output, "w", encoding="utf-8") as f:
+        f.write(text)
+    mprint("<green>[Saved]</green> Dockerfile: {}", output)
@@ -0,0 +1,70 @@
+# edpm/cli/export.py
+
+import os
+import shutil
+
+import click
+
+from edpm.engine.api import EdpmApi
+from edpm.engine.export import export_packages
+from edpm.engine.gc import human_size
+from edpm.engine.generators.cmake_generator import CmakeGenerator
+from edpm.engine.generators.environment_generator import EnvironmentGenerator
+from edpm.engine.output import markup_print as mprint
+
+
+@click.command("export")
+@click.argument("target", metavar="<target-dir>")
+@click.option("--install-only", is_flag=True, default=False, help="Export only install trees, no src/build dirs.")
+@click.option("--hardlink", is_flag=True, default=False, help="Hardlink files instead of copying (same filesystem).")
+@click.option("--strip", is_flag=True, default=False, help="Strip ELF binaries and libraries (they are copied then).")
+@click.option("--threads", "-j", default=0, type=int, help="Packages exported in parallel. Default: CPU count + 4.")
+@click.pass_context
+def export_command(ctx, target, install_only, hardlink, strip, threads):
+    """
+    Exports installed packages into a new root with a rewritten lock file and env/CMake files.
+
+    Paths keep their layout relative to top_dir. The plan, the rewritten lock file,
+    env.sh/env.csh, EDPMToolchain.cmake and CMakePresets.json are written to <target-dir>.
+    Packages not owned by edpm are not copied, the new lock file still references them.
+
+    Usage:
+        edpm export --install-only /cvmfs/stage/eic            # minimal deployable tree
+        edpm export --install-only --hardlink --strip /opt/img   # fast and small, for images
+    """
+    api = ctx.obj
+    assert isinstance(api, EdpmApi)
+
+    target = os.path.abspath(target)
+    if api.top_dir and os.path.normpath(target) == os.path.normpath(api.top_dir):
+        mprint("<red>Error:</red> target is the current top_dir")
+        raise click.Abort()
+    os.makedirs(target, exist_ok=True)
+
+    lock, stats = export_packages(api.lock, target,
+                                  install_only=install_only,
+                                  hardlink=hardlink,
+                                  strip=strip,
+                                  threads=threads)
+    for name in sorted(stats):
+        s = stats[name]
+        mprint("<blue>{:<20}</blue> {:>8} files {:>10}{}{}", name, s.files, human_size(s.bytes),
+               f", {s.linked} hardlinked" if s.linked else "",
+               f", {s.stripped} stripped" if s.stripped else "")
+
+    # Plan and rewritten lock file
+    plan_path = os.path.join(target, os.path.basename(api.plan_file))
+    shutil.copy2(api.plan_file, plan_path)
+    lock.save(os.path.join(target, os.path.basename(api.lock_file)))
+    mprint("<green>[Saved]</green> lock file: {}", lock.file_path)
+
+    # Env and CMake files for the new root
+    env_gen = EnvironmentGenerator(api.plan, lock, api.recipe_manager)
+    for shell in ("bash", "csh"):
+        out_path = os.path.join(target, "env.sh" if shell == "bash" else "env.csh")
+        env_gen.save_environment_with_infile(shell, api.get_env_paths(shell)[0], out_path)
+        mprint("<green>[Saved]</green> {} environment: {}", shell, out_path)
+    cm_gen = CmakeGenerator(api.plan, lock, api.recipe_manager)
+    cm_gen.save_toolchain_with_infile(api.get_cmake_toolchain_paths()[0], os.path.join(target, "EDPMToolchain.cmake"))
+    cm_gen.save_presets_with_infile(api.get_cmake_presets_paths()[0], os.path.join(target, "CMakePresets.json"))
+    mprint("<green>[Saved]</green> CMake toolchain and presets in {}", target)
@@ -0,0 +1,73 @@
+# edpm/cli/gc.py
+
+import click
+
+from edpm.engine.api import EdpmApi
+from edpm.engine.gc import scan_sizes, human_size, package_dirs, plan_gc, DIR_KINDS
+from edpm.engine.output import markup_print as mprint
+from edpm.engine.trash import remove_dir, start_background_delete
+
+
+@click.command("gc")
+@click.option("--keep-builds", default=3, show_default=True, type=int,
+              help="Keep build dirs of N most recently built packages.")
+@click.option("--keep-sources", is_flag=True, default=False,
+              help="Keep sources even if they can be fetched again.")
+@click.option("--dry-run", is_flag=True, default=False, help="Only report sizes and what would be removed.")
+@click.option("--threads", "-j", default=0, type=int, help="Number of scanning threads. Default: CPU count + 4.")
+@click.pass_context
+def gc_command(ctx, keep_builds, keep_sources, dry_run, threads):
+    """
+    Reports disk usage of packages and reclaims source and build dirs.
+
+    Retention policies:
+      - build dirs are kept only for the --keep-builds most recently built packages
+      - sources are removed if they can be fetched again (git, tarball),
+        unless the build dir of the package is kept
+    Install dirs and packages not owned by edpm are never touched.
+    Removed dirs go to {top_dir}/.edpm/trash and are deleted in the background.
+
+    Usage:
+        edpm gc --dry-run            # show sizes and what would be removed
+        edpm gc --keep-builds 0      # remove all build dirs and restorable sources
+    """
+    api = ctx.obj
+    assert isinstance(api, EdpmApi)
+
+    packages = {name: api.lock.get_installed_package(name) for name in api.lock.get_installed_packages()}
+    all_dirs = {name: package_dirs(data) for name, data in packages.items()}
+    sizes = scan_sizes([path for dirs in all_dirs.values() for path in dirs.values()], threads=threads)
+
+    # Report
+    mprint("<b><magenta>{:<20}</magenta></b> {:>10} {:>10} {:>10}", "PACKAGE", *[k.upper() for k in DIR_KINDS])
+    totals = dict.fromkeys(DIR_KINDS, 0)
+    for name in sorted(all_dirs):
+        row = []
+        for kind in DIR_KINDS:
+            size = sizes.get(all_dirs[name][kind], 0)
+            totals[kind] += size
+            row.append(human_size(size))
+        mprint("<blue>{:<20}</blue> {:>10} {:>10} {:>10}", name, *row)
+    mprint("<b>{:<20}</b> {:>10} {:>10} {:>10}", "TOTAL", *[human_size(totals[k]) for k in DIR_KINDS])
+
+    # Policies
+    to_remove = plan_gc(packages, keep_builds=keep_builds, drop_sources=not keep_sources)
+    if not to_remove:
+        mprint("\n<green>Nothing to reclaim</green>")
+        return
+
+    reclaimed = sum(sizes.get(item["path"], 0) for item in to_remove)
+    title = "Would remove" if dry_run else "Removing"
+    mprint("\n<b>{} ({}):</b>", title, human_size(reclaimed))
+    for item in to_remove:
+        mprint("  <blue>{}</blue> {:<5} {} <yellow>({})</yellow>",
+               item["package"], item["kind"], item["path"], item["reason"])
+        if not dry_run:
+            try:
+                remove_dir(item["path"], api.top_dir)
+            except Exception as e:
+                mprint("<red>Error removing</red> {}: {}", item["path"], str(e))
+
+    if not dry_run:
+        start_background_delete(api.top_dir)
+        mprint("<green>Done.</green> Files are deleted in the background")
@@ -1,21 +1,48 @@
+import json
+
 import click
+from edpm.engine.cooperative import CooperativeInstaller, default_worker_id
+from edpm.engine.explain import explain_install
 from edpm.engine.output import markup_print as mprint
+from edpm.engine.tracing import start_trace, stop_trace
 
 
 @click.command("install")
 @click.option('--force', is_flag=True, default=False, help="Force rebuild/reinstall even if already installed.")
 @click.option('--top-dir', default="", help="Override or set top_dir in the lock file.")
-@click.option('--explain', 'just_explain', is_flag=True, default=False, help="Print what would be installed but don't actually install.")
+@click.option('--explain', 'just_explain', is_flag=True, default=False,
+              help="Print the install plan (actions, stages, schedule, time estimates) but don't install.")
+@click.option('--json', 'as_json', is_flag=True, default=False, help="With --explain: print the plan as JSON.")
 @click.option('--add', '-a', is_flag=True, default=False, help="Automatically add packages to the plan if not already present.")
+@click.option('--cooperative', is_flag=True, default=False,
+              help="Install together with other edpm processes sharing top_dir (e.g. on farm nodes).")
+@click.option('--worker-id', default="", help="Name of this worker in a cooperative install. Default: host-pid.")
+@click.option('--lease-timeout', default=60.0, type=float, show_default=True,
+              help="Seconds without heartbeat after which a claimed package is taken over.")
+@click.option('--reset-queue', is_flag=True, default=False,
+              help="Clear done/failed marks of a previous cooperative install (run once before starting workers).")
+@click.option('--trace', 'trace_file', default="", metavar="FILE",
+              help="Write a Chrome trace (Perfetto) of packages, stages and edpm phases. "
+                   "'{worker}' in FILE is replaced by the worker id.")
 @click.argument('names', nargs=-1)
 @click.pass_context
-def install_command(ctx, names, add, top_dir, just_explain, force):
+def install_command(ctx, names, add, top_dir, just_explain, as_json, force, cooperative, worker_id, lease_timeout, reset_queue,
+                    trace_file):
     """
     Installs packages (and their dependencies) from the plan, updating the lock file.
 
     Use Cases:
       1) 'edpm install' with no arguments installs EVERYTHING in the plan.
       2) 'edpm install <pkg>' adds <pkg> to the plan if not present, then installs it.
+      3) 'edpm install --cooperative' on several nodes with a shared top_dir: nodes claim
+         packages whose prerequisites are installed, build them and publish to the lock file.
+         Prerequisites are the 'depends_on' package list or all packages before it in the plan.
+      4) 'edpm install --explain' prints what would happen without running anything: per package
+         the action, merged config, what each stage would do (e.g. sources already fetched),
+         build waves and estimated times. Add --json for CI scripts.
+      5) 'edpm install --trace trace.json' records when each package and stage ran.
+         Open the file in https://ui.perfetto.dev. Cooperative workers: --trace 'trace-{worker}.json',
+         then 'python -m edpm.engine.tracing merge trace.json trace-*.json'
     """
 
     edpm_api = ctx.obj
@@ -75,7 +102,21 @@ def install_command(ctx, names, add, top_dir, just_explain, force):
                         _print_error_version_conflict(base_name, existing_version, user_version)
                         exit(1)
 
+    if trace_file and not just_explain:
+        worker_id = worker_id or (default_worker_id() if cooperative else "")
+        trace_file = trace_file.replace("{worker}", worker_id or "main")
+        start_trace(f"edpm install {worker_id}".strip(), unique_id=worker_id)
+        ctx.call_on_close(lambda: _save_trace(trace_file))
+
+    if just_explain and as_json:
+        click.echo(json.dumps(explain_install(edpm_api, dep_names, force), indent=2))
+        return
+
     # 4) Actually run the install logic
+    if cooperative and not just_explain:
+        _install_cooperative(edpm_api, dep_names, force, worker_id, lease_timeout, reset_queue)
+        return
+
     edpm_api.install_dependency_chain(
         dep_names=dep_names,
         explain=just_explain,
@@ -88,6 +129,37 @@ def install_command(ctx, names, add, top_dir, just_explain, force):
         edpm_api.save_generator_scripts()
 
 
+def _install_cooperative(edpm_api, dep_names, force, worker_id, lease_timeout, reset_queue):
+    installer = CooperativeInstaller(edpm_api, dep_names,
+                                     force=force,
+                                     worker_id=worker_id,
+                                     lease_timeout=lease_timeout,
+                                     heartbeat_interval=max(lease_timeout / 6, 0.1))
+    if reset_queue:
+        installer.reset()
+    result = installer.run()
+
+    mprint("\n<b>[{}]</b> built: {}", installer.worker_id, ", ".join(result["built"]) or "-")
+    for title, names in (("failed", result["failed"]), ("blocked by failures", result["blocked"])):
+        if names:
+            mprint("<red>{}:</red> {}", title, ", ".join(names))
+
+    # Every worker regenerates env files from the shared lock, one at a time
+    mprint("\nUpdating environment script files...\n")
+    with installer.lock_mutex():
+        edpm_api.save_generator_scripts()
+
+    if result["failed"] or result["blocked"]:
+        exit(1)
+
+
+def _save_trace(trace_file):
+    tracer = stop_trace()
+    if tracer:
+        tracer.save(trace_file)
+        mprint("<green>[Saved]</green> trace: {} (open in https://ui.perfetto.dev)", trace_file)
+
+
 def _print_error_not_in_plan(pkg_name):
     mprint(f"<red>Error:</red> '{pkg_name}' is not in plan!")
     mprint(f"Options:")
@@ -1,9 +1,10 @@
 import click
 import os
-import shutil
 
 from edpm.engine.api import EdpmApi
 from edpm.engine.output import markup_print as mprint
+from edpm.engine.trash import remove_dir, start_background_delete
+from edpm.engine.versions import VERSIONS_KEY
 
 
 _help_option_lock = "Removes only lock file record without touching installation"
@@ -67,35 +68,34 @@ def rm_command(ctx, package_name, mode):
     # Remove package from lock file
     api.lock.remove_package(package_name)
     api.lock.save()
+    api.update_view()
 
     # Update environment scripts
     mprint("Updating environment script files...\n")
     api.save_generator_scripts()
 
-    # Remove folders if needed
-    if remove_folders and os.path.exists(install_path):
-        mprint("Removing installation folder from disk...\n")
-        try:
-            shutil.rmtree(install_path)
-            mprint("<green>Successfully removed folder:</green> {}", install_path)
-        except Exception as e:
-            mprint("<red>Error removing folder:</red> {}", str(e))
-
-        # Remove source and build folders if they exist
-        source_path = package_data.get("source_path", "")
-        if source_path and os.path.exists(source_path):
+    # Remove folders if needed. They are moved to the trash (instant) and deleted in the background
+    if remove_folders:
+        # Side-by-side versions (see 'edpm switch') are removed too
+        entries = [package_data] + list(package_data.get(VERSIONS_KEY, {}).values())
+        folders = []
+        for entry in entries:
+            config = entry.get("built_with_config", {})
+            folders += [
+                ("installation", entry.get("install_path", "")),
+                ("source", config.get("source_path", "") or entry.get("source_path", "")),
+                ("build", config.get("build_path", "") or entry.get("build_path", "")),
+            ]
+        for title, path in dict.fromkeys(folders):
+            if not path or not os.path.exists(path):
+                continue
             try:
-                shutil.rmtree(source_path)
-                mprint("<green>Successfully removed source folder:</green> {}", source_path)
+                remove_dir(path, api.top_dir)
+                mprint("<green>Successfully removed {} folder:</green> {}", title, path)
             except Exception as e:
-                mprint("<red>Error removing source folder:</red> {}", str(e))
+                mprint("<red>Error removing {} folder:</red> {}", title, str(e))
 
-        build_path = package_data.get("build_path", "")
-        if build_path and os.path.exists(build_path):
-            try:
-                shutil.rmtree(build_path)
-                mprint("<green>Successfully removed build folder:</green> {}", build_path)
-            except Exception as e:
-                mprint("<red>Error removing build folder:</red> {}", str(e))
+    # Also picks up leftovers of interrupted deletions
+    start_background_delete(api.top_dir)
 
-    mprint("<green>Package '{}' has been removed.</green>", package_name)
\ No newline at end of file
+    mprint("<green>Package '{}' has been removed.</green>", package_name)
@@ -0,0 +1,59 @@
+# edpm/cli/switch.py
+
+import click
+
+from edpm.engine.api import EdpmApi
+from edpm.engine.output import markup_print as mprint
+from edpm.engine.versions import match_versions
+
+
+@click.command("switch")
+@click.argument("spec", metavar="<package>[@<version>]")
+@click.pass_context
+def switch_command(ctx, spec):
+    """
+    Switches a package between side-by-side installed versions without a rebuild.
+    Needs 'versioned_installs: true' in the global config when the versions are installed.
+
+    Repoints the lock file entry and regenerates env and CMake files.
+    Note: 'edpm install' switches back to the version that the plan asks for.
+
+    Usage:
+        edpm switch acts                 # list installed versions
+        edpm switch acts@v38             # switch by version
+        edpm switch acts@v38-1a2b3c4d    # switch by exact key (if v38 was built with several configs)
+    """
+    api = ctx.obj
+    assert isinstance(api, EdpmApi)
+
+    dep_name, _, ver_spec = spec.partition("@")
+    versions = api.lock.get_versions(dep_name)
+    if not versions:
+        mprint("<red>Error:</red> Package '{}' has no side-by-side versions installed.", dep_name)
+        raise click.Abort()
+
+    active = api.lock.get_active_version(dep_name)
+    if not ver_spec:
+        mprint("<b><magenta>{}</magenta></b> versions:", dep_name)
+        for key in sorted(versions):
+            marker = "<green>*</green>" if key == active else " "
+            mprint(" {} <blue>{}</blue> {}", marker, key, versions[key].get("install_path", ""))
+        return
+
+    matched = match_versions(list(versions), ver_spec)
+    if not matched:
+        mprint("<red>Error:</red> No version '{}' of '{}'. Installed: {}",
+               ver_spec, dep_name, ", ".join(sorted(versions)))
+        raise click.Abort()
+    if len(matched) > 1:
+        mprint("<red>Error:</red> '{}' matches several builds of '{}': {}. Use the full key.",
+               ver_spec, dep_name, ", ".join(sorted(matched)))
+        raise click.Abort()
+
+    key = matched[0]
+    if key == active:
+        mprint("<blue>{} is already at {}</blue>", dep_name, key)
+        return
+
+    api.switch_version(dep_name, key)
+    api.save_generator_scripts()
@@ -0,0 +1,90 @@
+# edpm/cli/verify.py
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import click
+
+from edpm.engine.api import EdpmApi
+from edpm.engine.manifest import load_manifest, verify_manifest, default_threads, MANIFEST_KEY
+from edpm.engine.output import markup_print as mprint
+
+# How many paths of each kind are printed per package without --verbose
+_MAX_LISTED = 10
+
+
+@click.command("verify")
+@click.argument("names", nargs=-1)
+@click.option("--full", is_flag=True, default=False, help="Compare content hashes, not only size and mtime.")
+@click.option("--threads", "-j", default=0, type=int, help="Number of checking threads. Default: CPU count + 4.")
+@click.option("--record", is_flag=True, default=False, help="(Re)record manifests instead of verifying.")
+@click.option("--verbose", "-v", is_flag=True, default=False, help="List all missing/modified/extra files.")
+@click.pass_context
+def verify_command(ctx, names, full, threads, record, verbose):
+    """
+    Checks installed packages against their recorded install manifests.
+
+    Reports missing, modified and extra files per package. Returns a nonzero
+    exit code if any package differs from its manifest.
+
+    Usage:
+        edpm verify                 # quick check (size + mtime) of all packages
+        edpm verify --full root     # compare content hashes of root files
+        edpm verify --record acts   # record a manifest for an installed package
+    """
+    api = ctx.obj
+    assert isinstance(api, EdpmApi)
+
+    dep_names = list(names) or sorted(api.lock.get_installed_packages())
+    for dep_name in dep_names:
+        if not api.lock.is_installed(dep_name):
+            mprint("<red>Error:</red> Package '{}' is not installed.", dep_name)
+            raise click.Abort()
+
+    if record:
+        for dep_name in dep_names:
+            api.record_manifest(dep_name)
+        api.lock.save()
+        return
+
+    # Packages are verified in parallel. Their file checks share one pool, so a package
+    # waiting for its files never takes a file checking thread
+    threads = threads or default_threads()
+    with ThreadPoolExecutor(max_workers=threads) as executor, \
+            ThreadPoolExecutor(max_workers=min(threads, max(len(dep_names), 1))) as package_executor:
+        futures = {}
+        for dep_name in dep_names:
+            manifest_path = api.lock.get_installed_package(dep_name).get(MANIFEST_KEY, "")
+            if manifest_path and os.path.isfile(manifest_path):
+                futures[dep_name] = package_executor.submit(verify_manifest,
+                                                            load_manifest(manifest_path),
+                                                            full=full,
+                                                            exclude=api.files_of_other_packages(dep_name),
+                                                            executor=executor)
+
+        # Results are reported in the package order
+        failed = False
+        for dep_name in dep_names:
+            if dep_name not in futures:
+                mprint("<yellow>{}</yellow>: no manifest (use 'edpm verify --record {}')", dep_name, dep_name)
+                continue
+
+            result = futures[dep_name].result()
+            if result.ok:
+                mprint("<green>{}</green>: OK", dep_name)
+                continue
+
+            failed = True
+            mprint("<red>{}</red>: {} missing, {} modified, {} extra",
+                   dep_name, len(result.missing), len(result.modified), len(result.extra))
+            for title, paths in (("missing", result.missing),
+                                 ("modified", result.modified),
+                                 ("extra", result.extra)):
+                listed = paths if verbose else paths[:_MAX_LISTED]
+                for path in listed:
+                    mprint("  {:<8} {}", title, path)
+                if len(paths) > len(listed):
+                    mprint("  ... {} more {} (use --verbose)", len(paths) - len(listed), title)
+
+    if failed:
+        ctx.exit(1)
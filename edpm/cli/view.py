@@ -0,0 +1,96 @@
+# edpm/cli/view.py
+
+import os
+
+import click
+
+from edpm.engine.api import EdpmApi
+from edpm.engine.output import markup_print as mprint
+from edpm.engine.view import View
+
+
+@click.group("view")
+@click.pass_context
+def view_group(ctx):
+    """
+    Manages a merged view: one prefix with symlinks to files of all installed packages.
+
+    With a view, generated environment and CMake files need just one entry
+    per path variable (PATH, LD_LIBRARY_PATH, CMAKE_PREFIX_PATH, ...).
+
+    Subcommands:
+      edpm view create <dir>     -> create (or sync) the view and use it in env files
+      edpm view update [pkg...]  -> sync the view, relink given packages
+      edpm view rm               -> remove view links and stop using the view
+    """
+    api = ctx.obj
+    assert isinstance(api, EdpmApi)
+    api.ensure_lock_exists()
+
+
+@view_group.command("create")
+@click.argument("view_dir", metavar="<dir>")
+@click.pass_context
+def view_create(ctx, view_dir):
+    """Creates or syncs a merged view in <dir>"""
+    api: EdpmApi = ctx.obj
+    view_dir = os.path.abspath(os.path.normpath(view_dir))
+
+    # Switching to another directory => clean up links of the old view
+    old_view_dir = api.lock.view_dir
+    if old_view_dir and old_view_dir != view_dir:
+        mprint("Removing previous view at <magenta>{}</magenta>", old_view_dir)
+        old_view = View(old_view_dir)
+        old_view.load()
+        old_view.remove()
+
+    api.lock.view_dir = view_dir
+    api.lock.save()
+    view = api.update_view()
+    _print_view_summary(view)
+
+    mprint("\nUpdating environment script files...\n")
+    api.save_generator_scripts()
+
+
+@view_group.command("update")
+@click.argument("names", nargs=-1)
+@click.pass_context
+def view_update(ctx, names):
+    """Syncs the view with the lock file. Given packages are relinked"""
+    api: EdpmApi = ctx.obj
+    if not api.lock.view_dir:
+        mprint("<red>Error:</red> No view. Use 'edpm view create <dir>' first")
+        raise click.Abort()
+
+    view = api.update_view(only=list(names))
+    _print_view_summary(view)
+
+
+@view_group.command("rm")
+@click.pass_context
+def view_rm(ctx):
+    """Removes view links and stops using the view in environment files"""
+    api: EdpmApi = ctx.obj
+    view_dir = api.lock.view_dir
+    if not view_dir:
+        mprint("<yellow>No view is set. Nothing to remove</yellow>")
+        return
+
+    view = View(view_dir)
+    view.load()
+    view.remove()
+    api.lock.view_dir = ""
+    api.lock.save()
+    mprint("<green>Removed view:</green> {}", view_dir)
+
+    mprint("\nUpdating environment script files...\n")
+    api.save_generator_scripts()
+
+
+def _print_view_summary(view: View):
+    mprint("<b><blue>View:</blue></b> {}", view.view_dir)
+    for name in sorted(view.packages):
+        mprint("  <blue>{}</blue>: {} files", name, len(view.packages[name]["files"]))
+    if view.conflicts:
+        mprint("<yellow>{} conflicting files were not linked</yellow>", len(view.conflicts))
@@ -2,16 +2,30 @@
 
 import os
 import sys
-from typing import List
+import time
+import urllib.error
+from typing import Dict, List, Optional
 
+from edpm.engine import binary_cache, optimization
+from edpm.engine.gc import human_size
 from edpm.engine.lockfile import LockfileConfig
 from edpm.engine.output import markup_print as mprint
 from edpm.engine.recipe_manager import RecipeManager
 from edpm.engine.planfile import PlanFile
+from edpm.engine.view import View
+from edpm.engine.install_index import index_install_tree, get_library_dirs, INDEX_KEY
+from edpm.engine.manifest import (build_manifest, save_manifest, load_manifest,
+                                  default_manifest_path, default_threads, MANIFEST_KEY)
+from edpm.engine.versions import version_key, version_label, VERSION_KEY
+from edpm.engine.build_times import BuildTimeDB, db_path, format_duration, format_total
+from edpm.engine.explain import explain_install, print_explain
+from edpm.engine.parallelism import DEFAULT_JOB_MEMORY_GB, auto_build_threads, is_pinned
+from edpm.engine.profiling import PhaseTimer
+from edpm.engine.tracing import span
 
 # We rely on the new Generators, but do NOT define environment
 # or cmake generation methods here. Just references:
-from edpm.engine.generators.environment_generator import EnvironmentGenerator
+from edpm.engine.generators.environment_generator import EnvironmentGenerator, RPATH_FIELD
 from edpm.engine.generators.cmake_generator import CmakeGenerator
 
 
@@ -29,14 +43,30 @@ class EdpmApi:
         self.recipe_manager = RecipeManager()
         self.plan: PlanFile = None
 
+        # If set, env file that builds source instead of the shared one (cooperative installs)
+        self.build_env_file = ""
+
+        # Wall time of main phases (see engine/profiling.py)
+        self.phases = PhaseTimer()
+
+        # Binary cache keys of this install, see binary_cache_key()
+        self._binary_cache_keys: Dict[str, Optional[dict]] = {}
+
     def load_all(self):
         """
         Load both the lock file and the plan file into memory,
         and initialize the recipe manager.
         """
-        self.lock.load(self.lock_file)
-        self.plan = PlanFile.load(self.plan_file)
-        self.recipe_manager.load_installers()
+        with self.phases.phase("load lock"):
+            self.lock.load(self.lock_file)
+        with self.phases.phase("load plan"):
+            self.plan = PlanFile.load(self.plan_file)
+        with self.phases.phase("load recipes"):
+            self.recipe_manager.load_installers()
+
+    def save_lock(self):
+        with self.phases.phase("save lock"):
+            self.lock.save()
 
     def ensure_lock_exists(self):
         """
@@ -45,7 +75,7 @@ class EdpmApi:
         if not os.path.isfile(self.lock_file):
             mprint("<green>Creating new lock file at {}</green>", self.lock_file)
             self.lock.file_path = self.lock_file
-            self.lock.save()
+            self.save_lock()
 
     @property
     def top_dir(self) -> str:
@@ -56,7 +86,7 @@ class EdpmApi:
     def top_dir(self, path: str):
         real_path = os.path.abspath(path)
         self.lock.top_dir = real_path
-        self.lock.save()
+        self.save_lock()
 
     def guess_recipe_for(self, pkg_name: str) -> str:
         """
@@ -82,21 +112,35 @@ class EdpmApi:
         to_install = [
             dep_name
             for dep_name in dep_names
-            if force or not self.lock.is_installed(dep_name)
+            if force or not self.lock.is_installed(dep_name) or self._is_other_version_wanted(dep_name)
         ]
 
         if explain:
-            if not to_install:
-                mprint("Nothing to install!")
-            else:
-                mprint("<b>Dependencies to be installed (explain only):</b>")
-                for dn in to_install:
-                    mprint("  - {}", dn)
+            print_explain(explain_install(self, dep_names, force))
             return
 
-        for dn in to_install:
+        # Cached builds are downloaded in parallel before installing (see engine/binary_cache.py)
+        self._binary_cache_keys = {}
+        if not force and self.top_dir:
+            self.prefetch_binary_cache(to_install)
+
+        # ETAs from previous builds (see engine/build_times.py)
+        estimates = self.estimate_build_times(to_install)
+        known = [estimates[dn] for dn in to_install if estimates[dn] is not None]
+        if known:
+            mprint("<b>Estimated time:</b> {} ({} of {} packages were built before)",
+                   format_duration(sum(known)), len(known), len(to_install))
+
+        for i, dn in enumerate(to_install):
+            remaining = format_total(estimates[n] for n in to_install[i:])
+            mprint("<blue>[{}/{}]</blue> {}: est. {}, remaining {}",
+                   i + 1, len(to_install), dn, format_duration(estimates[dn]), remaining)
+            start = time.perf_counter()
             try:
-                self._install_single_dependency(dn, force)
+                with span(dn, "package"):
+                    self._install_single_dependency(dn, force)
+                mprint("<blue>[{}/{}]</blue> {} took {}",
+                       i + 1, len(to_install), dn, format_duration(time.perf_counter() - start))
             except Exception as ex:
                 if isinstance(ex, OSError) and "failed with return code" in str(ex):
                     print("Aborting the install")
@@ -105,6 +149,192 @@ class EdpmApi:
                     raise
 
 
+    def _combined_config(self, dep_obj) -> dict:
+        """Global config merged with the package config"""
+        global_cfg = dict(self.plan.global_config())
+        local_cfg = dict(dep_obj.config)
+        return {**global_cfg, **local_cfg}
+
+    def build_time_db(self) -> BuildTimeDB:
+        return BuildTimeDB(db_path(self.top_dir))
+
+    @staticmethod
+    def expected_build_threads(config: dict) -> int:
+        """build_threads a build with this config will use (see engine/parallelism.py)"""
+        if is_pinned(config):
+            return int(config["build_threads"])
+        return auto_build_threads(float(config.get("build_job_memory_gb", DEFAULT_JOB_MEMORY_GB)))
+
+    def estimate_build_times(self, dep_names: List[str]) -> Dict[str, Optional[float]]:
+        """Expected install seconds per package from previous builds. None = never built"""
+        estimates: Dict[str, Optional[float]] = {name: None for name in dep_names}
+        if not self.top_dir:
+            return estimates
+        db = self.build_time_db()
+        for dep_name in dep_names:
+            dep_obj = self.plan.find_package(dep_name)
+            if not dep_obj:
+                continue
+            config = self._combined_config(dep_obj)
+            if "existing" in config:
+                estimates[dep_name] = 0.0
+                continue
+            estimates[dep_name] = db.estimate(dep_name, version_label(config), self.expected_build_threads(config))
+        return estimates
+
+    def record_build_time(self, dep_name: str, config: dict, recipe):
+        """Saves stage durations of a finished recipe pipeline to the build-time DB"""
+        stage_times = getattr(recipe, "stage_times", None)
+        if not stage_times:
+            return
+        threads = recipe.config.get("build_threads")
+        threads = int(threads) if str(threads).isdigit() else self.expected_build_threads(config)
+        self.build_time_db().record(dep_name, version_label(config), threads, stage_times)
+
+    def _planned_recipe(self, dep_name: str, config: dict):
+        """Recipe with dirs and defaults set the way an install would set them, not preconfigured"""
+        config = dict(config)
+        ver_key = version_key(config) if config.get("versioned_installs", False) else ""
+        config.setdefault("app_path", os.path.join(self.top_dir, dep_name, ver_key) if ver_key
+                          else os.path.join(self.top_dir, dep_name))
+        config.setdefault("edpm_dir", os.path.join(self.top_dir, ".edpm"))
+        return self.recipe_manager.create_recipe(dep_name, config)
+
+    def binary_cache_key(self, dep_name: str) -> Optional[dict]:
+        """
+        Binary cache key of a package and its inputs (see engine/binary_cache.py).
+        None if it can't be cached: local sources or a prerequisite that can't be cached.
+        Keys are memoized per install, the key of a package includes keys of its prerequisites
+        """
+        if dep_name in self._binary_cache_keys:
+            return self._binary_cache_keys[dep_name]
+        self._binary_cache_keys[dep_name] = None     # dependency cycles
+        dep_obj = self.plan.find_package(dep_name)
+        if not dep_obj or not self.top_dir:
+            return None
+        config = self._combined_config(dep_obj)
+        if "existing" in config:
+            result = {"key": f"existing:{config['existing']}", "inputs": {}}
+        else:
+            prerequisite_keys = {}
+            for prereq in self.plan.package_dependencies().get(dep_name, []):
+                prereq_key = self.binary_cache_key(prereq)
+                if prereq_key is None:
+                    return None
+                prerequisite_keys[prereq] = prereq_key["key"]
+            recipe = self._planned_recipe(dep_name, config)
+            source = binary_cache.source_revision(recipe.config)
+            if source is None:
+                return None
+            recipe_cls = self.recipe_manager.recipes_by_name.get(dep_name)
+            optimization_inputs = optimization.cache_key_inputs(recipe.config)
+            result = binary_cache.cache_key(dep_name, binary_cache.recipe_id(recipe_cls, recipe.config),
+                                            recipe.config, source, prerequisite_keys,
+                                            binary_cache.toolchain_id(), self.top_dir,
+                                            extra={"optimization": optimization_inputs} if optimization_inputs else None)
+        self._binary_cache_keys[dep_name] = result
+        return result
+
+    def binary_cache_stores(self, config: dict) -> tuple:
+        """(local cache, [remote caches]) for a package config with 'binary_cache' URLs"""
+        urls = config.get("binary_cache") or []
+        if isinstance(urls, str):
+            urls = [urls]
+        return (binary_cache.DirectoryStore(binary_cache.local_cache_dir(self.top_dir)),
+                [binary_cache.open_store(url) for url in urls])
+
+    def prefetch_binary_cache(self, dep_names: List[str]) -> Dict[str, dict]:
+        """Downloads cached artifacts of packages to the local cache in parallel. Returns found ones"""
+        # Packages can have their own 'binary_cache', so keys are grouped by cache URLs
+        groups: Dict[tuple, Dict[str, str]] = {}
+        for dep_name in dep_names:
+            dep_obj = self.plan.find_package(dep_name)
+            if not dep_obj:
+                continue
+            config = self._combined_config(dep_obj)
+            urls = config.get("binary_cache")
+            if "existing" in config or not urls:
+                continue
+            key_info = self.binary_cache_key(dep_name)
+            if key_info:
+                urls = (urls,) if isinstance(urls, str) else tuple(urls)
+                groups.setdefault(urls, {})[dep_name] = key_info["key"]
+        if not groups:
+            return {}
+        results = {}
+        for urls, wanted in groups.items():
+            local, remotes = self.binary_cache_stores({"binary_cache": list(urls)})
+            results.update(binary_cache.fetch_artifacts(local, remotes, wanted, threads=default_threads()))
+        found = {name: meta for name, meta in results.items() if isinstance(meta, dict)}
+        for name, result in results.items():
+            if isinstance(result, Exception):
+                mprint("<yellow>Binary cache:</yellow> {}", result)
+        mprint("<b>Binary cache:</b> {} of {} packages found", len(found), len(results))
+        return found
+
+    def _install_from_binary_cache(self, dep_name: str, config: dict, key_info: dict) -> Optional[dict]:
+        """
+        Extracts a cached build of the package.
+        Returns the artifact metadata with 'install_path' set, or None on a cache miss
+        """
+        local, remotes = self.binary_cache_stores(config)
+        try:
+            meta = binary_cache.fetch_artifact(local, remotes, dep_name, key_info["key"])
+            if not meta:
+                return None
+            install_path = self._planned_recipe(dep_name, config).config.get("install_path") \
+                or os.path.join(config["app_path"], "install")
+            with self.phases.phase("binary cache"):
+                binary_cache.extract_artifact(local, meta, install_path, self.top_dir)
+        except (binary_cache.CacheError, OSError, urllib.error.URLError) as ex:
+            mprint("<yellow>Binary cache:</yellow> {}, building from source", ex)
+            return None
+        mprint("<green>Binary cache hit</green> {} ({})", key_info["key"][:12], human_size(meta.get("size", 0)))
+        return {**meta, "install_path": install_path}
+
+    def push_to_binary_cache(self, dep_name: str, url: str, force: bool = False) -> bool:
+        """Uploads the installed package to the cache at url. False if the cache has it already"""
+        key_info = self.binary_cache_key(dep_name)
+        # The key it was built with, the plan may have changed since
+        stored_key = self.lock.get_installed_package(dep_name).get(binary_cache.KEY_FIELD, "")
+        if stored_key and (not key_info or key_info["key"] != stored_key):
+            key_info = {"key": stored_key, "inputs": {}}
+        if not key_info:
+            raise binary_cache.CacheError(f"{dep_name} can't be cached (local sources or prerequisites)")
+        dep_data = self.lock.get_installed_package(dep_name)
+        install_path = dep_data.get("install_path", "")
+        if not os.path.isdir(install_path):
+            raise binary_cache.CacheError(f"{dep_name} is not installed")
+        return binary_cache.push_artifact(binary_cache.open_store(url), dep_name, key_info,
+                                          install_path, self.top_dir, force=force,
+                                          rpath=dep_data.get(RPATH_FIELD, ""))
+
+    def wanted_version_key(self, dep_name: str) -> str:
+        """Version key the plan asks for, if versioned installs are on (see engine/versions.py)"""
+        dep_obj = self.plan.find_package(dep_name)
+        if not dep_obj:
+            return ""
+        combined_config = self._combined_config(dep_obj)
+        if not combined_config.get("versioned_installs", False):
+            return ""
+        return version_key(combined_config)
+
+    def _is_other_version_wanted(self, dep_name: str) -> bool:
+        """True if the plan asks for another side-by-side version than the active one"""
+        wanted = self.wanted_version_key(dep_name)
+        return bool(wanted) and wanted != self.lock.get_active_version(dep_name)
+
+    def switch_version(self, dep_name: str, key: str):
+        """
+        Makes a side-by-side installed version active without a rebuild:
+        repoints the lock entry and updates the view. Env files are regenerated by the caller
+        """
+        self.lock.activate_version(dep_name, key)
+        self.save_lock()
+        self.update_view(only=[dep_name])
+        mprint("<green>{} switched to {}</green> at {}",
+               dep_name, key, self.lock.get_installed_package(dep_name).get("install_path", ""))
+
     def _install_single_dependency(self, dep_name: str, force: bool):
         """
         Core routine to install a single dependency.
@@ -119,26 +349,49 @@ class EdpmApi:
             mprint("<red>No top_dir set. Please use --top-dir or define it in the lock file.</red>")
             sys.exit(1)
 
+        # Merge global + local config
+        combined_config = self._combined_config(dep_obj)
+
+        # Side-by-side versions: each version/config has its own app_path
+        ver_key = version_key(combined_config) if combined_config.get("versioned_installs", False) else ""
+
         # If already installed and not forcing, skip
         if self.lock.is_installed(dep_name) and not force:
             ipath = self.lock.get_installed_package(dep_name).get("install_path", "")
-            if os.path.isdir(ipath) and ipath:
+            if os.path.isdir(ipath) and ipath and ver_key in ("", self.lock.get_active_version(dep_name)):
                 mprint("<blue>{} is already installed at {}</blue>", dep_name, ipath)
                 return
 
-        # Merge global + local config
-        global_cfg = dict(self.plan.global_config())
-        local_cfg = dict(dep_obj.config)
-        combined_config = {**global_cfg, **local_cfg}
+        if ver_key and not force:
+            stored = self.lock.get_versions(dep_name).get(ver_key, {})
+            if os.path.isdir(stored.get("install_path", "")):
+                self.switch_version(dep_name, ver_key)
+                return
 
         # we need to generate env_bash_file with what we have now
         env_gen = self.create_environment_generator()
         bash_in, bash_out = self.get_env_paths("bash")
-        env_gen.save_environment_with_infile("bash", bash_in, bash_out)
+        if self.build_env_file:
+            bash_out = self.build_env_file
+        with self.phases.phase("generate env"):
+            env_gen.save_environment_with_infile("bash", bash_in, bash_out)
 
         # save it to packet lock file info
         combined_config["env_file_bash"] = bash_out
-        combined_config["app_path"] = os.path.join(top_dir, dep_name)
+        # edpm state shared by packages of this top_dir, e.g. the autotools configure cache
+        combined_config["edpm_dir"] = os.path.join(top_dir, ".edpm")
+        if ver_key:
+            combined_config["app_path"] = os.path.join(top_dir, dep_name, ver_key)
+        else:
+            combined_config["app_path"] = os.path.join(top_dir, dep_name)
+
+        # RPATH install mode needs lib dirs of everything installed so far
+        if combined_config.get("use_rpath", False):
+            combined_config["rpath_dirs"] = self.installed_library_dirs(exclude=dep_name)
+
+        # A build made before versioned installs were on is kept as 'unversioned'
+        if ver_key and self.lock.is_installed(dep_name) and not self.lock.get_active_version(dep_name):
+            self.lock.store_version(dep_name, "unversioned")
 
         # Check if this is an "existing" package
         if "existing" in combined_config:
@@ -149,12 +402,22 @@ class EdpmApi:
             mprint("<blue>Existing installation at: {}</blue>", existing_path)
 
             # Update lock file for existing package
+            if ver_key:
+                self.lock.clear_active_version(dep_name)
+                self.lock.update_package(dep_name, {VERSION_KEY: ver_key})
             self.lock.update_package(dep_name, {
                 "install_path": existing_path,
                 "built_with_config": dict(combined_config),
-                "owned": False  # Mark as not owned by EDPM
+                "owned": False,  # Mark as not owned by EDPM
+                INDEX_KEY: index_install_tree(existing_path)
             })
-            self.lock.save()
+            # Existing installations can be huge system prefixes, so hash them only on request
+            if combined_config.get("manifest", False):
+                self.record_manifest(dep_name)
+            if ver_key:
+                self.lock.store_version(dep_name, ver_key)
+            self.save_lock()
+            self.update_view(only=[dep_name])
 
             mprint("<green>{} referenced at {}</green>", dep_name, existing_path)
             return
@@ -164,30 +427,146 @@ class EdpmApi:
         mprint("<green>INSTALLING</green> : <blue>{}</blue>", dep_name)
         mprint("<magenta>=========================================</magenta>\n")
 
-        # Create the recipe, run the pipeline
-        try:
-            recipe = self.recipe_manager.create_recipe(dep_obj.name, combined_config)
-            recipe.preconfigure()
-            recipe.run_full_pipeline()
-        except Exception as e:
-            mprint("<red>Installation failed for {}:</red> {}", dep_name, e)
-            raise
-
-        final_install = recipe.config.get("install_path", "")
+        # A build with the same inputs from the binary cache, if there is one
+        cache_key_info = self.binary_cache_key(dep_name) if combined_config.get("binary_cache") else None
+        cached = None
+        if cache_key_info and not force:
+            cached = self._install_from_binary_cache(dep_name, combined_config, cache_key_info)
+        final_install = cached["install_path"] if cached else ""
+
         if not final_install:
-            final_install = os.path.join(combined_config["app_path"], "install")
-            recipe.config["install_path"] = final_install
+            # Create the recipe, run the pipeline
+            try:
+                with self.phases.phase("run recipe"):
+                    recipe = self.recipe_manager.create_recipe(dep_obj.name, combined_config)
+                    recipe.preconfigure()
+                    recipe.run_full_pipeline()
+            except Exception as e:
+                mprint("<red>Installation failed for {}:</red> {}", dep_name, e)
+                raise
+            self.record_build_time(dep_name, combined_config, recipe)
+
+            final_install = recipe.config.get("install_path", "")
+            if not final_install:
+                final_install = os.path.join(combined_config["app_path"], "install")
+                recipe.config["install_path"] = final_install
+            rpath = recipe.config.get("install_rpath", "")
+        else:
+            recipe = None
+            rpath = cached.get("rpath", "")
 
         # Update lock file
+        if ver_key:
+            self.lock.clear_active_version(dep_name)
+            self.lock.update_package(dep_name, {VERSION_KEY: ver_key})
+        with self.phases.phase("index"):
+            install_index = index_install_tree(final_install)
         self.lock.update_package(dep_name, {
             "install_path": final_install,
             "built_with_config": dict(combined_config),
-            "owned": True
+            "owned": True,
+            INDEX_KEY: install_index
         })
-        self.lock.save()
+        if cache_key_info:
+            self.lock.update_package(dep_name, {binary_cache.KEY_FIELD: cache_key_info["key"]})
+        else:
+            self.lock.get_installed_package(dep_name).pop(binary_cache.KEY_FIELD, None)
+        # RPATH install mode, env files leave out library path variables for it
+        if rpath:
+            self.lock.update_package(dep_name, {RPATH_FIELD: rpath})
+        else:
+            self.lock.get_installed_package(dep_name).pop(RPATH_FIELD, None)
+        # Resolved optimization profile (see engine/optimization.py)
+        profile = optimization.resolve_profile({**combined_config, "app_name": dep_name})
+        if profile:
+            self.lock.update_package(dep_name, {optimization.LOCK_FIELD: profile})
+        else:
+            self.lock.get_installed_package(dep_name).pop(optimization.LOCK_FIELD, None)
+        if combined_config.get("manifest", True):
+            with self.phases.phase("manifest"):
+                self.record_manifest(dep_name)
+        if ver_key:
+            self.lock.store_version(dep_name, ver_key)
+        self.save_lock()
+        self.update_view(only=[dep_name])
 
         mprint("<green>{} installed at {}</green>", dep_name, final_install)
 
+        # CI builders publish what they built
+        if recipe is not None and cache_key_info and combined_config.get("binary_cache_push", False):
+            url = combined_config["binary_cache"]
+            url = url if isinstance(url, str) else url[0]
+            try:
+                with self.phases.phase("binary cache"):
+                    if self.push_to_binary_cache(dep_name, url):
+                        mprint("<green>Pushed</green> {} to {}", dep_name, url)
+            except (binary_cache.CacheError, OSError, urllib.error.URLError) as ex:
+                mprint("<yellow>Binary cache:</yellow> push of {} failed: {}", dep_name, ex)
+
+    def installed_library_dirs(self, exclude: str = "") -> List[str]:
+        """
+        Library directories (lib, lib64) of packages installed according to the lock file.
+        Used as RPATH entries in the RPATH install mode (global config 'use_rpath').
+        """
+        lib_dirs = []
+        for dep_name in self.lock.get_installed_packages():
+            if dep_name == exclude or not self.lock.is_installed(dep_name):
+                continue
+            lib_dirs.extend(get_library_dirs(self.lock.get_installed_package(dep_name)))
+        return lib_dirs
+
+    def record_manifest(self, dep_name: str) -> str:
+        """
+        Hashes files of an installed package and saves its manifest (see engine/manifest.py).
+        The manifest path is stored in the lock file. Returns the manifest path.
+        """
+        install_path = self.lock.get_installed_package(dep_name)["install_path"]
+
+        # In a shared install_path, files in manifests of other packages are not ours
+        exclude = self.files_of_other_packages(dep_name)
+        manifest = build_manifest(install_path, exclude=exclude)
+        ver_key = self.lock.get_active_version(dep_name)
+        manifest_path = default_manifest_path(self.top_dir, f"{dep_name}-{ver_key}" if ver_key else dep_name)
+        save_manifest(manifest, manifest_path)
+        self.lock.update_package(dep_name, {MANIFEST_KEY: manifest_path})
+        mprint("<blue>Manifest with {} files:</blue> {}", len(manifest["files"]), manifest_path)
+        return manifest_path
+
+    def files_of_other_packages(self, dep_name: str) -> set:
+        """Files listed in manifests of other packages that share install_path with dep_name"""
+        install_path = self.lock.get_installed_package(dep_name).get("install_path", "")
+        files = set()
+        for other_name in self.lock.get_installed_packages():
+            other_data = self.lock.get_installed_package(other_name)
+            other_manifest = other_data.get(MANIFEST_KEY, "")
+            if (other_name != dep_name and other_data.get("install_path") == install_path
+                    and other_manifest and os.path.isfile(other_manifest)):
+                files.update(load_manifest(other_manifest)["files"].keys())
+        return files
+
+    def update_view(self, only: List[str] = None) -> View:
+        """
+        Syncs the merged view (see 'edpm view') with installed packages.
+        Packages in 'only' are relinked even if their install path didn't change.
+        Returns None if there is no view.
+        """
+        if not self.lock.view_dir:
+            return None
+
+        installed = {}
+        for dep_name in self.lock.get_installed_packages():
+            if self.lock.is_installed(dep_name):
+                installed[dep_name] = self.lock.get_installed_package(dep_name)["install_path"]
+
+        view = View(self.lock.view_dir)
+        view.load()
+        view.update(installed, only=only)
+        for conflict in view.conflicts:
+            owner = conflict.owner or "a file not managed by edpm"
+            mprint("<yellow>View conflict:</yellow> {} from {} is already provided by {}",
+                   conflict.rel_path, conflict.package, owner)
+        return view
+
     #
     # Provide the new generator creation
     #
@@ -252,16 +631,18 @@ class EdpmApi:
     
         # Environment files
         env_gen = self.create_environment_generator()
-        env_gen.save_environment_with_infile("bash", bash_in, bash_out)
+        with self.phases.phase("generate env"):
+            env_gen.save_environment_with_infile("bash", bash_in, bash_out)
+            env_gen.save_environment_with_infile("csh", csh_in, csh_out)
         mprint(f"<green>[Saved]</green> bash environment: {bash_out}")
-        env_gen.save_environment_with_infile("csh", csh_in, csh_out)
         mprint(f"<green>[Saved]</green> csh  environment: {csh_out}")
     
         # CMake files
         cm_gen = self.create_cmake_generator()
-        cm_gen.save_toolchain_with_infile(toolchain_in, toolchain_out)
+        with self.phases.phase("generate cmake"):
+            cm_gen.save_toolchain_with_infile(toolchain_in, toolchain_out)
+            cm_gen.save_presets_with_infile(presets_in, presets_out)
         mprint(f"<green>[Saved]</green> CMake toolchain: {toolchain_out}")
-        cm_gen.save_presets_with_infile(presets_in, presets_out)
         mprint(f"<green>[Saved]</green> CMake presets  : {presets_out}")
 
 
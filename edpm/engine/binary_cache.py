@@ -0,0 +1,485 @@
+# edpm/engine/binary_cache.py
+
+"""
+Binary cache of install trees, shared by a team ('binary_cache' config, 'edpm cache').
+
+CI builds a package once and pushes its install tree. Developers and workers with the
+same inputs pull it instead of building. A cache is a directory (a path or file://URL,
+e.g. on a shared filesystem) or a plain HTTP server with the same layout:
+
+    <cache>/<package>/<key>.json       metadata: key inputs, archive sha256 and size, build prefix
+    <cache>/<package>/<key>.json.sig   HMAC-SHA256 of the .json (if EDPM_CACHE_SECRET is set)
+    <cache>/<package>/<key>.tar.gz     install tree, paths relative to install_path
+
+The key is a sha256 of the recipe (a hash of the baked-in recipe file or the maker name),
+the merged config without edpm-set and build-only keys, the source revision (git commit,
+tarball URL), the toolchain (compiler, arch, libc, OS), the resolved optimization profile
+(engine/optimization.py) and the keys of the package prerequisites. So a changed dependency
+changes the keys of everything built on top of it.
+
+Pulled archives are checked against the sha256 in the metadata. With EDPM_CACHE_SECRET
+set, the metadata must carry a valid signature too, so only holders of the secret can
+publish. Downloads go to the local cache {top_dir}/.edpm/binary-cache (same layout), which
+is used first. When extracted, text files get the build prefix and top_dir replaced by
+the local ones. Binaries are not patched: packages built with use_rpath include top_dir
+in the key, because their RUNPATHs are absolute.
+
+HTTP pushes use PUT, EDPM_CACHE_TOKEN is sent as a bearer token. 'edpm cache serve DIR'
+is a small HTTP server with GET and PUT, e.g. as a local stand-in for a real server.
+"""
+
+import functools
+import hashlib
+import hmac
+import http.server
+import inspect
+import json
+import os
+import platform
+import shutil
+import subprocess
+import tarfile
+import tempfile
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from edpm.engine.versions import _NOT_HASHED
+
+LOCAL_CACHE_SUBDIR = os.path.join(".edpm", "binary-cache")
+KEY_FIELD = "binary_cache_key"      # lock file package entry
+SECRET_ENV = "EDPM_CACHE_SECRET"
+TOKEN_ENV = "EDPM_CACHE_TOKEN"
+
+# Config keys that don't change the installed files
+_NOT_IN_KEY = _NOT_HASHED | {
+    "depends_on", "build_threads", "adaptive_build_threads", "build_job_memory_gb",
+    "manifest", "binary_cache", "binary_cache_push", "versioned_installs",
+    "fetch_path", "source_path", "build_path", "install_path", "environment", "pgo_dir",
+}
+_MAX_TEXT_SIZE = 16 * 1024 * 1024
+
+
+def local_cache_dir(top_dir: str) -> str:
+    return os.path.join(top_dir, LOCAL_CACHE_SUBDIR)
+
+
+# -------------------------------------
+# K E Y S
+# -------------------------------------
+
+@functools.lru_cache(maxsize=None)
+def toolchain_id() -> str:
+    """Compiler, arch, libc and OS of this machine"""
+    compiler = os.environ.get("CXX", "c++")
+    try:
+        out = subprocess.run([compiler, "--version"], capture_output=True, text=True, timeout=20).stdout
+        compiler_version = out.splitlines()[0] if out else compiler
+    except (OSError, subprocess.SubprocessError):
+        compiler_version = compiler
+    os_release = {}
+    try:
+        with open("/etc/os-release", encoding="utf-8") as f:
+            for line in f:
+                key, _, value = line.strip().partition("=")
+                os_release[key] = value.strip('"')
+    except OSError:
+        pass
+    libc = "-".join(platform.libc_ver())
+    return f"{compiler_version}|{platform.machine()}|{libc}|{os_release.get('ID', platform.system())}" \
+           f"-{os_release.get('VERSION_ID', '')}"
+
+
+@functools.lru_cache(maxsize=None)
+def _ls_remote(url: str, ref: str) -> str:
+    """Commit of a remote branch or tag (annotated tags are peeled), '' if unknown"""
+    try:
+        out = subprocess.run(["git", "ls-remote", url, ref, f"{ref}^{{}}"],
+                             capture_output=True, text=True, timeout=30).stdout
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    lines = [line.split() for line in out.splitlines() if line.strip()]
+    peeled = [sha for sha, name in lines if name.endswith("^{}")]
+    return peeled[0] if peeled else (lines[0][0] if lines else "")
+
+
+def source_revision(config: Dict[str, Any]) -> Optional[str]:
+    """
+    What the sources are: a git commit, tarball URL etc. None if they can't be identified
+    (local sources), then the package is not cached
+    """
+    fetch = str(config.get("fetch", ""))
+    if not fetch:
+        return "no-fetch"
+    if fetch == "simulate":
+        return "simulate"
+    if fetch == "tarball" or fetch.endswith(".tar.gz"):
+        return config.get("file_url") or config.get("url") or fetch
+    if fetch == "git" or fetch.endswith(".git"):
+        url = config.get("url") or fetch
+        ref = str(config.get("version") or config.get("branch") or "HEAD")
+        source_path = config.get("source_path", "")
+        if source_path and os.path.isdir(os.path.join(source_path, ".git")):
+            out = subprocess.run(["git", "-C", source_path, "rev-parse", "HEAD"], capture_output=True, text=True)
+            if out.returncode == 0:
+                return out.stdout.strip()
+        return _ls_remote(url, ref) or f"{url}@{ref}"
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _file_hash(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def recipe_id(recipe_cls: Optional[type], config: Dict[str, Any]) -> str:
+    """Baked-in recipe: class and a hash of its file. Composed: fetcher and maker names"""
+    if recipe_cls is not None:
+        try:
+            return f"{recipe_cls.__name__}:{_file_hash(inspect.getsourcefile(recipe_cls))}"
+        except (OSError, TypeError):
+            return recipe_cls.__name__
+    return f"composed:{config.get('fetch', '')}:{config.get('make', '')}"
+
+
+def cache_key(name: str, recipe: str, config: Dict[str, Any], source: str,
+              prerequisite_keys: Dict[str, str], toolchain: str, top_dir: str = "",
+              extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """{'key': sha256, 'inputs': what it was computed from}. extra: more inputs, e.g. optimization flags"""
+    inputs = {
+        "name": name,
+        "recipe": recipe,
+        "config": {k: v for k, v in sorted(config.items()) if k not in _NOT_IN_KEY},
+        "source": source,
+        "toolchain": toolchain,
+        "prerequisites": dict(sorted(prerequisite_keys.items())),
+    }
+    if config.get("use_rpath", False):
+        inputs["top_dir"] = top_dir      # absolute RUNPATHs
+    inputs.update(extra or {})
+    inputs = json.loads(json.dumps(inputs, default=str))
+    key = hashlib.sha256(json.dumps(inputs, sort_keys=True).encode("utf-8")).hexdigest()
+    return {"key": key, "inputs": inputs}
+
+
+# -------------------------------------
+# S T O R E S
+# -------------------------------------
+
+class DirectoryStore:
+    """A cache in a local or shared directory"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.url = root
+
+    def _path(self, rel_path: str) -> str:
+        return os.path.join(self.root, *rel_path.split("/"))
+
+    def read(self, rel_path: str) -> Optional[bytes]:
+        try:
+            with open(self._path(rel_path), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def exists(self, rel_path: str) -> bool:
+        return os.path.isfile(self._path(rel_path))
+
+    def download(self, rel_path: str, dest: str) -> bool:
+        try:
+            shutil.copyfile(self._path(rel_path), dest)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def upload(self, src: str, rel_path: str):
+        """Atomic: readers never see a partial file"""
+        path = self._path(rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        shutil.copyfile(src, tmp_path)
+        os.replace(tmp_path, path)
+
+    def write(self, rel_path: str, data: bytes):
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(data)
+        try:
+            self.upload(f.name, rel_path)
+        finally:
+            os.unlink(f.name)
+
+
+class HttpStore:
+    """A cache on an HTTP server: GET to read, PUT to write"""
+
+    def __init__(self, url: str, timeout: float = 60):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, rel_path: str, method: str = "GET", data=None, headers=None):
+        headers = dict(headers or {})
+        token = os.environ.get(TOKEN_ENV)
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        url = f"{self.url}/{urllib.parse.quote(rel_path)}"
+        return urllib.request.urlopen(urllib.request.Request(url, data=data, method=method, headers=headers),
+                                      timeout=self.timeout)
+
+    def read(self, rel_path: str) -> Optional[bytes]:
+        try:
+            with self._request(rel_path) as response:
+                return response.read()
+        except urllib.error.HTTPError as ex:
+            if ex.code == 404:
+                return None
+            raise
+
+    def exists(self, rel_path: str) -> bool:
+        try:
+            with self._request(rel_path, "HEAD"):
+                return True
+        except urllib.error.HTTPError as ex:
+            if ex.code == 404:
+                return False
+            raise
+
+    def download(self, rel_path: str, dest: str) -> bool:
+        try:
+            with self._request(rel_path) as response, open(dest, "wb") as f:
+                shutil.copyfileobj(response, f, 1024 * 1024)
+            return True
+        except urllib.error.HTTPError as ex:
+            if ex.code == 404:
+                return False
+            raise
+
+    def upload(self, src: str, rel_path: str):
+        with open(src, "rb") as f:
+            self._request(rel_path, "PUT", data=f,
+                          headers={"Content-Length": str(os.path.getsize(src))}).close()
+
+    def write(self, rel_path: str, data: bytes):
+        self._request(rel_path, "PUT", data=data).close()
+
+
+def open_store(url: str):
+    """DirectoryStore for paths and file:// URLs, HttpStore for http(s)://"""
+    if url.startswith(("http://", "https://")):
+        return HttpStore(url)
+    if url.startswith("file://"):
+        return DirectoryStore(urllib.parse.unquote(urllib.parse.urlparse(url).path))
+    return DirectoryStore(os.path.abspath(url))
+
+
+def artifact_paths(name: str, key: str) -> Dict[str, str]:
+    return {"meta": f"{name}/{key}.json", "sig": f"{name}/{key}.json.sig", "archive": f"{name}/{key}.tar.gz"}
+
+
+# -------------------------------------
+# P U S H  /  P U L L
+# -------------------------------------
+
+def _sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def sign(data: bytes) -> Optional[str]:
+    secret = os.environ.get(SECRET_ENV)
+    if not secret:
+        return None
+    return hmac.new(secret.encode("utf-8"), data, hashlib.sha256).hexdigest()
+
+
+class CacheError(Exception):
+    pass
+
+
+def push_artifact(store, name: str, key_info: Dict[str, Any], install_path: str, top_dir: str,
+                  force: bool = False, rpath: str = "") -> bool:
+    """
+    Packs install_path and uploads it. False if the artifact is in the cache already.
+    rpath: install RPATH the package was built with, goes to the lock entry on restore
+    """
+    paths = artifact_paths(name, key_info["key"])
+    if not force and store.exists(paths["meta"]):
+        return False
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        archive = os.path.join(tmp_dir, "artifact.tar.gz")
+        with tarfile.open(archive, "w:gz") as tar:
+            tar.add(install_path, arcname=".")
+        meta = json.dumps({
+            "name": name,
+            "key": key_info["key"],
+            "inputs": key_info.get("inputs", {}),
+            "sha256": _sha256_file(archive),
+            "size": os.path.getsize(archive),
+            "prefix": install_path,
+            "top_dir": top_dir,
+            "rpath": rpath,
+            "created": time.time(),
+        }, indent=1, sort_keys=True).encode("utf-8")
+        # Archive first: a visible .json means a complete artifact
+        store.upload(archive, paths["archive"])
+        signature = sign(meta)
+        if signature:
+            store.write(paths["sig"], signature.encode("utf-8"))
+        store.write(paths["meta"], meta)
+    return True
+
+
+def _verified_meta(store, name: str, key: str) -> Optional[Dict[str, Any]]:
+    paths = artifact_paths(name, key)
+    meta_data = store.read(paths["meta"])
+    if meta_data is None:
+        return None
+    expected = sign(meta_data)
+    if expected is not None:
+        signature = store.read(paths["sig"])
+        if signature is None or not hmac.compare_digest(signature.decode("utf-8").strip(), expected):
+            raise CacheError(f"{name}: bad or missing signature in {store.url}")
+    meta = json.loads(meta_data)
+    if meta.get("key") != key:
+        raise CacheError(f"{name}: metadata in {store.url} is for another key")
+    return meta
+
+
+def find_artifact(local, remotes: List, name: str, key: str) -> Optional[Dict[str, Any]]:
+    """Metadata of an artifact from the first cache that has it (nothing is downloaded), {'store': url, ...}"""
+    for store in [local, *remotes]:
+        meta = _verified_meta(store, name, key)
+        if meta:
+            return {**meta, "store": store.url}
+    return None
+
+
+def fetch_artifact(local, remotes: List, name: str, key: str) -> Optional[Dict[str, Any]]:
+    """
+    Makes sure the artifact is in the local cache, downloading it from the first remote
+    that has it. Checks signature and sha256. Returns its metadata or None if no cache has it
+    """
+    meta = _verified_meta(local, name, key)
+    if meta:
+        return meta
+    paths = artifact_paths(name, key)
+    for remote in remotes:
+        meta = _verified_meta(remote, name, key)
+        if not meta:
+            continue
+        os.makedirs(local.root, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=local.root) as tmp_dir:
+            archive = os.path.join(tmp_dir, "artifact.tar.gz")
+            if not remote.download(paths["archive"], archive):
+                continue
+            if _sha256_file(archive) != meta["sha256"]:
+                raise CacheError(f"{name}: archive from {remote.url} doesn't match its sha256")
+            local.upload(archive, paths["archive"])
+        signature = remote.read(paths["sig"])
+        if signature is not None:
+            local.write(paths["sig"], signature)
+        local.write(paths["meta"], json.dumps(meta, indent=1, sort_keys=True).encode("utf-8"))
+        return meta
+    return None
+
+
+def fetch_artifacts(local, remotes: List, keys: Dict[str, str], threads: int = 8) -> Dict[str, Any]:
+    """Parallel fetch_artifact for {name: key}. Returns {name: metadata, None or CacheError}"""
+    def fetch_one(item):
+        name, key = item
+        try:
+            return name, fetch_artifact(local, remotes, name, key)
+        except (CacheError, OSError, urllib.error.URLError) as ex:
+            return name, CacheError(f"{name}: {ex}")
+
+    with ThreadPoolExecutor(max_workers=max(1, threads)) as executor:
+        return dict(executor.map(fetch_one, keys.items()))
+
+
+def relocate_text_files(root: str, path_map: Dict[str, str]) -> int:
+    """Replaces path prefixes in text files under root (longest first). Returns changed file count"""
+    pairs = [(old.encode(), new.encode()) for old, new in sorted(path_map.items(), key=lambda kv: -len(kv[0]))
+             if old and old != new]
+    if not pairs:
+        return 0
+    changed = 0
+    for dir_path, _, file_names in os.walk(root):
+        for file_name in file_names:
+            path = os.path.join(dir_path, file_name)
+            if os.path.islink(path) or os.path.getsize(path) > _MAX_TEXT_SIZE:
+                continue
+            with open(path, "rb") as f:
+                data = f.read()
+            if b"\0" in data[:8192] or not any(old in data for old, _ in pairs):
+                continue
+            for old, new in pairs:
+                data = data.replace(old, new)
+            mode = os.stat(path).st_mode
+            with open(path, "wb") as f:
+                f.write(data)
+            os.chmod(path, mode)
+            changed += 1
+    return changed
+
+
+def extract_artifact(local: DirectoryStore, meta: Dict[str, Any], install_path: str, top_dir: str) -> int:
+    """Unpacks a fetched artifact into install_path (replacing it) and relocates text files"""
+    archive = local._path(artifact_paths(meta["name"], meta["key"])["archive"])
+    if os.path.isdir(install_path):
+        shutil.rmtree(install_path)
+    os.makedirs(install_path)
+    with tarfile.open(archive, "r:gz") as tar:
+        for member in tar.getmembers():
+            target = os.path.normpath(os.path.join(install_path, member.name))
+            if target != install_path and not target.startswith(install_path + os.sep):
+                raise CacheError(f"{meta['name']}: unsafe path in archive: {member.name}")
+        if hasattr(tarfile, "tar_filter"):
+            tar.extractall(install_path, filter="tar")     # keeps symlinks of install trees as they are
+        else:
+            tar.extractall(install_path)
+    return relocate_text_files(install_path, {meta.get("prefix", ""): install_path,
+                                              meta.get("top_dir", ""): top_dir})
+
+
+# -------------------------------------
+# L O C A L   S E R V E R
+# -------------------------------------
+
+class CacheRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """GET/HEAD from the served dir, PUT writes files there (atomically)"""
+
+    def do_PUT(self):
+        rel_path = urllib.parse.unquote(urllib.parse.urlparse(self.path).path).lstrip("/")
+        root = os.path.abspath(self.directory)
+        path = os.path.normpath(os.path.join(root, rel_path))
+        if not rel_path or not path.startswith(root + os.sep):
+            self.send_error(403, "Path outside of the cache")
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(tmp_path, "wb") as f:
+            remaining = length
+            while remaining > 0:
+                chunk = self.rfile.read(min(remaining, 1024 * 1024))
+                if not chunk:
+                    break
+                f.write(chunk)
+                remaining -= len(chunk)
+        os.replace(tmp_path, path)
+        self.send_response(201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+def make_server(directory: str, host: str = "127.0.0.1", port: int = 8080) -> http.server.ThreadingHTTPServer:
+    handler = functools.partial(CacheRequestHandler, directory=os.path.abspath(directory))
+    return http.server.ThreadingHTTPServer((host, port), handler)
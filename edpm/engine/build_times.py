@@ -0,0 +1,145 @@
+# edpm/engine/build_times.py
+
+"""
+Build-time history and critical-path-first scheduling.
+
+Every install records how long its recipe stages took, per package, version and
+build_threads, in {top_dir}/.edpm/build-times.json:
+
+    {"root": {"v6-36-00": {"8": [{"fetch": 41.2, "patch": 0.0, "build": 1502.7, "install": 35.1,
+                                  "post_install": 0.0, "time": 1718000000.0}, ...]}}}
+
+The last MAX_SAMPLES builds per key are kept. Estimates use the median of the exact
+key. Builds with another build_threads are rescaled with Amdahl's law, and builds of
+other versions of the package are the last fallback.
+
+Estimates give ETAs during install and the scheduling priority of cooperative installs:
+a ready package with the longest remaining path (its own time plus the longest chain
+of packages waiting for it) starts first, so ROOT starts before small header-only libs.
+"""
+
+import json
+import os
+import statistics
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional
+
+DB_FILE = os.path.join(".edpm", "build-times.json")
+MAX_SAMPLES = 5
+PARALLEL_FRACTION = 0.9     # Amdahl's law share of a build that scales with threads
+STAGES = ("fetch", "patch", "build", "install", "post_install")
+
+
+def db_path(top_dir: str) -> str:
+    return os.path.join(top_dir, DB_FILE)
+
+
+def _amdahl(seconds: float, from_threads: int, to_threads: int) -> float:
+    """Rescales a build time measured with from_threads to to_threads"""
+    def factor(n):
+        return (1 - PARALLEL_FRACTION) + PARALLEL_FRACTION / max(n, 1)
+    return seconds / factor(from_threads) * factor(to_threads)
+
+
+def _total(sample: Dict[str, float]) -> float:
+    return sum(sample.get(stage, 0.0) for stage in STAGES)
+
+
+class BuildTimeDB:
+    def __init__(self, path: str):
+        self.path = path
+        self.data: Dict[str, Dict[str, Dict[str, List[Dict[str, float]]]]] = {}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.data = json.load(f)
+        except (OSError, ValueError):
+            self.data = {}
+
+    def record(self, name: str, version: str, threads: int, stages: Dict[str, float]):
+        """Adds a sample and saves. The file is re-read first, other workers may have written to it"""
+        self.load()
+        samples = self.data.setdefault(name, {}).setdefault(version, {}).setdefault(str(threads), [])
+        samples.append({**{k: round(v, 3) for k, v in stages.items()}, "time": time.time()})
+        del samples[:-MAX_SAMPLES]
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def estimate(self, name: str, version: str, threads: int) -> Optional[float]:
+        """Expected seconds of fetch..post_install, None if the package was never built"""
+        versions = self.data.get(name, {})
+        for candidates in (versions.get(version, {}),
+                           {t: s for v, by_threads in versions.items() if v != version for t, s in by_threads.items()}):
+            if not candidates:
+                continue
+            exact = candidates.get(str(threads))
+            if exact:
+                return statistics.median(_total(s) for s in exact)
+            # The nearest thread count, rescaled
+            nearest = min(candidates, key=lambda t: abs(int(t) - threads))
+            return _amdahl(statistics.median(_total(s) for s in candidates[nearest]), int(nearest), threads)
+        return None
+
+
+def remaining_paths(names: Iterable[str], prerequisites: Dict[str, List[str]],
+                    estimates: Dict[str, Optional[float]], default: float = 60.0) -> Dict[str, float]:
+    """
+    Longest remaining path of each package: its own estimate plus the longest path among
+    packages that wait for it. Packages without history count as 'default' seconds
+    """
+    names = list(names)
+    dependents = {name: [] for name in names}
+    waiting_for = {name: 0 for name in names}
+    for name in names:
+        for prereq in prerequisites.get(name, []):
+            if prereq in dependents:
+                dependents[prereq].append(name)
+                waiting_for[name] += 1
+
+    # Topological order (prerequisites first), then paths from the end. No recursion: stacks can be long
+    order = [name for name in names if not waiting_for[name]]
+    for name in order:
+        for dependent in dependents[name]:
+            waiting_for[dependent] -= 1
+            if not waiting_for[dependent]:
+                order.append(dependent)
+
+    paths: Dict[str, float] = {}
+    for name in reversed(order):
+        own = estimates.get(name)
+        own = own if own is not None else default
+        paths[name] = own + max((paths[d] for d in dependents[name] if d in paths), default=0.0)
+    for name in names:
+        paths.setdefault(name, default)     # in a dependency cycle
+    return paths
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "unknown"
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes}m{seconds:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m"
+
+
+def format_total(estimates: Iterable[Optional[float]]) -> str:
+    """Sum of estimates. With unknown ones it is only a lower bound, or 'unknown' if none is known"""
+    estimates = list(estimates)
+    known = [seconds for seconds in estimates if seconds is not None]
+    if not known:
+        return "unknown"
+    if len(known) < len(estimates):
+        return f">= {format_duration(sum(known))}"
+    return f"~{format_duration(sum(known))}"
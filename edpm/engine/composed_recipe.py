@@ -60,6 +60,11 @@ class ComposedRecipe(Recipe):
         if hasattr(self.maker, 'preconfigure'):
             self.maker.preconfigure()
 
+    def explain(self) -> dict:
+        stages = self.fetcher.explain() if self.fetcher else {"fetch": "no fetch step"}
+        stages.update(self.maker.explain() if self.maker else {"build": "no build step"})
+        return stages
+
     def fetch(self):
 
         if self.fetcher:
@@ -0,0 +1,290 @@
+# edpm/engine/cooperative.py
+
+"""
+Cooperative installs: several edpm processes (e.g. on different farm nodes) that share
+top_dir on a network filesystem install one plan together ('edpm install --cooperative').
+
+All coordination goes through files in {top_dir}/.edpm/queue:
+
+    <package>.lease    a worker claimed the package. Created with O_EXCL, so only one
+                       worker gets it. The owner touches it every heartbeat_interval,
+                       a lease older than lease_timeout is stale and can be taken over
+    <package>.done     the package is installed and published to the lock file
+    <package>.failed   the install failed, dependent packages are not built
+    _lockfile.lease    mutex for read-modify-write of the shared lock file
+
+A worker picks a package whose prerequisites (see PlanFile.package_dependencies) are done,
+the one with the longest remaining path by recorded build times first (see engine/build_times.py),
+builds it with its own scratch lock and env files, then publishes the package entry into
+the shared lock file under the mutex. Packages whose prerequisites aren't ready wait.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Dict, List
+
+from edpm.engine.build_times import format_duration, remaining_paths
+from edpm.engine.lockfile import LockfileConfig
+from edpm.engine.output import markup_print as mprint
+from edpm.engine.tracing import span
+
+QUEUE_SUBDIR = os.path.join(".edpm", "queue")
+
+
+def queue_dir(top_dir: str) -> str:
+    return os.path.join(top_dir, QUEUE_SUBDIR)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _write_json(path: str, data: dict):
+    tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+class Lease:
+    """
+    A lease file with heartbeats. Only one worker holds a lease at a time.
+    Stale leases (no heartbeat for lease_timeout seconds) are taken over.
+    """
+
+    def __init__(self, path: str, owner: str, lease_timeout: float = 60, heartbeat_interval: float = 10):
+        self.path = path
+        self.owner = owner
+        self.lease_timeout = lease_timeout
+        self.heartbeat_interval = heartbeat_interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def is_stale(self) -> bool:
+        try:
+            return time.time() - os.stat(self.path).st_mtime > self.lease_timeout
+        except FileNotFoundError:
+            return False
+
+    def _create(self) -> bool:
+        try:
+            fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"owner": self.owner, "host": socket.gethostname(), "pid": os.getpid()}, f)
+        return True
+
+    def _break_stale(self):
+        """Moves a stale lease away. If it was refreshed in between, puts it back"""
+        aside = f"{self.path}.stale-{uuid.uuid4().hex[:8]}"
+        try:
+            os.rename(self.path, aside)
+        except FileNotFoundError:
+            return
+        if time.time() - os.stat(aside).st_mtime <= self.lease_timeout:
+            try:
+                os.link(aside, self.path)   # fails if somebody created a new lease already
+            except OSError:
+                pass
+        os.unlink(aside)
+
+    def acquire(self) -> bool:
+        """Tries to take the lease once. Starts heartbeats on success"""
+        if not self._create():
+            if not self.is_stale():
+                return False
+            self._break_stale()
+            if not self._create():
+                return False
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._heartbeat, daemon=True)
+        self._thread.start()
+        return True
+
+    def acquire_wait(self, poll_interval: float = 0.1):
+        while not self.acquire():
+            time.sleep(poll_interval)
+
+    def _heartbeat(self):
+        while not self._stop.wait(self.heartbeat_interval):
+            try:
+                os.utime(self.path, None)
+            except OSError:
+                pass
+
+    def release(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        self.acquire_wait()
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+
+class CooperativeInstaller:
+    """
+    One worker of a cooperative install. Run the same plan with several workers
+    (processes or nodes), each of them calls run().
+    """
+
+    def __init__(self, api, dep_names: List[str], force: bool = False, worker_id: str = "",
+                 lease_timeout: float = 60, heartbeat_interval: float = 10, poll_interval: float = 2):
+        self.api = api
+        self.dep_names = list(dep_names)
+        self.force = force
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_timeout = lease_timeout
+        self.heartbeat_interval = heartbeat_interval
+        self.poll_interval = poll_interval
+
+        self.shared_lock_file = api.lock_file
+        self.queue = queue_dir(api.top_dir)
+        os.makedirs(self.queue, exist_ok=True)
+
+        # Plan order is the fallback dependency order, only prerequisites from this install matter
+        deps = api.plan.package_dependencies()
+        self.prerequisites: Dict[str, List[str]] = {
+            name: [d for d in deps.get(name, []) if d in self.dep_names] for name in self.dep_names
+        }
+        self.built: List[str] = []
+
+        # Critical path first: ready packages with the longest chain of work behind them start first
+        self.estimates = api.estimate_build_times(self.dep_names)
+        self.priority = remaining_paths(self.dep_names, self.prerequisites, self.estimates)
+
+    def _path(self, dep_name: str, kind: str) -> str:
+        return os.path.join(self.queue, f"{dep_name}.{kind}")
+
+    def _lease(self, name: str) -> Lease:
+        return Lease(self._path(name, "lease"), self.worker_id, self.lease_timeout, self.heartbeat_interval)
+
+    def lock_mutex(self) -> Lease:
+        """Mutex for read-modify-write of the shared lock file"""
+        return Lease(os.path.join(self.queue, "_lockfile.lease"), self.worker_id,
+                     self.lease_timeout, self.heartbeat_interval)
+
+    def reset(self):
+        """
+        Removes done/failed markers of a previous cooperative install of these packages.
+        Run once before starting workers to retry failed packages or to force a rebuild
+        """
+        for name in self.dep_names:
+            for kind in ("done", "failed"):
+                try:
+                    os.unlink(self._path(name, kind))
+                except FileNotFoundError:
+                    pass
+
+    def _reload_lock(self):
+        """Loads the shared lock. Saves of this worker go to its scratch lock file"""
+        lock = LockfileConfig()
+        lock.load(self.shared_lock_file)
+        lock.file_path = os.path.join(self.queue, f"lock-{self.worker_id}.yaml")
+        self.api.lock = lock
+
+    def status(self, dep_name: str) -> str:
+        """
+        'done', 'failed' or 'pending'. Without force a package is done when the shared lock has it
+        installed. With force only packages rebuilt in this run (.done marker) are done
+        """
+        if os.path.exists(self._path(dep_name, "failed")):
+            return "failed"
+        if self.force:
+            return "done" if os.path.exists(self._path(dep_name, "done")) else "pending"
+        return "done" if self.api.lock.is_installed(dep_name) else "pending"
+
+    def _is_blocked(self, dep_name: str, statuses: Dict[str, str]) -> bool:
+        """A prerequisite failed (or is blocked itself), so the package can't be built"""
+        for prereq in self.prerequisites[dep_name]:
+            if statuses[prereq] == "failed" or self._is_blocked(prereq, statuses):
+                return True
+        return False
+
+    def _publish(self, dep_name: str):
+        """Merges the package entry into the shared lock file"""
+        entry = self.api.lock.get_installed_package(dep_name)
+        with self.lock_mutex():
+            shared = LockfileConfig()
+            shared.load(self.shared_lock_file)
+            shared.update_package(dep_name, dict(entry))
+            shared.save(self.shared_lock_file)
+        _write_json(self._path(dep_name, "done"), {
+            "worker": self.worker_id,
+            "install_path": entry.get("install_path", ""),
+            "time": time.time(),
+        })
+
+    def _build(self, dep_name: str, lease: Lease):
+        mprint("<magenta>[{}]</magenta> claimed <blue>{}</blue> (est. {})",
+               self.worker_id, dep_name, format_duration(self.estimates.get(dep_name)))
+        try:
+            with span(dep_name, "package"):
+                self.api._install_single_dependency(dep_name, self.force)
+            with span("publish", "phase"):
+                self._publish(dep_name)
+            self.built.append(dep_name)
+        except Exception as ex:
+            _write_json(self._path(dep_name, "failed"), {"worker": self.worker_id, "error": str(ex)})
+            mprint("<red>[{}] {} failed:</red> {}", self.worker_id, dep_name, ex)
+        finally:
+            lease.release()
+
+    def run(self) -> Dict[str, List[str]]:
+        """
+        Claims and builds packages until all of them are done, failed or blocked by a failure.
+        Returns {'built': [...by this worker], 'failed': [...], 'blocked': [...]}
+        """
+        # Every worker writes env files of its builds to its own file
+        self.api.build_env_file = os.path.join(self.queue, f"env-{self.worker_id}.sh")
+
+        while True:
+            self._reload_lock()
+            statuses = {name: self.status(name) for name in self.dep_names}
+            pending = [n for n in self.dep_names if statuses[n] == "pending" and not self._is_blocked(n, statuses)]
+            if not pending:
+                break
+            pending.sort(key=lambda n: self.priority[n], reverse=True)
+
+            claimed = False
+            for dep_name in pending:
+                if any(statuses[p] != "done" for p in self.prerequisites[dep_name]):
+                    continue    # waits for prerequisites
+                lease = self._lease(dep_name)
+                if not lease.acquire():
+                    continue    # somebody builds it
+                # It could be finished between our status check and the claim
+                self._reload_lock()
+                if self.status(dep_name) != "pending":
+                    lease.release()
+                    continue
+                self._build(dep_name, lease)
+                claimed = True
+                break
+
+            if not claimed:
+                time.sleep(self.poll_interval)
+
+        # Back to the shared lock file, e.g. to regenerate env files
+        self._reload_lock()
+        self.api.lock.file_path = self.shared_lock_file
+        self.api.build_env_file = ""
+        statuses = {name: self.status(name) for name in self.dep_names}
+        return {
+            "built": list(self.built),
+            "failed": [n for n in self.dep_names if statuses[n] == "failed"],
+            "blocked": [n for n in self.dep_names if statuses[n] == "pending"],
+        }
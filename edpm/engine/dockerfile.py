@@ -0,0 +1,134 @@
+# edpm/engine/dockerfile.py
+
+"""
+Generates layer-cache friendly Dockerfiles from a plan ('edpm dockerfile').
+
+Each package gets its own RUN layer that appends just this package entry to the
+plan inside the image and installs it. So the text of a layer (and the Docker cache
+key) depends only on that package's config and on the layers above it. Changing the
+last package in the plan rebuilds one layer, not the whole stack.
+
+The build stage gets python, compilers, cmake and git with apt-get if the base image
+doesn't have them, edpm is installed into a venv. Sources, build dirs and the compiler
+cache are cache mounts, so they are kept between builds but never end up in the layers.
+The final stage copies top_dir without {top_dir}/.edpm, so it has only install trees
+and generated env/CMake files.
+"""
+
+import json
+import shlex
+from typing import Any, List
+
+from edpm.engine.planfile import PlanFile
+from edpm.engine.versions import version_key
+
+DEFAULT_BASE_IMAGE = "ubuntu:24.04"
+DEFAULT_TOP_DIR = "/opt/software"
+DEFAULT_WORKDIR = "/opt/edpm"
+CCACHE_DIR = "/root/.ccache"
+
+# edpm goes to a venv: Ubuntu 24.04 and Debian 12 refuse 'pip install' into the system python (PEP 668)
+VENV_DIR = "/opt/edpm-venv"
+# Installed with apt-get if the base image misses any of the tools
+BUILD_TOOLS = ["python3", "c++", "make", "cmake", "git"]
+BUILD_PACKAGES = "python3 python3-pip python3-venv build-essential cmake git ca-certificates curl"
+
+
+def _plain(data: Any) -> Any:
+    """ruamel round-trip types to plain python types (for json.dumps)"""
+    return json.loads(json.dumps(data, default=str))
+
+
+def _printf_line(text: str) -> str:
+    return f"printf '%s\\n' {shlex.quote(text)}"
+
+
+def _package_layer(name: str, entry: Any, key: str, top_dir: str, ccache: bool) -> List[str]:
+    """RUN instruction that adds one plan entry and installs it"""
+    app_path = f"{top_dir}/{name}"
+    mounts = [
+        f"--mount=type=cache,id=edpm-src-{name}-{key},target={app_path}/src",
+        f"--mount=type=cache,id=edpm-build-{name}-{key},target={app_path}/build",
+    ]
+    if ccache:
+        mounts.append(f"--mount=type=cache,id=edpm-ccache,target={CCACHE_DIR}")
+
+    # A plan entry in YAML flow style (JSON is valid YAML)
+    plan_line = "  - " + json.dumps(_plain(entry), sort_keys=True)
+    command = f"{_printf_line(plan_line)} >> plan.edpm.yaml && edpm install {name}"
+    return [f"### {name}  (config {key})", "RUN " + " \\\n    ".join(mounts + [command])]
+
+
+def generate_dockerfile(plan: PlanFile,
+                        base_image: str = DEFAULT_BASE_IMAGE,
+                        runtime_image: str = "",
+                        top_dir: str = DEFAULT_TOP_DIR,
+                        workdir: str = DEFAULT_WORKDIR,
+                        edpm_pip: str = "edpm",
+                        ccache: bool = True,
+                        plan_name: str = "plan.edpm.yaml") -> str:
+    """Returns Dockerfile text for the plan"""
+    global_line = "global: " + json.dumps(_plain(plan.data["global"]), sort_keys=True)
+    global_config = dict(plan.global_config())
+
+    out = [
+        "# syntax=docker/dockerfile:1.4",
+        f"# Generated by 'edpm dockerfile' from {plan_name}",
+        "# One layer per package in plan order. A layer changes only if its package config changes.",
+        "# Build: DOCKER_BUILDKIT=1 docker build -t <image> .",
+        "",
+        f"ARG BASE_IMAGE={base_image}",
+        f"ARG RUNTIME_IMAGE={runtime_image or base_image}",
+        "",
+        "FROM ${BASE_IMAGE} AS build",
+        "SHELL [\"/bin/bash\", \"-c\"]",
+        f"WORKDIR {workdir}",
+    ]
+    tools_check = " && ".join(f"command -v {tool}" for tool in BUILD_TOOLS) + " && python3 -c 'import ensurepip'"
+    out += [
+        "# Bare base images (e.g. the default ubuntu) get python, compilers, cmake and git",
+        f"RUN ({tools_check}) > /dev/null 2>&1 || \\",
+        f"    (apt-get update && apt-get install -y --no-install-recommends {BUILD_PACKAGES} && \\",
+        "     rm -rf /var/lib/apt/lists/*)",
+        f"ENV PATH={VENV_DIR}/bin:$PATH",
+    ]
+    if ccache:
+        out += [
+            f"ENV CCACHE_DIR={CCACHE_DIR} \\",
+            "    CMAKE_C_COMPILER_LAUNCHER=ccache \\",
+            "    CMAKE_CXX_COMPILER_LAUNCHER=ccache",
+            "RUN command -v ccache || (apt-get update && apt-get install -y ccache && rm -rf /var/lib/apt/lists/*)",
+        ]
+    out += [
+        f"RUN python3 -m venv --system-site-packages {VENV_DIR} && {VENV_DIR}/bin/pip install {edpm_pip}",
+        "",
+        "### Plan global section",
+        f"RUN {_printf_line(global_line)} 'packages:' > plan.edpm.yaml && \\",
+        f"    edpm --top-dir={top_dir}",
+        "",
+    ]
+
+    for package in plan.packages():
+        entry = next(item for item in plan.data["packages"]
+                     if (isinstance(item, str) and item.split("@", 1)[0] == package.name)
+                     or (isinstance(item, dict) and package.name in item))
+        if "existing" in package.config:
+            out += [f"# {package.name}: skipped, 'existing' installations on the host can't be used in an image", ""]
+            continue
+        key = version_key({**global_config, **package.config})
+        out += _package_layer(package.name, entry, key, top_dir, ccache)
+        out.append("")
+
+    out += [
+        "# edpm state (binary and wheel caches, manifests, trash, build times) stays out of the final image",
+        f"RUN rm -rf {top_dir}/.edpm",
+        "",
+        "# Only install trees and generated env/CMake files go to the final image",
+        "FROM ${RUNTIME_IMAGE} AS runtime",
+        f"COPY --from=build {top_dir} {top_dir}",
+        f"COPY --from=build {workdir} {workdir}",
+        f"WORKDIR {workdir}",
+        f"RUN echo 'source {top_dir}/env.sh' >> /etc/bash.bashrc",
+        "",
+    ]
+    return "\n".join(out)
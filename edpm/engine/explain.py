@@ -0,0 +1,189 @@
+# edpm/engine/explain.py
+
+"""
+Execution plan of an install ('edpm install --explain'), computed without running anything.
+
+For each package: what happens to it (already installed, switch to a stored side-by-side
+version, reference an existing installation, take it from the binary cache or build),
+the merged config, what each recipe stage would do (see Recipe.explain, e.g. sources
+already fetched or a CMake cache to reuse) and the estimated time from the build-time
+history (engine/build_times.py). Cached packages take no build time and are not scheduled.
+
+Then the schedule: packages to build grouped in waves, packages of one wave don't depend
+on each other and can be built in parallel by cooperative workers. The total is estimated
+for a sequential install and for unlimited workers (the critical path).
+
+It only reads the plan, the lock file, a few directories, the build-time DB and binary
+cache metadata, so it is cheap enough to run in every CI job before deciding to build.
+"""
+
+import json
+import os
+from typing import Any, Dict, List
+
+from edpm.engine import binary_cache
+from edpm.engine.build_times import format_duration, remaining_paths
+from edpm.engine.output import markup_print as mprint
+from edpm.engine.versions import version_key, version_label
+
+# Packages without build history count as this in schedule estimates
+DEFAULT_ESTIMATE = 60.0
+
+
+def _package_action(api, dep_name: str, config: Dict[str, Any], force: bool) -> Dict[str, str]:
+    """Same decisions as EdpmApi.install_dependency_chain and _install_single_dependency"""
+    lock = api.lock
+    ver_key = version_key(config) if config.get("versioned_installs", False) else ""
+    if not force and lock.is_installed(dep_name) and not api._is_other_version_wanted(dep_name):
+        return {"action": "installed", "detail": lock.get_installed_package(dep_name).get("install_path", "")}
+    if ver_key and not force:
+        stored = lock.get_versions(dep_name).get(ver_key, {})
+        if os.path.isdir(stored.get("install_path", "")):
+            return {"action": "switch", "detail": f"stored version {ver_key} at {stored['install_path']}"}
+    if "existing" in config:
+        return {"action": "reference", "detail": str(config["existing"])}
+    return {"action": "build", "detail": ""}
+
+
+def _cached_artifact(api, dep_name: str, config: Dict[str, Any]):
+    """Metadata of the binary cache artifact an install would use instead of building, or None"""
+    try:
+        key_info = api.binary_cache_key(dep_name)
+        if not key_info:
+            return None
+        local, remotes = api.binary_cache_stores(config)
+        return binary_cache.find_artifact(local, remotes, dep_name, key_info["key"])
+    except (binary_cache.CacheError, OSError, ValueError):
+        return None     # install would build then
+
+
+def _waves(names: List[str], prerequisites: Dict[str, List[str]]) -> List[List[str]]:
+    """Packages grouped by the longest chain of prerequisites before them, in plan order"""
+    level: Dict[str, int] = {}
+    for name in names:     # plan order: prerequisites come first
+        level[name] = 1 + max((level.get(p, 0) for p in prerequisites.get(name, [])), default=0)
+    waves: List[List[str]] = [[] for _ in range(max(level.values(), default=0))]
+    for name in names:
+        waves[level[name] - 1].append(name)
+    return waves
+
+
+def _critical_chain(names: List[str], prerequisites: Dict[str, List[str]], paths: Dict[str, float]) -> List[str]:
+    dependents: Dict[str, List[str]] = {name: [] for name in names}
+    for name in names:
+        for prereq in prerequisites.get(name, []):
+            dependents[prereq].append(name)
+    starts = [name for name in names if not prerequisites.get(name)]
+    chain = [max(starts, key=lambda n: paths[n])] if starts else []
+    while chain and dependents[chain[-1]]:
+        chain.append(max(dependents[chain[-1]], key=lambda n: paths[n]))
+    return chain
+
+
+def explain_install(api, dep_names: List[str], force: bool = False) -> Dict[str, Any]:
+    """
+    Resolved install plan: {'top_dir':..., 'packages': [{name, action, detail, config, stages,
+    estimate, prerequisites}], 'schedule': {waves, sequential, critical_path, critical_chain, unknown}}
+    """
+    db = api.build_time_db() if api.top_dir else None
+    all_deps = api.plan.package_dependencies()
+
+    packages = []
+    for dep_name in dep_names:
+        dep_obj = api.plan.find_package(dep_name)
+        if not dep_obj:
+            packages.append({"name": dep_name, "action": "error", "detail": "not in the plan",
+                             "config": {}, "stages": {}, "estimate": None, "prerequisites": []})
+            continue
+
+        config = api._combined_config(dep_obj)
+        entry = {"name": dep_name, **_package_action(api, dep_name, config, force),
+                 "stages": {}, "estimate": None,
+                 "prerequisites": [d for d in all_deps.get(dep_name, []) if d in dep_names]}
+
+        if entry["action"] == "build" and not force and config.get("binary_cache"):
+            cached = _cached_artifact(api, dep_name, config)
+            if cached:
+                entry.update({"action": "cached", "estimate": 0.0,
+                              "detail": f"{cached['key'][:12]} in {cached['store']}"})
+
+        if entry["action"] == "build":
+            ver_key = version_key(config) if config.get("versioned_installs", False) else ""
+            config["app_path"] = os.path.join(api.top_dir, dep_name, ver_key) if ver_key \
+                else os.path.join(api.top_dir, dep_name)
+            try:
+                # Recipe constructors only merge defaults and set dirs, preconfigure() isn't called
+                recipe = api.recipe_manager.create_recipe(dep_obj.name, config)
+                config = dict(recipe.config)
+                entry["stages"] = recipe.explain()
+            except Exception as ex:
+                entry["stages"] = {"error": str(ex)}
+            if db:
+                entry["estimate"] = db.estimate(dep_name, version_label(config), api.expected_build_threads(config))
+        elif entry["action"] in ("switch", "reference", "installed", "cached"):
+            entry["estimate"] = 0.0
+
+        entry["config"] = json.loads(json.dumps(config, default=str))
+        packages.append(entry)
+
+    to_build = [p["name"] for p in packages if p["action"] == "build"]
+    prerequisites = {p["name"]: [d for d in p["prerequisites"] if d in to_build]
+                     for p in packages if p["action"] == "build"}
+    estimates = {p["name"]: p["estimate"] for p in packages if p["action"] == "build"}
+    paths = remaining_paths(to_build, prerequisites, estimates, default=DEFAULT_ESTIMATE)
+    unknown = [name for name in to_build if estimates[name] is None]
+
+    return {
+        "top_dir": api.top_dir,
+        "packages": packages,
+        "schedule": {
+            "waves": _waves(to_build, prerequisites),
+            "sequential": sum(DEFAULT_ESTIMATE if e is None else e for e in estimates.values()),
+            "critical_path": max(paths.values(), default=0.0),
+            "critical_chain": _critical_chain(to_build, prerequisites, paths),
+            "unknown": unknown,
+        },
+    }
+
+
+_ACTION_COLORS = {"build": "green", "cached": "green", "switch": "blue", "reference": "blue", "installed": "blue", "error": "red"}
+
+
+def print_explain(result: Dict[str, Any]):
+    packages = result["packages"]
+    counts = {}
+    for p in packages:
+        counts[p["action"]] = counts.get(p["action"], 0) + 1
+    if not any(p["action"] != "installed" for p in packages):
+        mprint("Nothing to install!")
+        return
+
+    mprint("<b>Install plan (explain only)</b>, top_dir: {}", result["top_dir"] or "(not set)")
+    mprint("  " + ", ".join(f"{action}: {count}" for action, count in counts.items()))
+
+    for p in packages:
+        color = _ACTION_COLORS.get(p["action"], "blue")
+        detail = f"est. {format_duration(p['estimate'])}" if p["action"] == "build" else p["detail"]
+        mprint("\n<b><magenta>{}</magenta></b> <{}>{}</{}> {}", p["name"], color, p["action"], color, detail)
+        if p["action"] != "build":
+            continue
+        if p["prerequisites"]:
+            mprint("  after: {}", ", ".join(p["prerequisites"]))
+        for stage, description in p["stages"].items():
+            mprint("  <blue>{:<10}</blue> {}", stage, description)
+        mprint("  config:")
+        for key in sorted(p["config"]):
+            mprint("    {}: {}", key, json.dumps(p["config"][key]))
+
+    schedule = result["schedule"]
+    if not schedule["waves"]:
+        return
+    mprint("\n<b>Schedule</b> (packages of one wave can be built in parallel with --cooperative):")
+    for i, wave in enumerate(schedule["waves"]):
+        mprint("  wave {}: {}", i + 1, ", ".join(wave))
+    mprint("<b>Estimated time:</b> {} sequential, {} with unlimited workers (critical path: {})",
+           format_duration(schedule["sequential"]), format_duration(schedule["critical_path"]),
+           " -> ".join(schedule["critical_chain"]))
+    if schedule["unknown"]:
+        mprint("  no build history, counted as {}: {}",
+               format_duration(DEFAULT_ESTIMATE), ", ".join(schedule["unknown"]))
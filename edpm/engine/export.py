@@ -0,0 +1,189 @@
+# edpm/engine/export.py
+
+"""
+Export of installed packages into a new root ('edpm export').
+
+Install trees (and with install_only=False also source and build dirs) are copied
+or hardlinked under the target root, one package per thread. The lock file is
+rewritten for the new root and env/CMake files are generated from it, so the target
+can be deployed as is (containers, CVMFS-style publication).
+
+Paths under top_dir keep their relative layout: {top_dir}/root/root-install goes to
+{target}/root/root-install. Packages not owned by edpm ('existing') are not copied,
+the exported lock keeps referencing them.
+"""
+
+import copy
+import os
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from edpm.engine.gc import package_dirs
+from edpm.engine.lockfile import LockfileConfig
+from edpm.engine.manifest import MANIFEST_KEY, default_threads
+from edpm.engine.versions import VERSIONS_KEY
+
+ELF_MAGIC = b"\x7fELF"
+
+
+def is_elf(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(4) == ELF_MAGIC
+    except OSError:
+        return False
+
+
+def strip_binary(path: str) -> bool:
+    """Strips debug info and unneeded symbols. Returns False if strip failed or isn't available"""
+    try:
+        return subprocess.run(["strip", "--strip-unneeded", path],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0
+    except OSError:
+        return False
+
+
+class ExportStats:
+    def __init__(self):
+        self.files = 0
+        self.linked = 0
+        self.bytes = 0
+        self.stripped = 0
+
+
+def copy_tree(src: str, dst: str, hardlink: bool = False, strip: bool = False,
+              path_map: Optional[Dict[str, str]] = None) -> ExportStats:
+    """
+    Copies (or hardlinks) a tree preserving symlinks and mtimes.
+
+    :param strip: strip ELF files. They are always copied then, so the originals stay intact
+    :param path_map: {old prefix: new prefix} for absolute symlink targets
+    """
+    stats = ExportStats()
+    path_map = path_map or {}
+    for dir_path, dir_names, file_names in os.walk(src):
+        rel_dir = os.path.relpath(dir_path, src)
+        target_dir = os.path.normpath(os.path.join(dst, rel_dir))
+        os.makedirs(target_dir, exist_ok=True)
+
+        # Symlinked dirs are copied as links
+        for dir_name in list(dir_names):
+            if os.path.islink(os.path.join(dir_path, dir_name)):
+                dir_names.remove(dir_name)
+                file_names.append(dir_name)
+
+        for file_name in file_names:
+            src_file = os.path.join(dir_path, file_name)
+            dst_file = os.path.join(target_dir, file_name)
+            if os.path.lexists(dst_file):
+                os.unlink(dst_file)
+
+            if os.path.islink(src_file):
+                link = os.readlink(src_file)
+                for old, new in path_map.items():
+                    if link == old or link.startswith(old + os.sep):
+                        link = new + link[len(old):]
+                        break
+                os.symlink(link, dst_file)
+                continue
+
+            stats.files += 1
+            stats.bytes += os.path.getsize(src_file)
+            to_strip = strip and is_elf(src_file)
+            if hardlink and not to_strip:
+                try:
+                    os.link(src_file, dst_file)
+                    stats.linked += 1
+                    continue
+                except OSError:
+                    pass    # other filesystem => copy
+            shutil.copy2(src_file, dst_file)
+            if to_strip and strip_binary(dst_file):
+                stats.stripped += 1
+    return stats
+
+
+def _map_prefix(value: Any, path_map: Dict[str, str]) -> Any:
+    """Rewrites path prefixes in strings, lists and dicts"""
+    if isinstance(value, str):
+        for old, new in path_map.items():
+            if value == old or value.startswith(old + os.sep):
+                return new + value[len(old):]
+        return value
+    if isinstance(value, dict):
+        for k in value:
+            value[k] = _map_prefix(value[k], path_map)
+        return value
+    if isinstance(value, list):
+        for i, item in enumerate(value):
+            value[i] = _map_prefix(item, path_map)
+        return value
+    return value
+
+
+def plan_export(lock: LockfileConfig, target: str, install_only: bool = True) -> List[Dict[str, str]]:
+    """
+    What to copy: [{'package':..., 'src':..., 'dst':...}]. Owned packages with an existing
+    install dir only. Dirs outside top_dir go to {target}/<package>/<dir name>
+    """
+    top_dir = os.path.normpath(lock.top_dir)
+    result = []
+    for name in lock.get_installed_packages():
+        dep_data = lock.get_installed_package(name)
+        if not dep_data.get("owned", True) or not lock.is_installed(name):
+            continue
+        dirs = package_dirs(dep_data)
+        kinds = ["install"] if install_only else ["install", "src", "build"]
+        for kind in kinds:
+            path = os.path.normpath(dirs[kind]) if dirs[kind] else ""
+            if not path or not os.path.isdir(path):
+                continue
+            if path.startswith(top_dir + os.sep):
+                dst = os.path.join(target, os.path.relpath(path, top_dir))
+            else:
+                dst = os.path.join(target, name, os.path.basename(path))
+            result.append({"package": name, "kind": kind, "src": path, "dst": dst})
+    return result
+
+
+def export_packages(lock: LockfileConfig, target: str,
+                    install_only: bool = True, hardlink: bool = False, strip: bool = False,
+                    threads: int = 0) -> Tuple[LockfileConfig, Dict[str, ExportStats]]:
+    """
+    Copies packages to target in parallel and returns (lock rewritten for target, stats per package).
+    The returned lock is not saved
+    """
+    target = os.path.abspath(target)
+    items = plan_export(lock, target, install_only)
+
+    # Longer prefixes first, so a package dir outside top_dir wins over top_dir itself
+    path_map = {item["src"]: item["dst"] for item in items}
+    if lock.top_dir:
+        path_map[os.path.normpath(lock.top_dir)] = target
+    path_map = dict(sorted(path_map.items(), key=lambda kv: len(kv[0]), reverse=True))
+
+    def export_one(item):
+        return item["package"], copy_tree(item["src"], item["dst"], hardlink=hardlink, strip=strip, path_map=path_map)
+
+    stats: Dict[str, ExportStats] = {}
+    with ThreadPoolExecutor(max_workers=threads or default_threads()) as executor:
+        for name, item_stats in executor.map(export_one, items):
+            total = stats.setdefault(name, ExportStats())
+            for field in ("files", "linked", "bytes", "stripped"):
+                setattr(total, field, getattr(total, field) + getattr(item_stats, field))
+
+    # Lock file for the new root. Only the active entries, manifests don't match stripped files
+    exported = LockfileConfig()
+    exported.data = copy.deepcopy(lock.data)
+    exported.view_dir = ""
+    exported.top_dir = target
+    exported_names = {item["package"] for item in items}
+    for name in exported.get_installed_packages():
+        dep_data = exported.data["packages"][name]
+        dep_data.pop(VERSIONS_KEY, None)
+        dep_data.pop(MANIFEST_KEY, None)
+        if name in exported_names:
+            _map_prefix(dep_data, path_map)
+    return exported, stats
@@ -2,6 +2,7 @@ import os
 from abc import ABC, abstractmethod
 from typing import Dict, Any
 from edpm.engine.commands import run, workdir
+from edpm.engine.simulate import simulate_params, simulate_work, write_files
 
 
 # -------------------------------------
@@ -29,6 +30,10 @@ class IFetcher(ABC):
         """
         pass
 
+    def explain(self) -> Dict[str, str]:
+        """What fetch() would do now, {stage: description}. For 'edpm install --explain'"""
+        return {"fetch": "run"}
+
 
 class GitFetcher(IFetcher):
     """
@@ -80,6 +85,13 @@ class GitFetcher(IFetcher):
         # Execute the clone
         run(clone_command)
 
+    def explain(self) -> Dict[str, str]:
+        source_path = self.config.get("source_path", "")
+        if os.path.isdir(source_path) and os.listdir(source_path):
+            return {"fetch": f"skip, already fetched to {source_path}"}
+        ref = self.config.get("version", "") or self.config.get("branch", "")
+        return {"fetch": f"git clone {self.config.get('url', '')} {ref}".rstrip()}
+
     def use_common_dirs_scheme(self):
         """Function sets common directory scheme."""
         if 'app_path' in self.config:
@@ -116,6 +128,9 @@ class TarballFetcher(IFetcher):
         extract_cmd = f"tar zxvf {self.config['tar_temp_name']} -C {source_path} --strip-components=1"
         run(extract_cmd)
 
+    def explain(self) -> Dict[str, str]:
+        return {"fetch": f"download {self.config.get('file_url', '')}"}
+
 
 class FileSystemFetcher(IFetcher):
     """
@@ -146,6 +161,32 @@ class FileSystemFetcher(IFetcher):
             # If user sets them the same, we do nothing.
             pass
 
+    def explain(self) -> Dict[str, str]:
+        path = self.config.get("path", "")
+        source_path = self.config.get("source_path", "")
+        if source_path and source_path != path:
+            return {"fetch": f"rsync {path} to {source_path}"}
+        return {"fetch": f"skip, sources used in place at {path}"}
+
+
+class SimulatedFetcher(IFetcher):
+    """
+    Doesn't download anything ('fetch: simulate'). Waits and writes files into source_path.
+    For orchestrator benchmarks, see engine/simulate.py
+    """
+
+    def fetch(self):
+        source_path = self.config.get("source_path", "")
+        if not source_path:
+            raise ValueError("[SimulatedFetcher] 'source_path' is not set in config.")
+        params = simulate_params(self.config, "fetch")
+        os.makedirs(source_path, exist_ok=True)
+        simulate_work(params["seconds"], params["mode"])
+        write_files(source_path, params["files"], params["size"], suffix=".cpp")
+
+    def explain(self) -> Dict[str, str]:
+        return {"fetch": "simulate {}s".format(simulate_params(self.config, "fetch")["seconds"])}
+
 
 def make_fetcher(config: Dict[str, Any]) -> IFetcher:
     """
@@ -157,6 +198,9 @@ def make_fetcher(config: Dict[str, Any]) -> IFetcher:
         # No fetch step
         return None
 
+    if fetch_val == "simulate":
+        return SimulatedFetcher(config)
+
     # If user explicitly says "git", "tarball", or "filesystem"
     if fetch_val in ("git", "tarball", "filesystem"):
         if fetch_val == "git":
@@ -0,0 +1,147 @@
+# edpm/engine/gc.py
+
+"""
+Disk usage accounting and retention policies for 'edpm gc'.
+
+Every owned package has up to three directories: sources, build and install.
+Sources and builds are rarely needed after install and for ROOT + Geant4 + ACTS
+take tens of GB. The policies decide which of them can be reclaimed:
+
+  - build dirs are kept only for the N most recently changed packages
+  - sources are dropped if the fetcher can restore them (git or tarball),
+    except for packages whose build dir is kept
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List
+
+from edpm.engine.fetchers import make_fetcher, GitFetcher, TarballFetcher
+
+# Directory kinds in the order they are printed
+DIR_KINDS = ("src", "build", "install")
+
+
+def _scan_tree(path: str) -> int:
+    """Disk usage of a tree in bytes. Symlinks are not followed"""
+    total = 0
+    stack = [path]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    total += getattr(st, "st_blocks", 0) * 512 or st.st_size
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+        except OSError:
+            continue
+    return total
+
+
+def scan_sizes(paths: Iterable[str], threads: int = 0) -> Dict[str, int]:
+    """
+    Disk usage of several trees. Each tree is split into its top level subdirectories,
+    and those are scanned in parallel, so one huge tree doesn't serialize the scan.
+    """
+    paths = [p for p in dict.fromkeys(paths) if p]
+    sizes = {p: 0 for p in paths}
+
+    with ThreadPoolExecutor(max_workers=threads or min(32, (os.cpu_count() or 1) + 4)) as executor:
+        futures = []
+        for path in paths:
+            if not os.path.isdir(path):
+                continue
+            try:
+                entries = list(os.scandir(path))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    futures.append((path, executor.submit(_scan_tree, entry.path)))
+                st = entry.stat(follow_symlinks=False)
+                sizes[path] += getattr(st, "st_blocks", 0) * 512 or st.st_size
+        for path, future in futures:
+            sizes[path] += future.result()
+    return sizes
+
+
+def human_size(size: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def package_dirs(dep_data: Dict[str, Any]) -> Dict[str, str]:
+    """{'src': ..., 'build': ..., 'install': ...} for a lock file package entry"""
+    config = dep_data.get("built_with_config", {})
+    return {
+        "src": config.get("source_path", ""),
+        "build": config.get("build_path", ""),
+        "install": dep_data.get("install_path", ""),
+    }
+
+
+def is_source_restorable(dep_data: Dict[str, Any]) -> bool:
+    """True if sources can be fetched again (git or tarball) and don't come from a local path"""
+    config = dict(dep_data.get("built_with_config", {}))
+    try:
+        fetcher = make_fetcher(config)
+    except Exception:
+        return False
+    return isinstance(fetcher, (GitFetcher, TarballFetcher))
+
+
+def _is_safe_to_remove(path: str, keep_path: str) -> bool:
+    """False if path doesn't exist or removing it would remove keep_path too"""
+    if not path or not os.path.isdir(path):
+        return False
+    if not keep_path:
+        return True
+    path = os.path.normpath(path)
+    keep_path = os.path.normpath(keep_path)
+    return path != keep_path and not keep_path.startswith(path + os.sep)
+
+
+def plan_gc(packages: Dict[str, Dict[str, Any]], keep_builds: int, drop_sources: bool) -> List[Dict[str, str]]:
+    """
+    Applies retention policies to lock file package entries.
+    Returns a list of {'package':..., 'kind': 'src'|'build', 'path':..., 'reason':...} to remove.
+    Packages not owned by edpm are never touched.
+    """
+    owned = {name: data for name, data in packages.items() if data.get("owned", True)}
+    result = []
+
+    # Build dirs: keep for N most recently changed packages
+    builds = []
+    for name, data in owned.items():
+        dirs = package_dirs(data)
+        if _is_safe_to_remove(dirs["build"], dirs["install"]):
+            builds.append((os.path.getmtime(dirs["build"]), name, dirs["build"]))
+    builds.sort(reverse=True)
+    kept_builds = [path for _, _, path in builds[:keep_builds]]
+    kept_build_packages = {name for _, name, _ in builds[:keep_builds]}
+    for _, name, path in builds[keep_builds:]:
+        result.append({"package": name, "kind": "build", "path": path,
+                       "reason": f"not among {keep_builds} most recently built"})
+
+    # Sources: drop the ones that can be fetched again
+    if drop_sources:
+        for name, data in sorted(owned.items()):
+            # A kept build dir is good for incremental rebuilds only with its sources
+            if name in kept_build_packages:
+                continue
+            dirs = package_dirs(data)
+            # In-source builds: sources hold a build dir we keep
+            if any(not _is_safe_to_remove(dirs["src"], kept) for kept in kept_builds):
+                continue
+            if _is_safe_to_remove(dirs["src"], dirs["install"]) and is_source_restorable(data):
+                result.append({"package": name, "kind": "src", "path": dirs["src"],
+                               "reason": "restorable by fetch"})
+    return result
@@ -3,8 +3,9 @@
 import os
 import json
 from ruamel.yaml import YAML
-from edpm.engine.config import ConfigNamespace
 from edpm.engine.generators.steps import CmakeSet, CmakePrefixPath
+from edpm.engine.view import rewrite_for_view
+from edpm.engine.install_index import get_cmake_config_dirs
 
 class CmakeGenerator:
     def __init__(self, plan, lock, recipe_manager):
@@ -16,7 +17,8 @@ class CmakeGenerator:
         """Build CMake toolchain content with recipe-generated settings"""
         lines = [
             "# Automatically generated by EDPM\n",
-            "# Do not edit by hand!\n\n"
+            "# Do not edit by hand!\n",
+            "# Needs CMake 3.15 or newer (list(PREPEND))\n\n"
         ]
 
         # Process global environment
@@ -26,6 +28,10 @@ class CmakeGenerator:
                 lines.append(f"{act.gen_cmake_line()}\n")
 
         # Process installed packages
+        view_seen = set()
+        prefix_paths = []       # consolidated CMAKE_PREFIX_PATH
+        explicit_vars = set()   # variables set by recipes explicitly
+        dir_hints = {}          # <Package>_DIR => dir with *Config.cmake
         for dep_name in sorted(self.lock.get_installed_packages()):
             dep_data = self.lock.get_installed_package(dep_name)
             ipath = dep_data.get("install_path", "")
@@ -34,20 +40,44 @@ class CmakeGenerator:
 
             # Get recipe-specific environment
             recipe_name = dep_name
-            recipe_cls = self.recipe_manager.recipes_by_name.get(dep_name)
-            recipe_actions = []
-            if recipe_cls:
-                recipe_actions = list(recipe_cls.gen_env(dep_data))
+            recipe_actions = self.recipe_manager.gen_env(dep_name, dep_data)
 
             # Get plan-defined environment
             dep_obj = self.plan.find_package(dep_name)
             plan_actions = dep_obj.env_block().parse({'install_dir': ipath}) if dep_obj else []
 
             # Combine and process all actions
-            for act in recipe_actions + plan_actions:
-                if hasattr(act, 'gen_cmake_line'):
+            actions = recipe_actions + plan_actions
+            if self.lock.view_dir:
+                actions = rewrite_for_view(actions, ipath, self.lock.view_dir, view_seen)
+            for act in actions:
+                if isinstance(act, CmakePrefixPath):
+                    if act.value not in prefix_paths:
+                        prefix_paths.append(act.value)
+                elif hasattr(act, 'gen_cmake_line'):
+                    if isinstance(act, CmakeSet):
+                        explicit_vars.add(act.name)
                     lines.append(f"{act.gen_cmake_line()}\n")
 
+            for name, config_dir in get_cmake_config_dirs(dep_data).items():
+                dir_hints.setdefault(f"{name}_DIR", config_dir)
+
+        # One prefix list instead of an if/list(INSERT) block per path.
+        # Same precedence as inserting each path at 0: the last package (by name) goes first
+        if prefix_paths:
+            lines.append("\n# Install prefixes of EDPM packages\n")
+            lines.append("list(PREPEND CMAKE_PREFIX_PATH\n")
+            for path in reversed(prefix_paths):
+                lines.append(f'    "{path}"\n')
+            lines.append(")\n")
+
+        # find_package(<Package>) goes straight to the config dir instead of probing each prefix
+        hints = {name: path for name, path in dir_hints.items() if name not in explicit_vars}
+        if hints:
+            lines.append("\n# Direct find_package() hints\n")
+            for name in sorted(hints):
+                lines.append(f'{CmakeSet(name, hints[name]).gen_cmake_line()}\n')
+
         return "".join(lines)
 
     def save_toolchain_with_infile(self, in_file: str, out_file: str):
@@ -84,33 +114,48 @@ class CmakeGenerator:
 
         cache_vars = preset["configurePresets"][0]["cacheVariables"]
         cmake_vars = {}
+        prefix_paths = []
+        dir_hints = {}
 
         # Collect variables from all sources
+        view_seen = set()
         for package_name in sorted(self.lock.get_installed_packages()):
             dep_data = self.lock.get_installed_package(package_name)
             ipath = dep_data.get("install_path", "")
             if not ipath:
                 continue
 
+            actions = []
+
             # Recipe-generated variables
-            recipe_name = self.recipe_manager.recipes_by_name.get(package_name)
-            recipe_cls = self.recipe_manager.recipes_by_name.get(recipe_name)
-            if recipe_cls:
-                recipe = recipe_cls(config=ConfigNamespace(**dep_data.get('built_with_config', {})))
-                for action in recipe.gen_env({'install_path': ipath}):
-                    if isinstance(action, (CmakeSet, CmakePrefixPath)):
-                        cmake_vars[action.name] = action.value
+            actions.extend(self.recipe_manager.gen_env(package_name, dep_data))
 
             # Plan-defined variables
             dep_obj = self.plan.find_package(package_name)
             if dep_obj:
-                for action in dep_obj.env_block().parse({'install_dir': ipath}):
-                    if isinstance(action, (CmakeSet, CmakePrefixPath)):
-                        cmake_vars[action.name] = action.value
+                actions.extend(dep_obj.env_block().parse({'install_dir': ipath}))
+
+            if self.lock.view_dir:
+                actions = rewrite_for_view(actions, ipath, self.lock.view_dir, view_seen)
+            for action in actions:
+                if isinstance(action, CmakePrefixPath):
+                    if action.value not in prefix_paths:
+                        prefix_paths.append(action.value)
+                elif isinstance(action, CmakeSet):
+                    cmake_vars[action.name] = action.value
+
+            for name, config_dir in get_cmake_config_dirs(dep_data).items():
+                dir_hints.setdefault(f"{name}_DIR", config_dir)
+
+        # Consolidated prefix list and direct <Package>_DIR hints
+        if prefix_paths:
+            cmake_vars["CMAKE_PREFIX_PATH"] = ";".join(reversed(prefix_paths))    # as in the toolchain
+        for name, config_dir in dir_hints.items():
+            cmake_vars.setdefault(name, config_dir)
 
         # Format variables for CMakePresets
-        for name, value in cmake_vars.items():
-            cache_vars[name] = {"value": value, "type": "STRING"}
+        for name in sorted(cmake_vars):
+            cache_vars[name] = {"value": cmake_vars[name], "type": "STRING"}
 
         return json.dumps(preset, indent=2)
 
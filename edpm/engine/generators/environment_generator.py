@@ -2,6 +2,25 @@
 
 import os
 
+from edpm.engine.generators.steps import EnvSet, EnvPrepend, EnvAppend
+from edpm.engine.view import rewrite_for_view
+
+# Dynamic loader search path variables. Not needed for packages installed with RPATH
+LIBRARY_PATH_VARS = ("LD_LIBRARY_PATH", "DYLD_LIBRARY_PATH")
+
+
+# Lock file field with the install RPATH of a package. Set on install, also from the binary cache
+RPATH_FIELD = "rpath"
+
+
+def is_rpath_installed(dep_data) -> bool:
+    """True if the package was built in RPATH install mode (see CmakeMaker 'use_rpath')"""
+    if RPATH_FIELD in dep_data:
+        return bool(dep_data[RPATH_FIELD])
+    # Lock files written before the field
+    return bool(dep_data.get("built_with_config", {}).get("install_rpath"))
+
+
 class EnvironmentGenerator:
     def __init__(self, plan, lock, recipe_manager):
         self.plan = plan
@@ -32,16 +51,22 @@ class EnvironmentGenerator:
                 lines.append(act.gen_csh() + "\n")
 
         # 2) Per dependency
+        view_dir = self.lock.view_dir
+        view_seen = set()
         package_names = self.lock.get_installed_packages()
         for package_name in sorted(package_names):
             dep_data = self.lock.get_installed_package(package_name)
             env_actions = []
 
-            # Get environment from recipe's gen_env
-            recipe_cls = self.recipe_manager.recipes_by_name.get(package_name)
-            if recipe_cls:
-                recipe_env_actions = list(recipe_cls.gen_env(dep_data))
-                env_actions.extend(recipe_env_actions)
+            # Get environment from recipe's (or maker's) gen_env
+            env_actions.extend(self.recipe_manager.gen_env(package_name, dep_data))
+
+            # RPATH installed packages find their libraries without loader path variables.
+            # Only recipe/maker paths are dropped, the plan 'environment:' is kept as written
+            if is_rpath_installed(dep_data):
+                env_actions = [act for act in env_actions
+                               if not (isinstance(act, (EnvSet, EnvPrepend, EnvAppend))
+                                       and act.name in LIBRARY_PATH_VARS)]
 
             install_path = dep_data.get("install_path", "")
             if not install_path or not os.path.isdir(install_path):
@@ -63,6 +88,10 @@ class EnvironmentGenerator:
             lines.append(f"\n# ----- ENV for {package_name} -----\n")
             placeholders = {"install_path": install_path}
             env_actions.extend(dep_obj.env_block().parse(placeholders))
+
+            # With a view, all packages share one entry per path variable
+            if view_dir:
+                env_actions = rewrite_for_view(env_actions, install_path, view_dir, view_seen)
             for act in env_actions:
                 if shell == "bash":
                     lines.append(act.gen_bash() + "\n")
@@ -0,0 +1,181 @@
+# edpm/engine/install_index.py
+
+"""
+Install tree index. After a package is installed, its install_path is scanned once
+and the layout is stored in the lock file under the package 'index' key:
+
+    index:
+      bin_dirs: [bin]
+      lib_dirs: [lib, lib64]
+      include_dirs: [include]
+      pkgconfig_dirs: [lib/pkgconfig]
+      python_dirs: [lib/python3.11/site-packages]
+      cmake_configs: {ROOT: cmake/ROOTConfig.cmake}
+      shared_libs: [lib/libCore.so, ...]
+
+All paths are relative to install_path. Generators use the index instead of probing
+the filesystem each time env files are written.
+
+The scan is bounded (top level, lib dirs and the standard find_package() locations),
+so it is cheap even for 'existing' packages like /usr/local.
+"""
+
+import glob
+import os
+from typing import Any, Dict, List
+
+INDEX_KEY = "index"
+
+BIN_DIR_NAMES = ["bin"]
+LIB_DIR_NAMES = ["lib", "lib64"]
+INCLUDE_DIR_NAMES = ["include"]
+PKGCONFIG_DIR_NAMES = ["lib/pkgconfig", "lib64/pkgconfig", "share/pkgconfig"]
+# 'pip install --prefix' layouts. Debian patched pythons put packages under local/
+PYTHON_DIR_GLOBS = ["lib*/python*/site-packages", "lib*/python*/dist-packages",
+                    "local/lib*/python*/site-packages", "local/lib*/python*/dist-packages"]
+
+SHARED_LIB_SUFFIXES = (".so", ".dylib")
+
+# Where find_package() looks for <Name>Config.cmake or <name>-config.cmake relative to a prefix
+CMAKE_CONFIG_GLOBS = [
+    "*Config.cmake", "*-config.cmake",
+    "cmake/*Config.cmake", "cmake/*-config.cmake",
+    "lib*/cmake/*/*Config.cmake", "lib*/cmake/*/*-config.cmake",
+    "lib*/*/cmake/*Config.cmake", "lib*/*/cmake/*-config.cmake",
+    "share/cmake/*/*Config.cmake", "share/cmake/*/*-config.cmake",
+    "share/*/cmake/*Config.cmake", "share/*/cmake/*-config.cmake",
+]
+
+
+def _cmake_package_name(config_file: str) -> str:
+    """ROOTConfig.cmake => ROOT, podio-config.cmake => podio"""
+    file_name = os.path.basename(config_file)
+    if file_name.endswith("-config.cmake"):
+        return file_name[:-len("-config.cmake")]
+    return file_name[:-len("Config.cmake")]
+
+
+def find_cmake_configs(install_path: str) -> Dict[str, str]:
+    """
+    Finds exported CMake package configs in install_path.
+    Returns {package name as in find_package(): config file path relative to install_path}
+    """
+    result = {}
+    for pattern in CMAKE_CONFIG_GLOBS:
+        for config_file in sorted(glob.glob(os.path.join(install_path, pattern))):
+            name = _cmake_package_name(config_file)
+            if name:
+                result.setdefault(name, os.path.relpath(config_file, install_path))
+    return result
+
+
+def find_cmake_config_dirs(install_path: str) -> Dict[str, str]:
+    """Returns {package name as in find_package(): directory with its *Config.cmake}"""
+    return {name: os.path.dirname(os.path.join(install_path, rel))
+            for name, rel in find_cmake_configs(install_path).items()}
+
+
+def _is_shared_lib(file_name: str) -> bool:
+    return file_name.endswith(SHARED_LIB_SUFFIXES) or ".so." in file_name
+
+
+def index_install_tree(install_path: str) -> Dict[str, Any]:
+    """Scans install_path once and returns its layout (see module docstring)"""
+    index = {
+        "bin_dirs": [],
+        "lib_dirs": [],
+        "include_dirs": [],
+        "pkgconfig_dirs": [],
+        "python_dirs": [],
+        "cmake_configs": {},
+        "shared_libs": [],
+    }
+    if not install_path or not os.path.isdir(install_path):
+        return index
+
+    top_level = set(os.listdir(install_path))
+    for key, names in (("bin_dirs", BIN_DIR_NAMES),
+                       ("lib_dirs", LIB_DIR_NAMES),
+                       ("include_dirs", INCLUDE_DIR_NAMES)):
+        index[key] = [name for name in names
+                      if name in top_level and os.path.isdir(os.path.join(install_path, name))]
+
+    # lib64 is often a symlink to lib. List each real directory once
+    seen_real = set()
+    for lib_dir in index["lib_dirs"]:
+        real_dir = os.path.realpath(os.path.join(install_path, lib_dir))
+        if real_dir in seen_real:
+            continue
+        seen_real.add(real_dir)
+        for entry in sorted(os.scandir(os.path.join(install_path, lib_dir)), key=lambda e: e.name):
+            if _is_shared_lib(entry.name) and not entry.is_dir():
+                index["shared_libs"].append(os.path.join(lib_dir, entry.name))
+
+    index["pkgconfig_dirs"] = find_pkgconfig_dirs(install_path)
+    index["python_dirs"] = find_python_dirs(install_path)
+    index["cmake_configs"] = find_cmake_configs(install_path)
+    return index
+
+
+def find_pkgconfig_dirs(install_path: str) -> List[str]:
+    """Dirs with *.pc files relative to install_path. lib64 linked to lib is listed once"""
+    result, seen_real = [], set()
+    for name in PKGCONFIG_DIR_NAMES:
+        path = os.path.join(install_path, name)
+        if os.path.isdir(path) and os.path.realpath(path) not in seen_real:
+            seen_real.add(os.path.realpath(path))
+            result.append(name)
+    return result
+
+
+def find_python_dirs(install_path: str) -> List[str]:
+    """site-packages dirs relative to install_path. lib64 linked to lib is listed once"""
+    result, seen_real = [], set()
+    for pattern in PYTHON_DIR_GLOBS:
+        for path in sorted(glob.glob(os.path.join(install_path, pattern))):
+            if os.path.isdir(path) and os.path.realpath(path) not in seen_real:
+                seen_real.add(os.path.realpath(path))
+                result.append(os.path.relpath(path, install_path))
+    return result
+
+
+def get_index(dep_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Index stored in a lock file package entry or None if the package was not indexed"""
+    return dep_data.get(INDEX_KEY) if dep_data else None
+
+
+def get_library_dirs(dep_data: Dict[str, Any]) -> List[str]:
+    """Absolute lib dirs of a package. Uses the index and probes the disk only if there is none"""
+    install_path = dep_data.get("install_path", "")
+    index = get_index(dep_data)
+    if index is not None:
+        names = index.get("lib_dirs", [])
+    else:
+        names = [name for name in LIB_DIR_NAMES if os.path.isdir(os.path.join(install_path, name))]
+    return [os.path.join(install_path, name) for name in names]
+
+
+def get_pkgconfig_dirs(dep_data: Dict[str, Any]) -> List[str]:
+    """Absolute pkg-config dirs of a package. Uses the index and probes the disk if there is none"""
+    install_path = dep_data.get("install_path", "")
+    index = get_index(dep_data)
+    names = index["pkgconfig_dirs"] if index and "pkgconfig_dirs" in index else find_pkgconfig_dirs(install_path)
+    return [os.path.join(install_path, name) for name in names]
+
+
+def get_python_dirs(dep_data: Dict[str, Any]) -> List[str]:
+    """Absolute site-packages dirs of a package. Uses the index and probes the disk if there is none"""
+    install_path = dep_data.get("install_path", "")
+    index = get_index(dep_data)
+    names = index["python_dirs"] if index and "python_dirs" in index else find_python_dirs(install_path)
+    return [os.path.join(install_path, name) for name in names]
+
+
+def get_cmake_config_dirs(dep_data: Dict[str, Any]) -> Dict[str, str]:
+    """{find_package() name: config dir} of a package. Uses the index and scans only if there is none"""
+    install_path = dep_data.get("install_path", "")
+    index = get_index(dep_data)
+    if index is None:
+        return find_cmake_config_dirs(install_path)
+    return {name: os.path.dirname(os.path.join(install_path, rel))
+            for name, rel in index.get("cmake_configs", {}).items()}
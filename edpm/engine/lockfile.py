@@ -1,9 +1,12 @@
 # edpm/engine/lockfile.py
 
+import copy
 import os
 from typing import Dict, Any
 from ruamel.yaml import YAML
 
+from edpm.engine.versions import VERSION_KEY, VERSIONS_KEY
+
 yaml_rt = YAML(typ='rt')
 
 class LockfileConfig:
@@ -33,8 +36,11 @@ class LockfileConfig:
             self.file_path = filepath
         if not self.file_path:
             raise ValueError("No file path to save lockfile.")
-        with open(self.file_path, "w", encoding="utf-8") as f:
+        # Write and rename, so readers never see a half written file (cooperative installs)
+        tmp_path = f"{self.file_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
             yaml_rt.dump(self.data, f)
+        os.replace(tmp_path, self.file_path)
 
     @property
     def top_dir(self) -> str:
@@ -44,6 +50,18 @@ class LockfileConfig:
     def top_dir(self, path: str):
         self.data["top_dir"] = path
 
+    @property
+    def view_dir(self) -> str:
+        """Merged symlink prefix of all packages (see 'edpm view'). Empty if there is no view"""
+        return self.data.get("view_dir", "")
+
+    @view_dir.setter
+    def view_dir(self, path: str):
+        if path:
+            self.data["view_dir"] = path
+        else:
+            self.data.pop("view_dir", None)
+
     def get_installed_package(self, name: str) -> Dict[str, Any]:
         return self.data["packages"].get(name, {})
 
@@ -66,4 +84,41 @@ class LockfileConfig:
         Note: This method silently ignores attempts to remove non-existent packages.
         """
         if name in self.data["packages"]:
-            del self.data["packages"][name]
\ No newline at end of file
+            del self.data["packages"][name]
+
+    def get_versions(self, name: str) -> Dict[str, Any]:
+        """Side-by-side builds of a package {version_key: entry} (see engine/versions.py)"""
+        return self.get_installed_package(name).get(VERSIONS_KEY, {})
+
+    def get_active_version(self, name: str) -> str:
+        return self.get_installed_package(name).get(VERSION_KEY, "")
+
+    def store_version(self, name: str, key: str = ""):
+        """Saves the current package entry to 'versions' under its version_key (or key)"""
+        dep_data = self.data["packages"][name]
+        key = key or dep_data.get(VERSION_KEY, "")
+        if not key:
+            raise ValueError(f"Package '{name}' has no version key")
+        # Copies, so the lock file has no YAML anchors between entries
+        snapshot = {k: copy.deepcopy(v) for k, v in dep_data.items() if k not in (VERSION_KEY, VERSIONS_KEY)}
+        versions = dep_data.pop(VERSIONS_KEY, {})
+        versions[key] = snapshot
+        dep_data[VERSION_KEY] = key
+        dep_data[VERSIONS_KEY] = versions   # keep 'versions' after the active entry fields
+
+    def clear_active_version(self, name: str):
+        """Removes the active entry fields of a package, stored versions are kept"""
+        dep_data = self.data["packages"].get(name, {})
+        for k in [k for k in dep_data if k != VERSIONS_KEY]:
+            del dep_data[k]
+
+    def activate_version(self, name: str, key: str):
+        """Makes a stored version the active package entry"""
+        dep_data = self.data["packages"][name]
+        versions = dep_data.get(VERSIONS_KEY, {})
+        if key not in versions:
+            raise KeyError(f"Package '{name}' has no version '{key}'")
+        self.clear_active_version(name)
+        dep_data.update(copy.deepcopy(dict(versions[key])))
+        dep_data[VERSION_KEY] = key
+        dep_data[VERSIONS_KEY] = dep_data.pop(VERSIONS_KEY)
@@ -1,10 +1,20 @@
 # edpm/engine/components.py
 
+import hashlib
+import json
 import os
+import shutil
 import sys
+import platform
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Type
 from edpm.engine.commands import run, workdir
+from edpm.engine.generators.steps import CmakePrefixPath, EnvPrepend
+from edpm.engine.install_index import get_index, get_library_dirs, get_pkgconfig_dirs, get_python_dirs
+from edpm.engine.optimization import autotools_flags, cmake_flags, meson_options, resolve_profile
+from edpm.engine.simulate import simulate_params, simulate_work, write_files, write_install_tree
+from edpm.engine.tracing import span
+from edpm.engine.parallelism import is_pinned, resolve_build_threads, run_adaptive_build
 
 # -------------------------------------
 # M A K E R   I N T E R F A C E
@@ -34,6 +44,37 @@ class IMaker(ABC):
     def install(self):
         pass
 
+    def explain(self) -> Dict[str, str]:
+        """What build() and install() would do now, {stage: description}. For 'edpm install --explain'"""
+        return {"build": "run", "install": "run"}
+
+    @staticmethod
+    def gen_env(data):
+        """
+        Env/CMake actions for an installed package (a lock file entry), like Recipe gen_env.
+        Used for packages without a baked-in recipe. Default: nothing
+        """
+        return []
+
+
+def prefix_env(data):
+    """PATH, LD_LIBRARY_PATH, PKG_CONFIG_PATH and CMAKE_PREFIX_PATH of a prefix install, from its index"""
+    install_path = data.get("install_path", "")
+    if not install_path:
+        return
+    index = get_index(data) or {}
+    for bin_dir in index.get("bin_dirs", ["bin"]):
+        yield EnvPrepend("PATH", os.path.join(install_path, bin_dir))
+    for lib_dir in get_library_dirs(data):
+        yield EnvPrepend("LD_LIBRARY_PATH", lib_dir)
+        if platform.system() == "Darwin":
+            yield EnvPrepend("DYLD_LIBRARY_PATH", lib_dir)
+    for pkgconfig_dir in get_pkgconfig_dirs(data):
+        yield EnvPrepend("PKG_CONFIG_PATH", pkgconfig_dir)
+    for python_dir in get_python_dirs(data):
+        yield EnvPrepend("PYTHONPATH", python_dir)
+    yield CmakePrefixPath(install_path)
+
 
 class CmakeMaker(IMaker):
     """
@@ -55,24 +96,46 @@ class CmakeMaker(IMaker):
         
         defaults = {
             "cxx_standard": 20,
-            "build_threads": 4,
             "cmake_flags": "",
             "cmake_user_flags": ""
         }
+
+        # Not set or 'auto' => from CPUs and available memory
+        self.config.setdefault("adaptive_build_threads", not is_pinned(self.config))
+        self.config["build_threads"] = resolve_build_threads(self.config)
+
+        # RPATH install mode: libraries find their dependencies without LD_LIBRARY_PATH
+        if self.config.get("use_rpath", False):
+            self.config["install_rpath"] = ";".join(self._rpath_entries())
+            self.config["rpath_cache_file"] = os.path.join(self.config["build_path"], "edpm-rpath.cmake")
+            defaults["cmake_init_flags"] = "-C {}".format(self.config["rpath_cache_file"])
+        else:
+            defaults["cmake_init_flags"] = ""
+
+        # Optimization profile: its build type wins over cmake_build_type, recipe flags go after its flags
+        profile = resolve_profile(self.config)
+        if profile:
+            self.config["cmake_build_type"] = profile["build_type"]
+            self.config["cmake_profile_flags"] = cmake_flags(profile)
+        else:
+            self.config["cmake_profile_flags"] = ""
+
         cfg_with_defs = {**defaults, **self.config}
 
         self.config["configure_cmd"] = (
             "cmake -B {build_path} "
+            "{cmake_init_flags} "
             "-DCMAKE_INSTALL_PREFIX={install_path} "
             "-DCMAKE_CXX_STANDARD={cxx_standard} "
             "-DCMAKE_BUILD_TYPE={cmake_build_type} "
+            "{cmake_profile_flags} "
             "{cmake_flags} "
             "{cmake_user_flags} "
             "{source_path} "
         ).format(**cfg_with_defs)
 
 
-        self.config["build_cmd"] = "cmake --build {build_path} --parallel {build_threads}".format(**cfg_with_defs)
+        self.config["build_cmd"] = self._build_cmd(self.config["build_threads"])
         self.config["install_cmd"] = "cmake --build {build_path} --target install".format(**cfg_with_defs)
         from pprint import pprint
         print("------- cmake-maker preconfigure result: ---------")
@@ -88,19 +151,77 @@ class CmakeMaker(IMaker):
         # Create the build_path if it doesn't exist yet
         run(f'mkdir -p "{self.config["build_path"]}"')
 
+        # RPATH values contain '$ORIGIN' and ';' so they go through an initial cache file, not the shell
+        if self.config.get("install_rpath"):
+            self._write_rpath_cache()
+
         # We need an environment to configure/build:
         env_file_bash = self.config["env_file_bash"]
         if not os.path.isfile(env_file_bash):
             raise FileNotFoundError(f"[CmakeMaker] Env file does not exist: {env_file_bash}")
 
-        run(self.config['configure_cmd'], env_file=env_file_bash)
-        run(self.config['build_cmd'], env_file=env_file_bash)
+        with span("configure", "stage"):
+            run(self.config['configure_cmd'], env_file=env_file_bash)
+        run_adaptive_build(self._build_cmd, self.config["build_threads"], env_file_bash,
+                           adaptive=self.config.get("adaptive_build_threads", False))
+
+    def _build_cmd(self, threads):
+        return "cmake --build {} --parallel {}".format(self.config["build_path"], threads)
+
+    def explain(self) -> Dict[str, str]:
+        build_path = self.config.get("build_path", "")
+        threads = self.config.get("build_threads", "auto")
+        profile = resolve_profile(self.config)
+        profile_note = f", {profile['name']} profile" if profile else ""
+        if os.path.isfile(os.path.join(build_path, "CMakeCache.txt")):
+            return {"configure": f"reuse CMakeCache.txt in {build_path}{profile_note}",
+                    "build": f"incremental, {threads} threads",
+                    "install": "cmake --target install"}
+        return {"configure": f"cmake into {build_path}{profile_note}",
+                "build": f"full, {threads} threads",
+                "install": "cmake --target install"}
 
     def install(self):
         """Install the packet"""
         install_cmd = self.config.get("install_cmd", "")
         run(install_cmd, env_file=self.config["env_file_bash"])
 
+    def _rpath_entries(self):
+        """
+        Install RPATH entries: the package own lib dirs and lock-known dependency lib dirs
+        (config['rpath_dirs']). Dependencies living under the same top dir are written
+        relative to $ORIGIN, so the whole top dir stays relocatable.
+        """
+        origin = "@loader_path" if platform.system() == "Darwin" else "$ORIGIN"
+        entries = [f"{origin}/../lib", f"{origin}/../lib64"]
+
+        # bin/ and lib/ are at the same depth, so one relative path serves both
+        own_lib_dir = os.path.join(self.config["install_path"], "lib")
+        # edpm_dir is top_dir/.edpm. app_path is top_dir/name, or top_dir/name/key with versioned_installs
+        if self.config.get("edpm_dir"):
+            top_dir = os.path.dirname(os.path.normpath(self.config["edpm_dir"]))
+        else:
+            top_dir = os.path.dirname(self.config["app_path"]) if self.config.get("app_path") else ""
+
+        for lib_dir in self.config.get("rpath_dirs", []):
+            if top_dir and os.path.commonpath([top_dir, lib_dir]) == top_dir:
+                entry = f"{origin}/{os.path.relpath(lib_dir, own_lib_dir)}"
+            else:
+                entry = lib_dir
+            if entry not in entries:
+                entries.append(entry)
+        return entries
+
+    def _write_rpath_cache(self):
+        """Writes CMake initial cache file (used with 'cmake -C') with install RPATH settings"""
+        text = (
+            "# Automatically generated by EDPM\n"
+            f'set(CMAKE_INSTALL_RPATH "{self.config["install_rpath"]}" CACHE STRING "Set by EDPM")\n'
+            'set(CMAKE_INSTALL_RPATH_USE_LINK_PATH ON CACHE BOOL "Set by EDPM")\n'
+        )
+        with open(self.config["rpath_cache_file"], "w", encoding="utf-8") as f:
+            f.write(text)
+
     def use_common_dirs_scheme(self):
         """Function sets a common directory scheme."""
         if 'app_path' in self.config:
@@ -123,50 +244,375 @@ class CmakeMaker(IMaker):
 
 class AutotoolsMaker(IMaker):
     """
-    Example maker that uses the Autotools flow:
-      ./configure && make && make install
+    Autotools flow: configure && make && make install.
+
+    configure runs out-of-tree in build_path, so the source tree stays clean and can be
+    reused by rebuilds. Packages that can't build out-of-tree set 'autotools_in_source: true'.
+    All autotools packages of a top_dir share a configure cache (autotools_config_cache,
+    default {edpm_dir}/autotools/config-<arch>.cache), so feature probes run once.
+    A configure that fails with the shared cache is rerun without it.
+    --prefix is install_path unless configure_flags set it. An optimization_profile
+    adds CFLAGS/CXXFLAGS/LDFLAGS (see engine/optimization.py).
     """
 
     def preconfigure(self):
         # Possibly combine or default flags
         self.config.setdefault("configure_flags", "")
-        self.config.setdefault("build_threads", 4)
+        self.config.setdefault("adaptive_build_threads", not is_pinned(self.config))
+        self.config["build_threads"] = resolve_build_threads(self.config)
 
-    def build(self):
+        app_path = self.config.get("app_path", "")
+        self.config.setdefault("source_path", os.path.join(app_path, "src"))
+        self.config.setdefault("build_path", os.path.join(app_path, "build"))
+        self.config["configure_dir"] = self._configure_dir()
+        if self.config["configure_dir"] != self.config["build_path"]:
+            print(f"[AutotoolsMaker] Building in the source tree {self.config['configure_dir']}")
+
+        # Optimization profile flags go to configure as CFLAGS/CXXFLAGS/LDFLAGS
+        profile = resolve_profile(self.config)
+        self.config["configure_profile_flags"] = autotools_flags(profile) if profile else ""
+
+        # configure caches the flags too, so each profile has its own cache
+        if "autotools_config_cache" not in self.config and self.config.get("edpm_dir"):
+            suffix = f"-{profile['name']}" if profile else ""
+            self.config["autotools_config_cache"] = os.path.join(
+                self.config["edpm_dir"], "autotools", f"config-{platform.machine()}{suffix}.cache")
+
+    def _configure_dir(self) -> str:
         app_path = self.config.get("app_path", "")
         source_path = self.config.get("source_path", os.path.join(app_path, "src"))
-        configure_flags = self.config["configure_flags"]
-        build_threads = self.config["build_threads"]
+        if self.config.get("autotools_in_source", False):
+            return source_path
+        # configure refuses out-of-tree builds of a source tree configured in place
+        if os.path.isfile(os.path.join(source_path, "config.status")):
+            return source_path
+        return self.config.get("build_path", os.path.join(app_path, "build"))
+
+    def _configure_cmd(self, cache_file: str) -> str:
+        flags = self.config["configure_flags"]
+        if "--prefix" not in flags and self.config.get("install_path"):
+            flags = f'--prefix="{self.config["install_path"]}" {flags}'
+        if cache_file:
+            flags = f'--cache-file="{cache_file}" {flags}'
+        if self.config.get("configure_profile_flags"):
+            flags = f'{flags} {self.config["configure_profile_flags"]}'
+        return f'"{os.path.join(self.config["source_path"], "configure")}" {flags}'.rstrip()
 
+    def build(self):
         env_file_bash = self.config["env_file_bash"]
         if not os.path.isfile(env_file_bash):
-            raise FileNotFoundError(f"[CmakeMaker] Env file does not exist: {env_file_bash}")
+            raise FileNotFoundError(f"[AutotoolsMaker] Env file does not exist: {env_file_bash}")
+
+        configure_dir = self.config["configure_dir"]
+        run(f'mkdir -p "{configure_dir}"')
+        workdir(configure_dir)
+
+        cache_file = self.config.get("autotools_config_cache", "")
+        with span("configure", "stage"):
+            if cache_file:
+                os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+                try:
+                    run(self._configure_cmd(cache_file), env_file=env_file_bash)
+                except OSError:
+                    # e.g. CC or CFLAGS differ from the values in the cache
+                    print(f"[AutotoolsMaker] configure failed with the shared cache {cache_file}, retrying without it")
+                    run(self._configure_cmd(""), env_file=env_file_bash)
+            else:
+                run(self._configure_cmd(""), env_file=env_file_bash)
+
+        run_adaptive_build(lambda threads: f'make -j {threads}', self.config["build_threads"], env_file_bash,
+                           adaptive=self.config.get("adaptive_build_threads", False))
+
+    def install(self):
+        workdir(self.config["configure_dir"])
+        run(f'make -j {self.config["build_threads"]} install', env_file=self.config["env_file_bash"])
 
-        workdir(source_path)
+    def explain(self) -> Dict[str, str]:
+        threads = self.config.get("build_threads", "auto")
+        configure_dir = self._configure_dir()
+        profile = resolve_profile(self.config)
+        profile_note = f", {profile['name']} profile" if profile else ""
+        return {"configure": f"configure in {configure_dir}{profile_note}",
+                "build": f"make -j {threads}",
+                "install": f"make -j {threads} install"}
 
-        run(f'./configure {configure_flags}', env_file=env_file_bash)
-        # build
-        run(f'make -j {build_threads}', env_file=env_file_bash)
+
+# Meson names of CMake build types (cmake_build_type is the plan-wide setting)
+MESON_BUILD_TYPES = {
+    "Debug": "debug",
+    "Release": "release",
+    "RelWithDebInfo": "debugoptimized",
+    "MinSizeRel": "minsize",
+}
+
+
+class MesonMaker(IMaker):
+    """
+    Meson + Ninja: meson setup, meson compile, meson install.
+
+    The build type is meson_build_type or cmake_build_type mapped to Meson names,
+    an optimization_profile sets it together with b_lto and compiler/linker args.
+    libdir is 'lib', so the env file gets lib/ and lib/pkgconfig like for other makers.
+    An existing build dir is set up again only if the setup options changed
+    (meson setup --reconfigure). Otherwise ninja regenerates what it needs itself.
+    """
+
+    SETUP_FILE = "edpm-meson-setup.txt"     # setup options of the last successful setup
+
+    def preconfigure(self):
+        self.config.setdefault("meson_flags", "")
+        self.config.setdefault("adaptive_build_threads", not is_pinned(self.config))
+        self.config["build_threads"] = resolve_build_threads(self.config)
+
+        profile = resolve_profile(self.config)
+        if profile:
+            build_type = MESON_BUILD_TYPES.get(profile["build_type"], "plain")
+        else:
+            build_type = self.config.get("meson_build_type") or \
+                MESON_BUILD_TYPES.get(self.config.get("cmake_build_type", "RelWithDebInfo"), "debugoptimized")
+        self.config["meson_build_type"] = build_type
+        profile_options = f"{meson_options(profile)} " if profile else ""
+        self.config["setup_options"] = (
+            f'--prefix="{self.config["install_path"]}" --libdir=lib --buildtype={build_type} '
+            f'{profile_options}{self.config["meson_flags"]}'
+        ).strip()
+
+    def setup_state(self) -> str:
+        """
+        'fresh' (no build dir), 'reuse' (same options), 'reconfigure' (options changed)
+        or 'wipe' (a build dir of a failed or foreign setup)
+        """
+        build_path = self.config.get("build_path", "")
+        if not os.path.isfile(os.path.join(build_path, "meson-private", "coredata.dat")):
+            return "fresh"
+        try:
+            with open(os.path.join(build_path, self.SETUP_FILE), encoding="utf-8") as f:
+                previous = f.read()
+        except OSError:
+            return "wipe"
+        return "reuse" if previous == self.config.get("setup_options") else "reconfigure"
+
+    def build(self):
+        env_file_bash = self.config["env_file_bash"]
+        if not os.path.isfile(env_file_bash):
+            raise FileNotFoundError(f"[MesonMaker] Env file does not exist: {env_file_bash}")
+
+        build_path = self.config["build_path"]
+        state = self.setup_state()
+        setup_flags = {"fresh": "", "reconfigure": "--reconfigure ", "wipe": "--wipe "}
+        with span("configure", "stage"):
+            if state != "reuse":
+                run(f'meson setup {setup_flags[state]}{self.config["setup_options"]} '
+                    f'"{build_path}" "{self.config["source_path"]}"', env_file=env_file_bash)
+                with open(os.path.join(build_path, self.SETUP_FILE), "w", encoding="utf-8") as f:
+                    f.write(self.config["setup_options"])
+
+        run_adaptive_build(lambda threads: f'meson compile -C "{build_path}" -j {threads}',
+                           self.config["build_threads"], env_file_bash,
+                           adaptive=self.config.get("adaptive_build_threads", False))
 
     def install(self):
-        # Typically just "make install"
-        app_path = self.config.get("app_path", "")
-        source_path = self.config.get("source_path", os.path.join(app_path, "src"))
-        run('make install', env_file="env.sh")
+        run(f'meson install -C "{self.config["build_path"]}" --no-rebuild', env_file=self.config["env_file_bash"])
+
+    def explain(self) -> Dict[str, str]:
+        build_path = self.config.get("build_path", "")
+        configure = {
+            "fresh": f"meson setup {build_path}",
+            "reuse": f"skip, {build_path} is set up",
+            "reconfigure": f"meson setup --reconfigure {build_path}",
+            "wipe": f"meson setup --wipe {build_path}",
+        }
+        return {"configure": configure[self.setup_state()],
+                "build": "meson compile -j {}".format(self.config.get("build_threads", "auto")),
+                "install": "meson install"}
 
+    @staticmethod
+    def gen_env(data):
+        return prefix_env(data)
 
-def make_maker(config: Dict[str, Any]) -> IMaker:
+
+class PipMaker(IMaker):
     """
-    Factory that picks the maker based on config['make'] or returns None if no build step.
+    Python packages: wheels are built into a shared local wheel cache, then installed
+    from it with 'pip install --prefix=install_path'.
+
+    The package is the fetched source tree, or without a fetch step the requirement
+    pip_requirement (default: app_name, '==version' if version is set). Wheels of the
+    package and its dependencies go to pip_wheel_cache (default {edpm_dir}/wheels).
+    A stamp in build_path remembers the last build. If the requirement, pip_flags and
+    the sources didn't change, no wheel is built and the install runs offline from the cache.
+    """
+
+    STAMP_FILE = "edpm-pip-stamp.json"
+    # Dirs that builds create in the source tree. They don't count as source changes
+    _NOT_SOURCE = {".git", "__pycache__", "build", "dist"}
+
+    def preconfigure(self):
+        self.config.setdefault("python_executable", "python3")
+        self.config.setdefault("pip_flags", "")
+        self.config.setdefault("pip_no_deps", False)
+        self.config["pip_wheel_cache"] = self._wheel_cache()
+        self.config["pip_requirement"] = self._requirement()
+
+    def _wheel_cache(self) -> str:
+        if self.config.get("pip_wheel_cache"):
+            return self.config["pip_wheel_cache"]
+        return os.path.join(self.config.get("edpm_dir") or self.config.get("build_path", ""), "wheels")
+
+    def _requirement(self) -> str:
+        if self.config.get("pip_requirement"):
+            return self.config["pip_requirement"]
+        version = self.config.get("version", "")
+        name = self.config.get("app_name", "")
+        return f"{name}=={version}" if version else name
+
+    def _from_source(self) -> bool:
+        return bool(self.config.get("fetch"))
+
+    def _pip(self, args: str) -> str:
+        return f'{self.config.get("python_executable", "python3")} -m pip {args}'
+
+    def _source_fingerprint(self) -> str:
+        """Newest mtime and file count of the source tree"""
+        newest, count = 0, 0
+        for dir_path, dir_names, file_names in os.walk(self.config.get("source_path", "")):
+            dir_names[:] = [d for d in dir_names if d not in self._NOT_SOURCE and not d.endswith(".egg-info")]
+            for file_name in file_names:
+                try:
+                    newest = max(newest, os.stat(os.path.join(dir_path, file_name)).st_mtime_ns)
+                except OSError:
+                    continue
+                count += 1
+        return f"{newest}-{count}"
+
+    def _stamp_key(self) -> str:
+        data = {key: self.config.get(key) for key in ("python_executable", "pip_flags", "pip_no_deps")}
+        data["target"] = self.config.get("source_path") if self._from_source() else self._requirement()
+        if self._from_source():
+            data["sources"] = self._source_fingerprint()
+        return hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _read_stamp(self) -> Dict[str, str]:
+        try:
+            with open(os.path.join(self.config.get("build_path", ""), self.STAMP_FILE), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def is_cached(self) -> bool:
+        """The last wheel build is still valid"""
+        stamp = self._read_stamp()
+        if stamp.get("key") != self._stamp_key():
+            return False
+        return not stamp.get("wheel") or os.path.isfile(os.path.join(self._wheel_cache(), stamp["wheel"]))
+
+    def build(self):
+        env_file_bash = self.config["env_file_bash"]
+        if not os.path.isfile(env_file_bash):
+            raise FileNotFoundError(f"[PipMaker] Env file does not exist: {env_file_bash}")
+
+        cache = self.config["pip_wheel_cache"]
+        if self.is_cached():
+            print(f"[PipMaker] Wheels are cached in {cache}, skipping the build")
+            return
+
+        build_path = self.config["build_path"]
+        os.makedirs(cache, exist_ok=True)
+        os.makedirs(build_path, exist_ok=True)
+        flags = self.config["pip_flags"]
+        no_deps = "--no-deps " if self.config["pip_no_deps"] else ""
+        wheel = ""
+        if self._from_source():
+            # The package itself goes to a clean dir first, so we know which wheel it is
+            wheel_dir = os.path.join(build_path, "wheel")
+            shutil.rmtree(wheel_dir, ignore_errors=True)
+            run(self._pip(f'wheel --no-deps --wheel-dir "{wheel_dir}" {flags} "{self.config["source_path"]}"'),
+                env_file=env_file_bash)
+            wheel = next(name for name in os.listdir(wheel_dir) if name.endswith(".whl"))
+            if no_deps:
+                shutil.copy2(os.path.join(wheel_dir, wheel), os.path.join(cache, wheel))
+            else:
+                run(self._pip(f'wheel --wheel-dir "{cache}" --find-links "{cache}" {flags} '
+                              f'"{os.path.join(wheel_dir, wheel)}"'), env_file=env_file_bash)
+        else:
+            run(self._pip(f'wheel {no_deps}--wheel-dir "{cache}" --find-links "{cache}" {flags} '
+                          f'"{self.config["pip_requirement"]}"'), env_file=env_file_bash)
+
+        with open(os.path.join(build_path, self.STAMP_FILE), "w", encoding="utf-8") as f:
+            json.dump({"key": self._stamp_key(), "wheel": wheel}, f)
+
+    def install(self):
+        cache = self.config["pip_wheel_cache"]
+        wheel = self._read_stamp().get("wheel")
+        target = os.path.join(cache, wheel) if wheel else self.config["pip_requirement"]
+        no_deps = "--no-deps " if self.config["pip_no_deps"] else ""
+        run(self._pip(f'install --no-index --find-links "{cache}" --prefix "{self.config["install_path"]}" '
+                      f'--ignore-installed --no-warn-script-location {no_deps}"{target}"'),
+            env_file=self.config["env_file_bash"])
+
+    def explain(self) -> Dict[str, str]:
+        target = self.config.get("source_path") if self._from_source() else self._requirement()
+        build = f"skip, wheels cached in {self._wheel_cache()}" if self.is_cached() else f"pip wheel {target}"
+        return {"build": build, "install": "pip install --prefix from the wheel cache"}
+
+    @staticmethod
+    def gen_env(data):
+        install_path = data.get("install_path", "")
+        if not install_path:
+            return
+        for bin_dir in ("bin", os.path.join("local", "bin")):
+            if os.path.isdir(os.path.join(install_path, bin_dir)):
+                yield EnvPrepend("PATH", os.path.join(install_path, bin_dir))
+        for python_dir in get_python_dirs(data):
+            yield EnvPrepend("PYTHONPATH", python_dir)
+
+
+class SimulatedMaker(IMaker):
+    """
+    Doesn't compile anything ('make: simulate'). Build waits and writes files into build_path,
+    install writes a small fake install tree. For orchestrator benchmarks, see engine/simulate.py
     """
-    val = config.get("make", None)
-    if not val:
+
+    def build(self):
+        params = simulate_params(self.config, "build")
+        os.makedirs(self.config["build_path"], exist_ok=True)
+        simulate_work(params["seconds"], params["mode"])
+        write_files(self.config["build_path"], params["files"], params["size"], suffix=".o")
+
+    def install(self):
+        params = simulate_params(self.config, "install")
+        simulate_work(params["seconds"], params["mode"])
+        files = int(self.config.get("simulate_install_files", 2))
+        write_install_tree(self.config["install_path"], self.config.get("app_name", "simulated"), files, params["size"])
+
+    def explain(self) -> Dict[str, str]:
+        return {step: "simulate {}s".format(simulate_params(self.config, step)["seconds"])
+                for step in ("build", "install")}
+
+
+def maker_class(make: Optional[str]) -> Optional[Type[IMaker]]:
+    """Maker class for a config['make'] value. None if no build step, ValueError if unknown"""
+    if not make:
         return None  # no build step at all
 
-    if val == "cmake":
-        return CmakeMaker(config)
-    elif val in ("autotools", "automake"):
-        return AutotoolsMaker(config)
+    if make == "cmake":
+        return CmakeMaker
+    elif make in ("autotools", "automake"):
+        return AutotoolsMaker
+    elif make == "meson":
+        return MesonMaker
+    elif make == "pip":
+        return PipMaker
+    elif make == "simulate":
+        return SimulatedMaker
     else:
         # Could handle more or raise an error for unknown
-        raise ValueError(f"[make_maker] Unknown build system: '{val}'.")
\ No newline at end of file
+        raise ValueError(f"[make_maker] Unknown build system: '{make}'.")
+
+
+def make_maker(config: Dict[str, Any]) -> IMaker:
+    """
+    Factory that picks the maker based on config['make'] or returns None if no build step.
+    """
+    cls = maker_class(config.get("make", None))
+    return cls(config) if cls else None
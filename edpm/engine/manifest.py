@@ -0,0 +1,188 @@
+# edpm/engine/manifest.py
+
+"""
+Per-file install manifests. A manifest records path, size, mtime and content hash
+of every file a package installed:
+
+    {
+      "install_path": "/top/root/root-install",
+      "algorithm": "sha256",
+      "files": {"bin/root": {"size": 123, "mtime": 1700000000.0, "hash": "..."}, ...}
+    }
+
+Manifests are JSON files under {top_dir}/.edpm/manifests, the lock file only keeps
+the path (package 'manifest' key). Trees like ROOT have tens of thousands of files,
+so hashing runs on a thread pool (hashlib releases the GIL while hashing).
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+MANIFEST_KEY = "manifest"
+HASH_ALGORITHM = "sha256"
+HASH_CHUNK_SIZE = 1024 * 1024
+VERIFY_BATCH_SIZE = 256
+
+
+def manifests_dir(top_dir: str) -> str:
+    return os.path.join(top_dir, ".edpm", "manifests")
+
+
+def default_manifest_path(top_dir: str, package_name: str) -> str:
+    return os.path.join(manifests_dir(top_dir), f"{package_name}.json")
+
+
+def hash_file(path: str, algorithm: str = HASH_ALGORITHM) -> str:
+    """Content hash of a file. Symlinks are hashed by their target path, not followed"""
+    hasher = hashlib.new(algorithm)
+    if os.path.islink(path):
+        hasher.update(os.readlink(path).encode("utf-8", "surrogateescape"))
+        return "link:" + hasher.hexdigest()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def stat_entry(path: str) -> Dict[str, Any]:
+    """size and mtime of a file (of the link itself for symlinks)"""
+    st = os.lstat(path)
+    return {"size": st.st_size, "mtime": st.st_mtime}
+
+
+def list_files(root: str) -> List[str]:
+    """All files (and symlinks) under root, relative to root. Symlinked dirs are not followed"""
+    result = []
+    for dir_path, dir_names, file_names in os.walk(root):
+        for dir_name in list(dir_names):
+            if os.path.islink(os.path.join(dir_path, dir_name)):
+                dir_names.remove(dir_name)
+                file_names.append(dir_name)
+        for file_name in file_names:
+            result.append(os.path.relpath(os.path.join(dir_path, file_name), root))
+    result.sort()
+    return result
+
+
+def default_threads() -> int:
+    """Same default as ThreadPoolExecutor: hashing is mostly I/O bound"""
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+def build_manifest(install_path: str,
+                   exclude: Optional[Iterable[str]] = None,
+                   threads: int = 0,
+                   algorithm: str = HASH_ALGORITHM) -> Dict[str, Any]:
+    """
+    Scans install_path and hashes all files on a thread pool.
+
+    :param exclude: relative paths that belong to other packages (shared install_path)
+    :param threads: hashing threads, 0 => default_threads()
+    """
+    excluded = set(exclude or [])
+    rel_paths = [rel for rel in list_files(install_path) if rel not in excluded]
+
+    def process(rel):
+        full_path = os.path.join(install_path, rel)
+        entry = stat_entry(full_path)
+        entry["hash"] = hash_file(full_path, algorithm)
+        return rel, entry
+
+    with ThreadPoolExecutor(max_workers=threads or default_threads()) as executor:
+        files = dict(executor.map(process, rel_paths))
+
+    return {
+        "install_path": install_path,
+        "algorithm": algorithm,
+        "files": files,
+    }
+
+
+def save_manifest(manifest: Dict[str, Any], path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
+
+
+def load_manifest(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class VerifyResult:
+    """Differences between an install tree and its manifest"""
+
+    def __init__(self, install_path: str):
+        self.install_path = install_path
+        self.missing: List[str] = []
+        self.modified: List[str] = []
+        self.extra: List[str] = []
+
+    @property
+    def ok(self) -> bool:
+        return not (self.missing or self.modified or self.extra)
+
+
+def verify_manifest(manifest: Dict[str, Any],
+                    full: bool = False,
+                    exclude: Optional[Iterable[str]] = None,
+                    executor: Optional[ThreadPoolExecutor] = None) -> VerifyResult:
+    """
+    Checks an install tree against its manifest.
+
+    Quick mode compares size and mtime only. Full mode also compares content hashes
+    (files with a different size are reported without hashing).
+
+    :param exclude: relative paths that belong to other packages (not reported as extra)
+    :param executor: pool to run checks on. Several packages can share one pool
+    """
+    install_path = manifest["install_path"]
+    algorithm = manifest.get("algorithm", HASH_ALGORITHM)
+    recorded = manifest["files"]
+    result = VerifyResult(install_path)
+
+    def check(rel):
+        full_path = os.path.join(install_path, rel)
+        if not os.path.lexists(full_path):
+            return "missing"
+        entry = recorded[rel]
+        current = stat_entry(full_path)
+        if current["size"] != entry["size"]:
+            return "modified"
+        if full:
+            return "modified" if hash_file(full_path, algorithm) != entry["hash"] else ""
+        return "modified" if current["mtime"] != entry["mtime"] else ""
+
+    def check_batch(batch):
+        return [(rel, check(rel)) for rel in batch]
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=default_threads())
+    try:
+        # Walk the tree for extra files while recorded files are checked on the pool.
+        # Files go in batches: a future per file costs more than a stat() call
+        rel_paths = list(recorded)
+        futures = [executor.submit(check_batch, rel_paths[i:i + VERIFY_BATCH_SIZE])
+                   for i in range(0, len(rel_paths), VERIFY_BATCH_SIZE)]
+        excluded = set(exclude or [])
+        on_disk = list_files(install_path) if os.path.isdir(install_path) else []
+        result.extra = [rel for rel in on_disk if rel not in recorded and rel not in excluded]
+        for future in futures:
+            for rel, status in future.result():
+                if status == "missing":
+                    result.missing.append(rel)
+                elif status == "modified":
+                    result.modified.append(rel)
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+    result.missing.sort()
+    result.modified.sort()
+    return result
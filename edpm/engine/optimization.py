@@ -0,0 +1,194 @@
+# edpm/engine/optimization.py
+
+"""
+Optimization profiles of produced binaries ('optimization_profile' in global or package config).
+
+A profile is a build type plus compiler and linker flags. Makers turn it into their own
+options: CMake gets CMAKE_BUILD_TYPE, CMAKE_<LANG>_FLAGS, CMAKE_INTERPROCEDURAL_OPTIMIZATION
+and CMAKE_*_LINKER_FLAGS; autotools gets CFLAGS/CXXFLAGS/LDFLAGS on the configure line;
+Meson gets --buildtype, b_lto and *_args. CFLAGS, CXXFLAGS and LDFLAGS of the edpm process
+are kept and the profile flags go after them.
+
+    portable     Release, compiler default target: binaries run on any CPU of the arch
+    native       Release, -march=native (-mcpu=native on ARM/POWER): only for CPUs like the builder
+    lto-native   native + link time optimization
+    debug        Debug
+
+Plans can define their own profiles or override these:
+
+    optimization_profiles:
+      avx2: {build_type: Release, cflags: "-march=haswell", lto: true}
+
+'pgo: generate' or 'pgo: use' add profile-guided optimization flags on top of a profile,
+the profile data is in pgo_dir (default {edpm_dir}/pgo/<package>).
+
+Without optimization_profile nothing changes: recipes keep their own build type and flags.
+The profile is a config value, so it is part of version keys (side-by-side installs) and
+binary cache keys. Native profiles also put the host CPU into binary cache keys.
+"""
+
+import hashlib
+import os
+import platform
+import shlex
+from typing import Any, Dict, Optional
+
+OPTIMIZATION_PROFILES: Dict[str, Dict[str, Any]] = {
+    "portable": {"build_type": "Release", "cflags": "", "ldflags": "", "lto": False},
+    "native": {"build_type": "Release", "cflags": "{native}", "ldflags": "{linker_opt}", "lto": False},
+    "lto-native": {"build_type": "Release", "cflags": "{native}", "ldflags": "{linker_opt}", "lto": True},
+    "debug": {"build_type": "Debug", "cflags": "", "ldflags": "", "lto": False},
+}
+
+# Compiler flags of CMake build types, for makers that don't have build types (autotools)
+BUILD_TYPE_CFLAGS = {
+    "Debug": "-g",
+    "Release": "-O3 -DNDEBUG",
+    "RelWithDebInfo": "-O2 -g -DNDEBUG",
+    "MinSizeRel": "-Os -DNDEBUG",
+}
+
+PGO_MODES = ("generate", "use")
+LOCK_FIELD = "optimization"     # lock file package entry: the resolved profile
+
+
+def native_flag() -> str:
+    """-march=native where GCC and Clang have it for the host, -mcpu=native on ARM and POWER"""
+    machine = platform.machine().lower()
+    if machine.startswith(("arm", "aarch64", "ppc", "powerpc")):
+        return "-mcpu=native"
+    return "-march=native"
+
+
+def _linker_opt() -> str:
+    # GNU ld/lld optimize the hash tables of shared libraries. ld64 (macOS) doesn't take it
+    return "" if platform.system() == "Darwin" else "-Wl,-O1"
+
+
+def resolve_profile(config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    {'name', 'build_type', 'cflags', 'ldflags', 'lto', 'pgo', 'pgo_dir'} with placeholders filled in,
+    or None if optimization_profile is not set. ValueError for unknown profiles
+    """
+    name = config.get("optimization_profile")
+    if not name:
+        return None
+    profiles = {**OPTIMIZATION_PROFILES, **(config.get("optimization_profiles") or {})}
+    if name not in profiles:
+        raise ValueError(f"Unknown optimization_profile '{name}'. Known: {', '.join(sorted(profiles))}")
+    profile = {"build_type": "Release", "cflags": "", "ldflags": "", "lto": False, **profiles[name]}
+    placeholders = {"native": native_flag(), "linker_opt": _linker_opt()}
+    cflags = str(profile["cflags"]).format(**placeholders).split()
+    ldflags = str(profile["ldflags"]).format(**placeholders).split()
+
+    pgo, pgo_dir = config.get("pgo") or "", ""
+    if pgo:
+        if pgo not in PGO_MODES:
+            raise ValueError(f"Unknown pgo mode '{pgo}'. Known: {', '.join(PGO_MODES)}")
+        pgo_dir = config.get("pgo_dir") or os.path.join(config.get("edpm_dir", ""), "pgo",
+                                                        str(config.get("app_name", "package")))
+        pgo_flag = f"-fprofile-{pgo}={pgo_dir}"
+        cflags.append(pgo_flag)
+        ldflags.append(pgo_flag)
+
+    return {
+        "name": name,
+        "build_type": profile["build_type"],
+        "cflags": " ".join(cflags),
+        "ldflags": " ".join(ldflags),
+        "lto": bool(profile["lto"]),
+        "pgo": pgo,
+        "pgo_dir": pgo_dir,
+    }
+
+
+def is_native(profile: Optional[Dict[str, Any]]) -> bool:
+    return bool(profile) and "=native" in profile["cflags"]
+
+
+def host_cpu_id() -> str:
+    """CPU model and feature flags: binaries built with -march=native run where these match"""
+    model, features = "", ""
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                key = key.strip()
+                if key in ("model name", "CPU part") and not model:
+                    model = value.strip()
+                elif key in ("flags", "Features") and not features:
+                    features = value.strip()
+    except OSError:
+        pass
+    model = model or platform.processor() or platform.machine()
+    return f"{model}|{hashlib.sha256(features.encode()).hexdigest()[:16]}"
+
+
+def cache_key_inputs(config: Dict[str, Any]) -> Dict[str, Any]:
+    """What the profile adds to binary cache keys: resolved flags and, for native builds, the host CPU"""
+    profile = resolve_profile(config)
+    if not profile:
+        return {}
+    inputs = {k: v for k, v in profile.items() if k not in ("cflags", "ldflags", "pgo_dir")}
+    # pgo_dir is under top_dir, the mode and the profile data matter
+    inputs["cflags"] = " ".join(f for f in profile["cflags"].split() if not f.startswith("-fprofile-"))
+    inputs["ldflags"] = " ".join(f for f in profile["ldflags"].split() if not f.startswith("-fprofile-"))
+    if is_native(profile):
+        inputs["cpu"] = host_cpu_id()
+    if profile["pgo"] == "use":
+        inputs["pgo_data"] = _dir_digest(profile["pgo_dir"])
+    return inputs
+
+
+def _dir_digest(path: str) -> str:
+    """Names and sizes of files in a dir (PGO profile data)"""
+    digest = hashlib.sha256()
+    for dir_path, _, file_names in sorted(os.walk(path)):
+        for file_name in sorted(file_names):
+            file_path = os.path.join(dir_path, file_name)
+            digest.update(f"{os.path.relpath(file_path, path)}:{os.path.getsize(file_path)}\n".encode())
+    return digest.hexdigest()[:16]
+
+
+def _with_env(var: str, flags: str) -> str:
+    """
+    Flags after the ones from the environment variable, as a single-quoted shell word.
+    Commands run in 'bash -c "..."' (see engine/commands.py), single quotes survive that
+    """
+    return "'{}'".format(f"{os.environ.get(var, '')} {flags}".strip())
+
+
+def cmake_flags(profile: Dict[str, Any]) -> str:
+    """-D options of a profile. All are always set, so switching profiles reconfigures cleanly"""
+    ldflags = profile["ldflags"]
+    return " ".join([
+        f"-DCMAKE_C_FLAGS={_with_env('CFLAGS', profile['cflags'])}",
+        f"-DCMAKE_CXX_FLAGS={_with_env('CXXFLAGS', profile['cflags'])}",
+        f"-DCMAKE_INTERPROCEDURAL_OPTIMIZATION={'ON' if profile['lto'] else 'OFF'}",
+        f"-DCMAKE_EXE_LINKER_FLAGS={_with_env('LDFLAGS', ldflags)}",
+        f"-DCMAKE_SHARED_LINKER_FLAGS={_with_env('LDFLAGS', ldflags)}",
+        f"-DCMAKE_MODULE_LINKER_FLAGS={_with_env('LDFLAGS', ldflags)}",
+    ])
+
+
+def autotools_flags(profile: Dict[str, Any]) -> str:
+    """CFLAGS/CXXFLAGS/LDFLAGS arguments of configure"""
+    cflags = f"{BUILD_TYPE_CFLAGS.get(profile['build_type'], '')} {profile['cflags']}".strip()
+    ldflags = profile["ldflags"]
+    if profile["lto"]:
+        cflags = f"{cflags} -flto"
+        ldflags = f"{ldflags} -flto".strip()
+    return (f"CFLAGS={_with_env('CFLAGS', cflags)} CXXFLAGS={_with_env('CXXFLAGS', cflags)} "
+            f"LDFLAGS={_with_env('LDFLAGS', ldflags)}")
+
+
+def meson_options(profile: Dict[str, Any]) -> str:
+    """Setup options of a profile, besides --buildtype"""
+    options = [f"-Db_lto={'true' if profile['lto'] else 'false'}"]
+    for lang in ("c", "cpp"):
+        # Array options take comma separated values
+        if profile["cflags"]:
+            options.append(shlex.quote(f"-D{lang}_args={','.join(profile['cflags'].split())}"))
+        if profile["ldflags"]:
+            options.append(shlex.quote(f"-D{lang}_link_args={','.join(profile['ldflags'].split())}"))
+    return " ".join(options)
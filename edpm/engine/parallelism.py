@@ -0,0 +1,198 @@
+# edpm/engine/parallelism.py
+
+"""
+Memory-aware build parallelism.
+
+If build_threads is not set in the plan (or is 'auto'), makers pick it per package:
+
+    build_threads = min(CPUs, available memory / build_job_memory_gb)
+
+CPUs respect the process affinity and a cgroup v2 CPU quota. Available memory is
+MemAvailable from /proc/meminfo, capped by the cgroup memory limit. Recipes of heavy
+packages (ROOT, Geant4, ACTS) declare 'build_job_memory_gb' in their default config,
+other packages use DEFAULT_JOB_MEMORY_GB. Users can override it like any other option.
+
+The job count of a running build can't be changed (make/ninja take it on start).
+So jobs are lowered only after the fact: if a build fails because the OOM killer
+took one of its processes (e.g. a linker), it is rerun with half the jobs. Builds
+are incremental, so the rerun continues where the failed one stopped. Other build
+failures are not retried.
+
+An OOM kill is seen as a grown oom_kill counter (cgroup v2 memory.events, or
+/proc/vmstat). Without the counters, a build killed by SIGKILL (return code 137)
+while memory was under pressure counts as one. Pressure is sampled during the
+build: PSI /proc/pressure/memory, or the MemAvailable share when PSI is not available.
+"""
+
+import os
+import threading
+from typing import Callable, Optional
+
+from edpm.engine.commands import run
+from edpm.engine.output import markup_print as mprint
+
+AUTO = "auto"
+DEFAULT_JOB_MEMORY_GB = 1.0
+
+# Pressure thresholds: PSI 'some avg10' percent, or MemAvailable below this share of MemTotal
+PSI_THRESHOLD = 10.0
+MEM_AVAILABLE_THRESHOLD = 0.05
+
+GB = 1024 ** 3
+
+
+def _read(path: str) -> str:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def detect_cpus() -> int:
+    """CPUs this process may use: affinity mask and cgroup v2 quota"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    quota = _read("/sys/fs/cgroup/cpu.max").split()
+    if len(quota) == 2 and quota[0] != "max":
+        cpus = min(cpus, max(1, int(int(quota[0]) / int(quota[1]))))
+    return cpus
+
+
+def _meminfo() -> dict:
+    """/proc/meminfo values in bytes"""
+    result = {}
+    for line in _read("/proc/meminfo").splitlines():
+        key, _, value = line.partition(":")
+        parts = value.split()
+        if parts and parts[0].isdigit():
+            result[key] = int(parts[0]) * 1024
+    return result
+
+
+def available_memory() -> Optional[int]:
+    """Bytes available for new processes, None if unknown (e.g. not Linux)"""
+    available = _meminfo().get("MemAvailable")
+
+    limit, current = _read("/sys/fs/cgroup/memory.max"), _read("/sys/fs/cgroup/memory.current")
+    if limit.isdigit() and current.isdigit():
+        cgroup_available = max(0, int(limit) - int(current))
+        available = cgroup_available if available is None else min(available, cgroup_available)
+    return available
+
+
+def memory_pressure() -> Optional[float]:
+    """PSI 'some avg10' (percent of time tasks waited for memory), None if PSI is not available"""
+    for line in _read("/proc/pressure/memory").splitlines():
+        if line.startswith("some"):
+            for field in line.split():
+                if field.startswith("avg10="):
+                    return float(field[len("avg10="):])
+    return None
+
+
+def is_under_pressure() -> bool:
+    psi = memory_pressure()
+    if psi is not None:
+        return psi > PSI_THRESHOLD
+    info = _meminfo()
+    if "MemAvailable" in info and info.get("MemTotal"):
+        return info["MemAvailable"] / info["MemTotal"] < MEM_AVAILABLE_THRESHOLD
+    return False
+
+
+def oom_kills() -> Optional[int]:
+    """Processes killed by the OOM killer so far: in our cgroup, or system wide. None if unknown"""
+    for path in ("/sys/fs/cgroup/memory.events", "/proc/vmstat"):
+        for line in _read(path).splitlines():
+            key, _, value = line.partition(" ")
+            if key == "oom_kill" and value.strip().isdigit():
+                return int(value)
+    return None
+
+
+def is_oom_failure(error: Exception, kills_before: Optional[int], pressure_seen: bool) -> bool:
+    """Whether a failed build looks like it was OOM killed"""
+    kills_after = oom_kills()
+    if kills_before is not None and kills_after is not None:
+        return kills_after > kills_before
+    return pressure_seen and str(error).endswith("return code 137")
+
+
+def auto_build_threads(job_memory_gb: float = DEFAULT_JOB_MEMORY_GB,
+                       cpus: Optional[int] = None, memory: Optional[int] = None) -> int:
+    """min(CPUs, memory / per job memory), at least 1"""
+    cpus = cpus or detect_cpus()
+    memory = available_memory() if memory is None else memory
+    if memory is None or job_memory_gb <= 0:
+        return cpus
+    return max(1, min(cpus, int(memory / (job_memory_gb * GB))))
+
+
+def is_pinned(config: dict) -> bool:
+    value = config.get("build_threads")
+    return value not in (None, "", AUTO)
+
+
+def resolve_build_threads(config: dict) -> int:
+    """build_threads from config, or picked from CPUs and memory if it isn't set or is 'auto'"""
+    if is_pinned(config):
+        return int(config["build_threads"])
+    job_memory_gb = float(config.get("build_job_memory_gb", DEFAULT_JOB_MEMORY_GB))
+    cpus, memory = detect_cpus(), available_memory()
+    threads = auto_build_threads(job_memory_gb, cpus, memory)
+    memory_text = f"{memory / GB:.1f} GB available" if memory is not None else "memory unknown"
+    mprint("<blue>build_threads: auto => {}</blue> ({} CPUs, {}, {:g} GB per job)",
+           threads, cpus, memory_text, job_memory_gb)
+    return threads
+
+
+class MemoryPressureMonitor:
+    """Samples memory pressure in a background thread. pressure_seen is set if it was ever high"""
+
+    def __init__(self, interval: float = 1.0, check: Optional[Callable[[], bool]] = None):
+        self.interval = interval
+        self.check = check or is_under_pressure
+        self.pressure_seen = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            if self.check():
+                self.pressure_seen = True
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._stop.set()
+        self._thread.join()
+        if self.check():
+            self.pressure_seen = True
+
+
+def run_adaptive_build(make_command: Callable[[int], str], threads: int, env_file: str = None,
+                       adaptive: bool = True, monitor_interval: float = 1.0) -> int:
+    """
+    Runs make_command(threads). If it fails because of the OOM killer, reruns it with
+    half the jobs (the jobs of a running build are not changed). Returns the jobs of the successful run
+    """
+    while True:
+        kills_before = oom_kills()
+        with MemoryPressureMonitor(monitor_interval) as monitor:
+            try:
+                run(make_command(threads), env_file=env_file)
+                return threads
+            except OSError as ex:
+                error = ex
+        # The monitor takes the last sample on exit
+        if not adaptive or threads <= 1 or not is_oom_failure(error, kills_before, monitor.pressure_seen):
+            raise error
+        threads = max(1, threads // 2)
+        mprint("<yellow>Build was OOM killed.</yellow> Retrying with {} jobs", threads)
@@ -98,7 +98,7 @@ class PlanFile:
         # Ensure there's a 'config' in global
         if "config" not in self.data["global"]:
             self.data["global"]["config"] = {
-                "build_threads": 4,
+                "build_threads": "auto",
                 "cxx_standard": 17
             }
 
@@ -203,6 +203,24 @@ class PlanFile:
                 return p
         return None
 
+    def package_dependencies(self) -> Dict[str, List[str]]:
+        """
+        Prerequisites of each package: the 'depends_on' list from the package config or,
+        if it is not set, all packages before it in the plan (the order edpm installs them in)
+        """
+        result: Dict[str, List[str]] = {}
+        previous: List[str] = []
+        for p in self.packages():
+            depends_on = p.config.get("depends_on")
+            if depends_on is None:
+                result[p.name] = list(previous)
+            else:
+                if isinstance(depends_on, str):
+                    depends_on = [depends_on]
+                result[p.name] = [str(name) for name in depends_on]
+            previous.append(p.name)
+        return result
+
     def add_package(self, new_entry: Any):
         """
         Append a new package item (string or dict) to self.data["packages"].
@@ -0,0 +1,96 @@
+# edpm/engine/profiling.py
+
+"""
+Profiling of edpm's own Python work ('edpm --profile').
+
+PhaseTimer is a set of cheap wall clock timers placed at the main points of EdpmApi
+(load plan, load lock, load recipes, generate env, generate cmake, save lock...).
+They are always on, a timer costs two perf_counter() calls. With --profile the whole
+invocation also runs under cProfile, stats are saved as .pstats and a short report
+with the phase breakdown and the top functions is printed to stderr:
+
+    edpm --profile env save                 # saves edpm.pstats
+    edpm --profile=save.pstats env save
+    python -m pstats save.pstats            # or snakeviz, gprof2dot, etc.
+"""
+
+import cProfile
+import io
+import pstats
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+from edpm.engine.tracing import span
+
+DEFAULT_PROFILE_FILE = "edpm.pstats"
+
+
+class PhaseTimer:
+    """Accumulated wall time and number of calls per named phase. Phases are trace spans too"""
+
+    def __init__(self):
+        self.totals: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            with span(name, "phase"):
+                yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float):
+        self.totals[name] = self.totals.get(name, 0.0) + seconds
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def report(self, total: float = 0) -> str:
+        """Phases in the order they first ran. With total, also shares of it"""
+        lines = []
+        for name, seconds in self.totals.items():
+            share = f" {seconds / total * 100:5.1f}%" if total > 0 else ""
+            lines.append(f"  {name:<18} {seconds * 1000:10.1f} ms{share}   x{self.counts[name]}")
+        if total > 0:
+            rest = total - sum(self.totals.values())
+            lines.append(f"  {'(other)':<18} {max(rest, 0) * 1000:10.1f} ms")
+            lines.append(f"  {'total':<18} {total * 1000:10.1f} ms")
+        return "\n".join(lines)
+
+
+class InvocationProfile:
+    """cProfile of one edpm invocation"""
+
+    def __init__(self, out_file: str = DEFAULT_PROFILE_FILE):
+        self.out_file = out_file
+        self.profiler = cProfile.Profile()
+        self.start_time = 0.0
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        self.profiler.enable()
+
+    def stop(self) -> float:
+        """Stops profiling, saves stats. Returns wall time"""
+        self.profiler.disable()
+        elapsed = time.perf_counter() - self.start_time
+        self.profiler.dump_stats(self.out_file)
+        return elapsed
+
+    def top_functions(self, count: int = 15, sort: str = "cumulative") -> str:
+        stream = io.StringIO()
+        stats = pstats.Stats(self.profiler, stream=stream)
+        stats.strip_dirs().sort_stats(sort).print_stats(count)
+        return stream.getvalue()
+
+    def report(self, phases: PhaseTimer, elapsed: float, count: int = 15) -> str:
+        return "\n".join([
+            "",
+            "========== edpm profile ==========",
+            "Phases:",
+            phases.report(elapsed),
+            "",
+            f"Top {count} functions by cumulative time (full stats: {self.out_file}):",
+            self.top_functions(count),
+        ])
@@ -1,8 +1,10 @@
 # edpm/engine/recipe.py
 
 import os
+import time
 from typing import Optional, List
 from edpm.engine.config import ConfigNamespace
+from edpm.engine.tracing import span
 
 class Recipe:
     """
@@ -63,16 +65,25 @@ class Recipe:
         """Perform post-installation tasks and verification"""
         pass
 
+    def explain(self) -> dict:
+        """
+        What the pipeline would do now, {stage: description}, without running anything.
+        Used by 'edpm install --explain'. Recipes that override stages can refine it
+        """
+        return {"fetch": "run", "build": "run", "install": "run"}
+
     def run_full_pipeline(self):
         """
         Execute the complete installation pipeline:
         1. fetch() -> 2. patch() -> 3. build() -> 4. install() -> 5. post_install()
+        Seconds per stage are kept in self.stage_times (see engine/build_times.py)
         """
-        self.fetch()
-        self.patch()
-        self.build()
-        self.install()
-        self.post_install()
+        self.stage_times = {}
+        for stage in (self.fetch, self.patch, self.build, self.install, self.post_install):
+            start = time.perf_counter()
+            with span(stage.__name__, "stage"):
+                stage()
+            self.stage_times[stage.__name__] = time.perf_counter() - start
 
     def use_common_dirs_scheme(self):
         """Function sets common directory scheme. It is the same for many packets:
@@ -5,6 +5,7 @@ import importlib
 from typing import Dict
 from edpm.engine.recipe import Recipe
 from edpm.engine.composed_recipe import ComposedRecipe   # We'll define it (see below)
+from edpm.engine.makers import maker_class
 
 def import_all_submodules(modules_dir, package_name):
     for (module_loader, name, ispkg) in pkgutil.iter_modules([modules_dir]):
@@ -68,3 +69,17 @@ class RecipeManager:
             recipe = ComposedRecipe(config=config, name=recipe_name)
 
         return recipe
+
+    def gen_env(self, package_name: str, dep_data: Dict[str, any]) -> list:
+        """
+        Env/CMake actions of an installed package: from its baked-in recipe, or for
+        composed packages from the maker it was built with (e.g. meson prefixes)
+        """
+        recipe_cls = self.recipes_by_name.get(package_name)
+        if recipe_cls:
+            return list(recipe_cls.gen_env(dep_data))
+        try:
+            cls = maker_class(dep_data.get("built_with_config", {}).get("make"))
+        except ValueError:
+            return []
+        return list(cls.gen_env(dep_data)) if cls else []
@@ -0,0 +1,91 @@
+# edpm/engine/simulate.py
+
+"""
+Simulated work for 'fetch: simulate' and 'make: simulate' packages.
+
+They don't download or compile anything. Each step sleeps (or burns CPU) for the
+configured time and writes the configured number of files, so the install
+orchestrator (scheduling, lock updates, env regeneration, manifests, views)
+can be benchmarked and tested without real builds:
+
+    packages:
+      - pkg1:
+          fetch: simulate
+          make: simulate
+          simulate_mode: cpu              # 'sleep' (default) or 'cpu'
+          simulate_fetch_seconds: 0.5
+          simulate_fetch_files: 100
+          simulate_build_seconds: 10
+          simulate_build_files: 500
+          simulate_install_files: 50      # bin/, lib/*.so, include/, lib/cmake/<Name>Config.cmake
+          simulate_file_size: 1024
+"""
+
+import hashlib
+import os
+import time
+from typing import Any, Dict
+
+DEFAULT_FILE_SIZE = 1024
+
+
+def simulate_work(seconds: float, mode: str = "sleep"):
+    """Sleeps or keeps one CPU core busy for the given time"""
+    if seconds <= 0:
+        return
+    if mode == "sleep":
+        time.sleep(seconds)
+        return
+    if mode != "cpu":
+        raise ValueError(f"[simulate] Unknown simulate_mode: '{mode}'. Use 'sleep' or 'cpu'")
+    deadline = time.perf_counter() + seconds
+    digest = b"edpm"
+    while time.perf_counter() < deadline:
+        for _ in range(1000):
+            digest = hashlib.sha256(digest).digest()
+
+
+def write_files(directory: str, count: int, size: int = DEFAULT_FILE_SIZE, prefix: str = "file", suffix: str = ""):
+    """Writes count files of size bytes into directory (100 files per subdirectory)"""
+    data = b"x" * size
+    for i in range(count):
+        sub_dir = os.path.join(directory, f"d{i // 100:03d}")
+        if i % 100 == 0:
+            os.makedirs(sub_dir, exist_ok=True)
+        with open(os.path.join(sub_dir, f"{prefix}{i:05d}{suffix}"), "wb") as f:
+            f.write(data)
+
+
+def write_install_tree(install_path: str, name: str, files: int = 2, size: int = DEFAULT_FILE_SIZE):
+    """
+    An install tree that looks like a real one to edpm generators: bin/<name>,
+    lib/lib<name>_N.so, include/<name>/ and lib/cmake/<Name>/<Name>Config.cmake.
+    files is the number of libraries and headers together
+    """
+    cmake_name = name.capitalize()
+    data = b"x" * size
+    for sub_dir in ("bin", "lib", os.path.join("include", name), os.path.join("lib", "cmake", cmake_name)):
+        os.makedirs(os.path.join(install_path, sub_dir), exist_ok=True)
+
+    with open(os.path.join(install_path, "bin", name), "w", encoding="utf-8") as f:
+        f.write("#!/bin/sh\n")
+    with open(os.path.join(install_path, "lib", "cmake", cmake_name, f"{cmake_name}Config.cmake"), "w") as f:
+        f.write(f"# Simulated {cmake_name} package\n")
+    libs = (files + 1) // 2
+    for i in range(files):
+        if i < libs:
+            path = os.path.join(install_path, "lib", f"lib{name}_{i}.so")
+        else:
+            path = os.path.join(install_path, "include", name, f"{name}_{i - libs}.h")
+        with open(path, "wb") as f:
+            f.write(data)
+
+
+def simulate_params(config: Dict[str, Any], step: str) -> Dict[str, Any]:
+    """seconds, files, size and mode of a step ('fetch', 'build' or 'install')"""
+    return {
+        "seconds": float(config.get(f"simulate_{step}_seconds", 0)),
+        "files": int(config.get(f"simulate_{step}_files", 0)),
+        "size": int(config.get("simulate_file_size", DEFAULT_FILE_SIZE)),
+        "mode": config.get("simulate_mode", "sleep"),
+    }
@@ -0,0 +1,132 @@
+# edpm/engine/tracing.py
+
+"""
+Chrome trace-event export of install runs ('edpm install --trace trace.json').
+
+While a trace is active, spans are recorded for every package, for recipe stages
+(fetch, patch, configure, build, install, post_install) and for edpm's own phases
+(generate env, save lock, manifest...; every PhaseTimer phase is also a span).
+The file loads in https://ui.perfetto.dev or chrome://tracing:
+
+    process  = edpm invocation (worker id in cooperative installs)
+    track    = thread in the process
+    span     = complete event ('ph': 'X') with start and duration
+
+Timestamps are wall clock microseconds, so traces of cooperative workers on different
+nodes line up after merging: python -m edpm.engine.tracing merge all.json node*.json
+
+Without an active trace span() costs one global lookup.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+_active = None      # Tracer of the current run
+
+
+class Tracer:
+    def __init__(self, process_name: str = "edpm", unique_id: str = ""):
+        self.process_name = process_name
+        # PIDs of processes on different nodes can match, so a unique id (worker id) can be hashed instead
+        self.pid = zlib.crc32(unique_id.encode()) & 0x7fffffff if unique_id else os.getpid()
+        self.events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._threads: Dict[int, int] = {}      # thread ident => small track id
+        # Wall clock anchor + monotonic offsets: comparable across hosts and precise
+        self._wall_anchor_us = time.time() * 1e6
+        self._perf_anchor = time.perf_counter()
+
+    def now_us(self) -> float:
+        return self._wall_anchor_us + (time.perf_counter() - self._perf_anchor) * 1e6
+
+    def _track(self) -> int:
+        ident = threading.get_ident()
+        track = self._threads.get(ident)
+        if track is None:
+            with self._lock:
+                track = self._threads.setdefault(ident, len(self._threads) + 1)
+                name = threading.current_thread().name
+                self.events.append({"ph": "M", "name": "thread_name", "pid": self.pid, "tid": track,
+                                    "args": {"name": "main" if name == "MainThread" else name}})
+        return track
+
+    def add_span(self, name: str, category: str, start_us: float, end_us: float, args: Dict[str, Any] = None):
+        event = {"ph": "X", "name": name, "cat": category or "edpm", "pid": self.pid, "tid": self._track(),
+                 "ts": round(start_us, 1), "dur": round(end_us - start_us, 1)}
+        if args:
+            event["args"] = {k: str(v) for k, v in args.items()}
+        with self._lock:
+            self.events.append(event)
+
+    @contextmanager
+    def span(self, name: str, category: str = "", **args):
+        start = self.now_us()
+        try:
+            yield
+        except BaseException as ex:
+            args["error"] = repr(ex)
+            raise
+        finally:
+            self.add_span(name, category, start, self.now_us(), args)
+
+    def to_json(self) -> Dict[str, Any]:
+        meta = [{"ph": "M", "name": "process_name", "pid": self.pid, "args": {"name": self.process_name}}]
+        with self._lock:
+            events = meta + list(self.events)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save(self, path: str):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_json(), f)
+        os.replace(tmp_path, path)
+
+
+def start_trace(process_name: str = "edpm", unique_id: str = "") -> Tracer:
+    global _active
+    _active = Tracer(process_name, unique_id)
+    return _active
+
+
+def stop_trace() -> Tracer:
+    global _active
+    tracer, _active = _active, None
+    return tracer
+
+
+def active_tracer():
+    return _active
+
+
+@contextmanager
+def span(name: str, category: str = "", **args):
+    """Records a span if a trace is active, otherwise does nothing"""
+    tracer = _active
+    if tracer is None:
+        yield
+        return
+    with tracer.span(name, category, **args):
+        yield
+
+
+def merge_traces(paths: List[str], out_path: str):
+    """Merges trace files (e.g. of cooperative workers) into one"""
+    events = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            events.extend(json.load(f)["traceEvents"])
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 4 or sys.argv[1] != "merge":
+        print("Usage: python -m edpm.engine.tracing merge <out.json> <trace1.json> [<trace2.json> ...]")
+        sys.exit(1)
+    merge_traces(sys.argv[3:], sys.argv[2])
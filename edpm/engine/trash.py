@@ -0,0 +1,151 @@
+# edpm/engine/trash.py
+
+"""
+Deleting huge trees (ROOT build dir has 100k+ files) takes minutes on NFS.
+Instead of waiting, directories are renamed into {top_dir}/.edpm/trash (instant on
+the same filesystem) and deleted by a detached background process:
+
+    python -m edpm.engine.trash <trash dir>
+
+The worker deletes subtrees in parallel and takes a lock, so only one worker runs
+per trash dir. If it is interrupted, the leftovers stay in the trash and are picked
+up by the next worker (rm, clean and gc start one if the trash is not empty).
+"""
+
+import errno
+import os
+import shutil
+import subprocess
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+TRASH_SUBDIR = os.path.join(".edpm", "trash")
+
+# The worker splits trees until it has at least that many subtrees per thread
+_PARTS_PER_THREAD = 4
+
+
+def trash_dir(top_dir: str) -> str:
+    return os.path.join(top_dir, TRASH_SUBDIR)
+
+
+def move_to_trash(path: str, top_dir: str) -> str:
+    """
+    Renames path into the trash. Returns the new path or "" if path can't be renamed
+    there (e.g. it is on another filesystem). Then the caller should delete it directly.
+    """
+    trash = trash_dir(top_dir)
+    os.makedirs(trash, exist_ok=True)
+    target = os.path.join(trash, f"{os.path.basename(os.path.normpath(path))}-{uuid.uuid4().hex[:8]}")
+    try:
+        os.rename(path, target)
+    except OSError as ex:
+        if ex.errno == errno.EXDEV:
+            return ""
+        raise
+    return target
+
+
+def remove_dir(path: str, top_dir: str) -> bool:
+    """
+    Removes a directory without waiting: moves it to the trash (see start_background_delete).
+    Falls back to inline deletion if it can't be moved. Returns True if moved to the trash.
+    """
+    if top_dir and move_to_trash(path, top_dir):
+        return True
+    shutil.rmtree(path, ignore_errors=True)
+    return False
+
+
+def start_background_delete(top_dir: str):
+    """Starts a detached process that empties the trash. It outlives the edpm command"""
+    trash = trash_dir(top_dir)
+    if not os.path.isdir(trash) or not os.listdir(trash):
+        return
+    subprocess.Popen([sys.executable, "-m", "edpm.engine.trash", trash],
+                     stdin=subprocess.DEVNULL,
+                     stdout=subprocess.DEVNULL,
+                     stderr=subprocess.DEVNULL,
+                     start_new_session=True,
+                     close_fds=True)
+
+
+def _split_tree(path: str, min_parts: int):
+    """
+    Breadth first walk from path, until there are at least min_parts subdirectories.
+    Files met on the way are deleted. Returns (subtrees, walked dirs deepest first)
+    """
+    subtrees = [path]
+    walked = []
+    while subtrees and len(subtrees) < min_parts:
+        current = subtrees.pop(0)
+        walked.append(current)
+        try:
+            entries = list(os.scandir(current))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subtrees.append(entry.path)
+            else:
+                try:
+                    os.unlink(entry.path)
+                except OSError:
+                    pass
+    walked.reverse()
+    return subtrees, walked
+
+
+def delete_tree(path: str, executor: ThreadPoolExecutor, threads: int):
+    """Deletes a tree, subtrees are deleted in parallel on the executor"""
+    if not os.path.isdir(path) or os.path.islink(path):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        return
+    subtrees, walked = _split_tree(path, threads * _PARTS_PER_THREAD)
+    for _ in executor.map(lambda p: shutil.rmtree(p, ignore_errors=True), subtrees):
+        pass
+    for dir_path in walked:
+        try:
+            os.rmdir(dir_path)
+        except OSError:
+            pass
+
+
+def empty_trash(trash: str, threads: int = 0):
+    """Deletes everything in the trash directory"""
+    if not os.path.isdir(trash):
+        return
+    threads = threads or min(32, (os.cpu_count() or 1) + 4)
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for entry in os.listdir(trash):
+            delete_tree(os.path.join(trash, entry), executor, threads)
+
+
+def _worker(trash: str):
+    """Empties the trash, if no other worker does it already"""
+    try:
+        import fcntl
+    except ImportError:
+        empty_trash(trash)
+        return
+
+    with open(trash + ".lock", "w") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return  # Another worker is running
+        # Dirs may be moved to the trash while we delete. Stop if nothing changes
+        # (e.g. no permissions), the next worker will try again
+        previous = None
+        entries = sorted(os.listdir(trash)) if os.path.isdir(trash) else []
+        while entries and entries != previous:
+            empty_trash(trash)
+            previous, entries = entries, sorted(os.listdir(trash))
+
+
+if __name__ == "__main__":
+    _worker(sys.argv[1])
@@ -0,0 +1,63 @@
+# edpm/engine/versions.py
+
+"""
+Side-by-side versioned installs (global config 'versioned_installs: true').
+
+Each build of a package gets its own app_path keyed by version and config hash:
+
+    {top_dir}/acts/v38-1a2b3c4d/{src,build,install}
+    {top_dir}/acts/v39-5e6f7a8b/{src,build,install}
+
+The lock file package entry describes the active build, as before, and keeps
+all builds under 'versions', so 'edpm switch acts@v38' only repoints the entry
+and regenerates env/toolchain files:
+
+    acts:
+      install_path: .../acts/v39-5e6f7a8b/install
+      built_with_config: {...}
+      version_key: v39-5e6f7a8b
+      versions:
+        v38-1a2b3c4d: {install_path: ..., built_with_config: {...}, owned: true, ...}
+        v39-5e6f7a8b: {...}
+"""
+
+import hashlib
+import json
+import re
+from typing import Any, Dict, List
+
+VERSION_KEY = "version_key"
+VERSIONS_KEY = "versions"
+
+# Keys that are set by edpm itself and don't change what is built
+_NOT_HASHED = {"env_file_bash", "app_path", "rpath_dirs", "edpm_dir"}
+
+
+def version_label(config: Dict[str, Any]) -> str:
+    """Human readable part of the key: version, branch or 'default'. Safe for a dir name"""
+    label = str(config.get("version") or config.get("branch") or "default")
+    return re.sub(r"[^A-Za-z0-9._+-]", "_", label)
+
+
+def config_hash(config: Dict[str, Any]) -> str:
+    """Short hash of the package config (without edpm-set keys)"""
+    hashed = {k: v for k, v in config.items() if k not in _NOT_HASHED}
+    text = json.dumps(hashed, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:8]
+
+
+def version_key(config: Dict[str, Any]) -> str:
+    """e.g. 'v38-1a2b3c4d'"""
+    return f"{version_label(config)}-{config_hash(config)}"
+
+
+def match_versions(keys: List[str], spec: str) -> List[str]:
+    """
+    Keys matching a user spec: the exact key, or all keys with this version label.
+    An empty spec matches everything
+    """
+    if not spec:
+        return list(keys)
+    if spec in keys:
+        return [spec]
+    return [key for key in keys if key.rsplit("-", 1)[0] == spec]
@@ -0,0 +1,170 @@
+# edpm/engine/view.py
+
+import copy
+import json
+import os
+from typing import Dict, List, Optional, Set, Tuple
+
+
+class ViewConflict:
+    """A file that two packages want to put at the same place in a view"""
+
+    def __init__(self, rel_path: str, package: str, owner: str):
+        self.rel_path = rel_path
+        self.package = package      # package that was not linked
+        self.owner = owner          # package that already owns the path in the view
+
+    def __repr__(self):
+        return f"ViewConflict({self.rel_path}: {self.package} vs {self.owner})"
+
+
+def is_subpath(path: str, parent: str) -> bool:
+    """True if path is parent itself or lays inside parent"""
+    if not path or not parent:
+        return False
+    path = os.path.normpath(path)
+    parent = os.path.normpath(parent)
+    return path == parent or path.startswith(parent + os.sep)
+
+
+class View:
+    """
+    A merged prefix made of symlinks to files of all installed packages (like Spack views).
+
+    Which package owns which link is stored in the view meta file, so a view can be
+    updated incrementally: only packages with a changed install_path are relinked.
+    """
+
+    META_FILE = ".edpm-view.json"
+
+    def __init__(self, view_dir: str):
+        self.view_dir = os.path.abspath(view_dir)
+        self.packages: Dict[str, Dict] = {}     # name => {install_path: ..., files: [...]}
+        self.conflicts: List[ViewConflict] = []
+
+    @property
+    def meta_path(self) -> str:
+        return os.path.join(self.view_dir, self.META_FILE)
+
+    def load(self):
+        if os.path.isfile(self.meta_path):
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                self.packages = json.load(f).get("packages", {})
+
+    def save(self):
+        os.makedirs(self.view_dir, exist_ok=True)
+        with open(self.meta_path, "w", encoding="utf-8") as f:
+            json.dump({"packages": self.packages}, f)
+
+    def update(self, installed: Dict[str, str], only: Optional[List[str]] = None) -> Tuple[List[str], List[str]]:
+        """
+        Syncs the view with installed packages.
+
+        :param installed: package name => install_path for everything that should be in the view
+        :param only: if given, these packages are relinked even if their install_path didn't change
+        :return: (linked package names, unlinked package names)
+        """
+        self.conflicts = []
+        unlinked = []
+        for name in list(self.packages.keys()):
+            stored_path = self.packages[name]["install_path"]
+            if name not in installed or installed[name] != stored_path or (only and name in only):
+                self._unlink_package(name)
+                unlinked.append(name)
+
+        owners = {rel: name for name, info in self.packages.items() for rel in info["files"]}
+        linked = []
+        for name in sorted(installed):
+            if name in self.packages:
+                continue
+            files = self._link_package(name, installed[name], owners)
+            self.packages[name] = {"install_path": installed[name], "files": files}
+            linked.append(name)
+
+        self.save()
+        return linked, unlinked
+
+    def remove(self):
+        """Removes all links made by edpm and the meta file. Foreign files are left untouched"""
+        for name in list(self.packages.keys()):
+            self._unlink_package(name)
+        if os.path.isfile(self.meta_path):
+            os.remove(self.meta_path)
+        _prune_empty_dirs(self.view_dir, self.view_dir)
+        if os.path.isdir(self.view_dir) and not os.listdir(self.view_dir):
+            os.rmdir(self.view_dir)
+
+    def _link_package(self, name: str, install_path: str, owners: Dict[str, str]) -> List[str]:
+        files = []
+        if not os.path.isdir(install_path):
+            return files
+
+        for root, dirs, filenames in os.walk(install_path):
+            # Symlinked directories are linked as a whole and not descended into
+            for dirname in list(dirs):
+                if os.path.islink(os.path.join(root, dirname)):
+                    dirs.remove(dirname)
+                    filenames.append(dirname)
+
+            for filename in filenames:
+                src = os.path.join(root, filename)
+                rel = os.path.relpath(src, install_path)
+                dst = os.path.join(self.view_dir, rel)
+
+                if rel in owners:
+                    self.conflicts.append(ViewConflict(rel, name, owners[rel]))
+                    continue
+                if os.path.lexists(dst):
+                    self.conflicts.append(ViewConflict(rel, name, ""))
+                    continue
+
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                os.symlink(src, dst)
+                owners[rel] = name
+                files.append(rel)
+        return files
+
+    def _unlink_package(self, name: str):
+        info = self.packages.pop(name, None)
+        if not info:
+            return
+        parents = set()
+        for rel in info["files"]:
+            dst = os.path.join(self.view_dir, rel)
+            if os.path.islink(dst):
+                os.remove(dst)
+            parents.add(os.path.dirname(dst))
+        for parent in sorted(parents, key=len, reverse=True):
+            _prune_empty_dirs(parent, self.view_dir)
+
+
+def _prune_empty_dirs(path: str, stop_at: str):
+    """Removes path and its parents while they are empty, but never stop_at itself"""
+    path = os.path.normpath(path)
+    stop_at = os.path.normpath(stop_at)
+    for root, dirs, files in os.walk(path, topdown=False):
+        if root != stop_at and not os.listdir(root):
+            os.rmdir(root)
+    while path != stop_at and is_subpath(path, stop_at) and os.path.isdir(path) and not os.listdir(path):
+        os.rmdir(path)
+        path = os.path.dirname(path)
+
+
+def rewrite_for_view(actions, install_path: str, view_dir: str, seen: Set[Tuple[str, str]]):
+    """
+    Points path-like prepend/append steps inside install_path to the view instead.
+    As all packages share the view, the same (variable, path) pair is emitted only once.
+    """
+    from edpm.engine.generators.steps import EnvPrepend, EnvAppend
+    result = []
+    for act in actions:
+        if isinstance(act, (EnvPrepend, EnvAppend)) and is_subpath(act.value, install_path):
+            rel = os.path.relpath(os.path.normpath(act.value), os.path.normpath(install_path))
+            new_value = os.path.normpath(os.path.join(view_dir, rel))
+            if (act.name, new_value) in seen:
+                continue
+            seen.add((act.name, new_value))
+            act = copy.copy(act)
+            act.value = new_value
+        result.append(act)
+    return result
@@ -20,7 +20,8 @@ class ActsRecipe(ComposedRecipe):
             'make': 'cmake',
             'url': 'https://github.com/acts-project/acts.git',
             'branch': 'v41.1.0',
-            'cmake_flags': '-DACTS_BUILD_PLUGIN_TGEO=ON -DACTS_BUILD_PLUGIN_DD4HEP=ON -DACTS_BUILD_PLUGIN_JSON=ON -DACTS_BUILD_PLUGIN_ACTSVG=OFF'
+            'cmake_flags': '-DACTS_BUILD_PLUGIN_TGEO=ON -DACTS_BUILD_PLUGIN_DD4HEP=ON -DACTS_BUILD_PLUGIN_JSON=ON -DACTS_BUILD_PLUGIN_ACTSVG=OFF',
+            'build_job_memory_gb': 3.0,     # for auto build_threads
         }
         super().__init__(name='acts', config=config)
 
@@ -7,6 +7,7 @@ import os
 
 from edpm.engine.generators.steps import EnvSet, EnvPrepend, CmakePrefixPath
 from edpm.engine.composed_recipe import ComposedRecipe
+from edpm.engine.install_index import get_library_dirs
 
 
 class EicreconRecipe(ComposedRecipe):
@@ -25,15 +26,13 @@ class EicreconRecipe(ComposedRecipe):
     @staticmethod
     def gen_env(data):
         path = data['install_path']
-        lib_path = os.path.join(path, 'lib')
-        lib64_path = os.path.join(path, 'lib64')
 
         yield EnvSet('eicrecon_HOME', path)
 
         yield EnvPrepend('JANA_PLUGIN_PATH', os.path.join(path, 'lib', 'EICrecon', 'plugins'))
         yield EnvPrepend('PATH', os.path.join(path, 'bin'))
 
-        if os.path.isdir(lib64_path):
-            yield EnvPrepend('LD_LIBRARY_PATH', lib64_path)
-        yield EnvPrepend('LD_LIBRARY_PATH', lib_path)
+        # lib, lib64 known from the install index. Reversed, so lib ends up first
+        for lib_path in reversed(get_library_dirs(data)):
+            yield EnvPrepend('LD_LIBRARY_PATH', lib_path)
 
@@ -5,6 +5,7 @@ https://github.com/Geant4/geant4
 from edpm.engine.composed_recipe import ComposedRecipe
 from edpm.engine.generators.steps import EnvPrepend, EnvRawText
 from edpm.engine.commands import is_not_empty_dir
+from edpm.engine.install_index import get_library_dirs
 import os
 import platform
 
@@ -28,7 +29,7 @@ class Geant4Recipe(ComposedRecipe):
 
     def __init__(self, config):
         # Default configuration
-        defaults = {
+        self.default_config = {
             'fetch': 'git',
             'make': 'cmake',
             'url': 'https://github.com/Geant4/geant4.git',
@@ -36,21 +37,19 @@ class Geant4Recipe(ComposedRecipe):
             'shallow': True,
             'cxx_standard': 17,
             'cmake_build_type': 'RelWithDebInfo',
-            'build_threads': 4,
-            'cmake_flags': {
-                'GEANT4_INSTALL_DATA': 'ON',
-                'GEANT4_USE_GDML': 'ON',
-                'GEANT4_USE_SYSTEM_CLHEP': 'ON',
-                'CLHEP_ROOT_DIR': '$CLHEP',
-                'GEANT4_USE_OPENGL_X11': 'ON',
-                'GEANT4_USE_RAYTRACER_X11': 'ON',
-                'GEANT4_BUILD_MULTITHREADED': 'ON',
-                'GEANT4_BUILD_TLS_MODEL': 'global-dynamic',
-                'GEANT4_USE_QT': 'ON',
-                'Wno-dev': None  # Flag with no value
-            }
+            'build_job_memory_gb': 1.5,     # for auto build_threads
+            'cmake_flags': "-Wno-dev "
+                           "-DGEANT4_INSTALL_DATA=ON "
+                           "-DGEANT4_USE_GDML=ON "
+                           "-DGEANT4_USE_SYSTEM_CLHEP=ON "
+                           "-DCLHEP_ROOT_DIR=\\$CLHEP "     # expanded after the env script is sourced
+                           "-DGEANT4_USE_OPENGL_X11=ON "
+                           "-DGEANT4_USE_RAYTRACER_X11=ON "
+                           "-DGEANT4_BUILD_MULTITHREADED=ON "
+                           "-DGEANT4_BUILD_TLS_MODEL=global-dynamic "
+                           "-DGEANT4_USE_QT=ON",
         }
-        super().__init__(name='geant4', config=config, defaults=defaults)
+        super().__init__(name='geant4', config=config)
 
     def fetch(self):
         """Skip fetch if source directory is not empty"""
@@ -79,18 +78,10 @@ class Geant4Recipe(ComposedRecipe):
 
             # Function to update Python environment
             def python_env_updater():
-                lib_path = os.path.join(install_path, 'lib')
-                lib64_path = os.path.join(install_path, 'lib64')
-
-                # Add library paths
-                if os.path.isdir(lib_path):
+                # Add library paths (lib, lib64) known from the install index
+                for lib_path in get_library_dirs(data):
                     os.environ['LD_LIBRARY_PATH'] = f"{lib_path}:{os.environ.get('LD_LIBRARY_PATH', '')}"
                     if platform.system() == 'Darwin':
                         os.environ['DYLD_LIBRARY_PATH'] = f"{lib_path}:{os.environ.get('DYLD_LIBRARY_PATH', '')}"
 
-                if os.path.isdir(lib64_path):
-                    os.environ['LD_LIBRARY_PATH'] = f"{lib64_path}:{os.environ.get('LD_LIBRARY_PATH', '')}"
-                    if platform.system() == 'Darwin':
-                        os.environ['DYLD_LIBRARY_PATH'] = f"{lib64_path}:{os.environ.get('DYLD_LIBRARY_PATH', '')}"
-
             yield EnvRawText(sh_text, csh_text, python_env_updater)
\ No newline at end of file
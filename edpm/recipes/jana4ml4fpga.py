@@ -8,6 +8,8 @@ import os
 from edpm.engine.composed_recipe import ComposedRecipe
 from edpm.engine.generators.steps import EnvSet, EnvPrepend
 from edpm.engine.commands import is_not_empty_dir
+from edpm.engine.install_index import get_library_dirs
+from edpm.engine.parallelism import resolve_build_threads
 
 
 class Jana4ml4fpgaRecipe(ComposedRecipe):
@@ -46,7 +48,6 @@ class Jana4ml4fpgaRecipe(ComposedRecipe):
             'branch': 'main',
             'cxx_standard': 17,
             'cmake_build_type': 'RelWithDebInfo',
-            'build_threads': 4,
             # 'cmake_flags': '',     # user can override or set in plan
         }
         super().__init__(name='jana4ml4fpga', config=config)
@@ -59,7 +60,7 @@ class Jana4ml4fpgaRecipe(ComposedRecipe):
         # We can override the 'source_path' and 'build_threads' as needed
         source_path = self.config.get('source_path', "")
         cmake_build_type = self.config.get('cmake_build_type', 'RelWithDebInfo')
-        build_threads = self.config.get('build_threads', 4)
+        build_threads = resolve_build_threads(self.config)
 
         # Merge user cmake_flags or cmake_custom_flags
         user_flags = self.config.get('cmake_flags', "")
@@ -108,11 +109,8 @@ class Jana4ml4fpgaRecipe(ComposedRecipe):
         yield EnvPrepend('JANA_PLUGIN_PATH', os.path.join(install_path, 'plugins'))
         yield EnvPrepend('PATH', os.path.join(install_path, 'bin'))
 
-        lib_path = os.path.join(install_path, 'lib')
-        lib64_path = os.path.join(install_path, 'lib64')
-        if os.path.isdir(lib64_path):
-            yield EnvPrepend('LD_LIBRARY_PATH', lib64_path)
-        else:
+        # lib, lib64 known from the install index
+        for lib_path in get_library_dirs(data):
             yield EnvPrepend('LD_LIBRARY_PATH', lib_path)
 
     def patch(self):
@@ -68,16 +68,16 @@ class RootRecipe(ComposedRecipe):
             'cxx_standard': '17',
             'cmake_build_type': 'RelWithDebInfo',
             # If user doesn't override, we'll set them in preconfigure().
-            'cmake_flags': "-Wno-dev",
-                "-Droot7=ON "
-                "-Dgdml=ON "
-                "-Dxrootd=OFF "
-                "-Dmysql=OFF "
-                "-Dpythia6=OFF "
-                "-Dpythia6_nolink=OFF "
-                "-Dpythia8=OFF "
-                "-Dhttp=ON "
-            'build_threads': 4,
+            'cmake_flags': "-Wno-dev "
+                           "-Droot7=ON "
+                           "-Dgdml=ON "
+                           "-Dxrootd=OFF "
+                           "-Dmysql=OFF "
+                           "-Dpythia6=OFF "
+                           "-Dpythia6_nolink=OFF "
+                           "-Dpythia8=OFF "
+                           "-Dhttp=ON",
+            'build_job_memory_gb': 2.0,     # for auto build_threads
         }
         super().__init__(name='root', config=config)
 
@@ -99,6 +99,12 @@ def test_install_dependency():
             assert "install_path" in package_info
             assert package_info["install_path"] == os.path.join(tmpdir, "test-install")
             assert "built_with_config" in package_info
+            # Install tree layout is indexed after install
+            assert "index" in package_info
+            assert package_info["index"]["lib_dirs"] == []
+            # Per-file manifest is recorded under top_dir
+            assert package_info["manifest"] == os.path.join(tmpdir, ".edpm", "manifests", "test.json")
+            assert os.path.isfile(package_info["manifest"])
 
 
 def test_install_already_installed():
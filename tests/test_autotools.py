@@ -0,0 +1,110 @@
+import os
+import stat
+
+from edpm.engine.makers import AutotoolsMaker, make_maker
+
+# A fake 'configure': records its args and cwd, uses and fills the cache, fails if asked to
+# while a cache is used (like configure does when CC changed since the cache was written)
+CONFIGURE = """#!/bin/bash
+prefix=""
+cache=""
+for arg in "$@"; do
+  case "$arg" in
+    --prefix=*) prefix="${arg#--prefix=}" ;;
+    --cache-file=*) cache="${arg#--cache-file=}" ;;
+  esac
+done
+echo "$PWD $*" >> "$(dirname "$0")/configure.log"
+if [ -n "$cache" ]; then
+  [ -n "$FAIL_WITH_CACHE" ] && exit 1
+  [ -f "$cache" ] && echo "cache hit" >> "$(dirname "$0")/configure.log"
+  echo "ac_cv_prog_cc=gcc" > "$cache"
+fi
+printf 'all:\\n\\ttouch built\\ninstall:\\n\\tmkdir -p %s/bin && cp built %s/bin/tool\\n' "$prefix" "$prefix" > Makefile
+"""
+
+
+def _package(tmp_path, name):
+    source_path = tmp_path / name / "src"
+    source_path.mkdir(parents=True)
+    configure = source_path / "configure"
+    configure.write_text(CONFIGURE)
+    configure.chmod(configure.stat().st_mode | stat.S_IEXEC)
+    env_file = tmp_path / "env.sh"
+    env_file.write_text("")
+    return {
+        "make": "autotools",
+        "app_path": str(tmp_path / name),
+        "install_path": str(tmp_path / name / "install"),
+        "env_file_bash": str(env_file),
+        "edpm_dir": str(tmp_path / ".edpm"),
+        "build_threads": 2,
+    }
+
+
+def _build(config):
+    cwd = os.getcwd()
+    maker = make_maker(config)
+    try:
+        maker.preconfigure()
+        maker.build()
+        maker.install()
+    finally:
+        os.chdir(cwd)
+    return maker
+
+
+def _log(config):
+    with open(os.path.join(config["app_path"], "src", "configure.log")) as f:
+        return f.read()
+
+
+def test_out_of_tree_build_with_shared_cache(tmp_path):
+    first = _package(tmp_path, "evio")
+    second = _package(tmp_path, "fastjet")
+    maker = _build(first)
+    _build(second)
+
+    assert isinstance(maker, AutotoolsMaker)
+    assert maker.config["configure_dir"] == os.path.join(first["app_path"], "build")
+    assert os.path.isfile(os.path.join(first["app_path"], "build", "built"))
+    assert not os.path.exists(os.path.join(first["app_path"], "src", "Makefile"))
+    assert os.path.isfile(os.path.join(first["install_path"], "bin", "tool"))
+    assert f'--prefix={first["install_path"]}' in _log(first)
+
+    cache_file = maker.config["autotools_config_cache"]
+    assert cache_file.startswith(str(tmp_path / ".edpm" / "autotools"))
+    assert "cache hit" not in _log(first)
+    assert "cache hit" in _log(second)
+
+
+def test_in_source_build(tmp_path):
+    config = _package(tmp_path, "legacy")
+    config["autotools_in_source"] = True
+    config["autotools_config_cache"] = ""
+    _build(config)
+    assert os.path.isfile(os.path.join(config["app_path"], "src", "built"))
+    assert "--cache-file" not in _log(config)
+
+
+def test_configured_in_place_source_stays_in_source(tmp_path):
+    config = _package(tmp_path, "old")
+    (tmp_path / "old" / "src" / "config.status").write_text("")
+    assert make_maker(config)._configure_dir() == os.path.join(config["app_path"], "src")
+
+
+def test_retry_without_cache(tmp_path, monkeypatch):
+    config = _package(tmp_path, "picky")
+    monkeypatch.setenv("FAIL_WITH_CACHE", "1")
+    _build(config)
+    lines = _log(config).splitlines()
+    assert len(lines) == 2
+    assert "--cache-file" in lines[0] and "--cache-file" not in lines[1]
+    assert os.path.isfile(os.path.join(config["install_path"], "bin", "tool"))
+
+
+def test_explain(tmp_path):
+    config = _package(tmp_path, "evio")
+    stages = make_maker(config).explain()
+    assert stages["configure"] == f'configure in {os.path.join(config["app_path"], "build")}'
+    assert stages["install"] == "make -j 2 install"
@@ -0,0 +1,49 @@
+import json
+
+from benchmarks.bench_core import run_suite, compare, main
+from benchmarks.synthetic import make_stack
+from edpm.engine.lockfile import LockfileConfig
+from edpm.engine.planfile import PlanFile
+
+
+def test_synthetic_stack(tmp_path):
+    stack = make_stack(str(tmp_path), 5)
+    plan = PlanFile.load(stack["plan"])
+    lock = LockfileConfig()
+    lock.load(stack["lock"])
+
+    assert len(plan.packages()) == 5
+    assert plan.package_dependencies()["pkg0004"] == ["pkg0001", "pkg0002", "pkg0003"]
+    assert all(lock.is_installed(name) for name in lock.get_installed_packages())
+    assert lock.get_installed_package("pkg0000")["index"]["cmake_configs"] == \
+        {"Pkg0000": "lib/cmake/Pkg0000/Pkg0000Config.cmake"}
+
+
+def test_run_suite_smoke(tmp_path):
+    data = run_suite([3], repeat=1, cold_start=False, work_dir=str(tmp_path))
+    names = {r["name"] for r in data["results"]}
+    assert {"plan_load", "lock_load", "lock_save", "env_bash", "cmake_toolchain"} <= names
+    assert all(r["packages"] == 3 and r["min"] >= 0 for r in data["results"])
+
+
+def test_compare_and_output(tmp_path):
+    output = tmp_path / "new.json"
+    main(["--sizes", "2", "--repeat", "1", "--no-cold-start", "--only", "lock_load",
+          "-o", str(output), "--work-dir", str(tmp_path)])
+    new = json.loads(output.read_text())
+    assert [r["name"] for r in new["results"]] == ["lock_load"]
+
+    old = {"results": [dict(new["results"][0], median=new["results"][0]["median"] / 2)]}
+    changes = compare(old, new)
+    assert len(changes) == 1 and abs(changes[0]["ratio"] - 2) < 1e-6
+
+
+def test_install_overhead_suite(tmp_path):
+    from benchmarks.bench_install import run_suite as run_install_suite
+
+    params = {"simulate_build_seconds": 0.01, "simulate_install_files": 2}
+    data = run_install_suite([3], params, work_dir=str(tmp_path))
+    result = data["results"][0]
+    assert result["packages"] == 3
+    assert len(result["per_package"]) == 3
+    assert result["total"] >= result["simulated_total"]
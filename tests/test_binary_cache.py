@@ -0,0 +1,225 @@
+import os
+import tarfile
+import threading
+
+import click
+import pytest
+from click.testing import CliRunner
+
+from edpm.cli.cache import cache_group
+from edpm.engine import binary_cache
+from edpm.engine.api import EdpmApi
+from edpm.engine.binary_cache import (CacheError, DirectoryStore, HttpStore, artifact_paths, cache_key,
+                                      extract_artifact, fetch_artifact, local_cache_dir, push_artifact)
+from edpm.engine.generators.environment_generator import RPATH_FIELD, is_rpath_installed
+from edpm.engine.lockfile import LockfileConfig
+from edpm.engine.makers import SimulatedMaker
+from edpm.engine.planfile import PlanFile
+
+
+@click.group()
+@click.pass_context
+def cli(ctx):
+    pass
+
+
+cli.add_command(cache_group)
+
+
+def _api(tmp_path, top_name="top", global_config=None, a_config=None):
+    """a <- b, simulated builds"""
+    plan = PlanFile({"global": {"config": {"build_threads": 2, **(global_config or {})}}, "packages": [
+        {"a": {"fetch": "simulate", "make": "simulate", **(a_config or {})}},
+        {"b": {"fetch": "simulate", "make": "simulate", "depends_on": ["a"]}},
+    ]})
+    plan_path = tmp_path / f"{top_name}.edpm.yaml"
+    plan.save(str(plan_path))
+    lock = LockfileConfig()
+    lock.file_path = str(tmp_path / f"{top_name}-lock.edpm.yaml")
+    lock.top_dir = str(tmp_path / top_name)
+    lock.save()
+    api = EdpmApi(str(plan_path), lock.file_path)
+    api.load_all()
+    return api
+
+
+def _keys(api):
+    return {name: api.binary_cache_key(name)["key"] for name in ("a", "b")}
+
+
+def _artifact(tmp_path, name="tool"):
+    """An install tree with a text file that has its prefix in it"""
+    install_path = tmp_path / "builder" / name / "install"
+    os.makedirs(install_path / "lib" / "cmake")
+    (install_path / "lib" / "cmake" / "toolConfig.cmake").write_text(f'set(TOOL_DIR "{install_path}/lib")\n')
+    (install_path / "lib" / "libtool.so").write_bytes(b"\x7fELF\0" + str(install_path).encode())
+    key_info = cache_key(name, "composed:git:cmake", {"fetch": "git"}, "abc", {}, "gcc")
+    return str(install_path), key_info
+
+
+def test_keys(tmp_path):
+    keys = _keys(_api(tmp_path))
+    assert keys == _keys(_api(tmp_path))
+    assert keys["a"] != keys["b"]
+
+    # Build-only settings and top_dir don't matter
+    assert _keys(_api(tmp_path, top_name="other", global_config={"build_threads": 16})) == keys
+
+    # A changed prerequisite changes its dependents
+    changed = _keys(_api(tmp_path, a_config={"cxx_standard": 20}))
+    assert changed["a"] != keys["a"] and changed["b"] != keys["b"]
+
+    # RPATH builds have absolute paths
+    assert _keys(_api(tmp_path, global_config={"use_rpath": True}))["a"] != \
+        _keys(_api(tmp_path, top_name="other", global_config={"use_rpath": True}))["a"]
+
+    # Local sources aren't cacheable, neither is what depends on them
+    api = _api(tmp_path, a_config={"fetch": "filesystem", "url": str(tmp_path)})
+    assert api.binary_cache_key("a") is None and api.binary_cache_key("b") is None
+
+
+def test_round_trip_and_relocation(tmp_path):
+    install_path, key_info = _artifact(tmp_path)
+    remote = DirectoryStore(str(tmp_path / "remote"))
+    assert push_artifact(remote, "tool", key_info, install_path, str(tmp_path / "builder"))
+    assert not push_artifact(remote, "tool", key_info, install_path, str(tmp_path / "builder"))
+
+    local = DirectoryStore(str(tmp_path / "local"))
+    meta = fetch_artifact(local, [remote], "tool", key_info["key"])
+    assert meta["prefix"] == install_path
+    assert local.exists(artifact_paths("tool", key_info["key"])["archive"])
+    assert fetch_artifact(local, [], "tool", key_info["key"]) == meta
+
+    new_path = str(tmp_path / "dev" / "tool" / "install")
+    assert extract_artifact(local, meta, new_path, str(tmp_path / "dev")) == 1
+    with open(os.path.join(new_path, "lib", "cmake", "toolConfig.cmake")) as f:
+        assert f.read() == f'set(TOOL_DIR "{new_path}/lib")\n'
+    with open(os.path.join(new_path, "lib", "libtool.so"), "rb") as f:
+        assert install_path.encode() in f.read()     # binaries are not patched
+
+    assert fetch_artifact(local, [remote], "tool", "0" * 64) is None
+
+
+def test_http_store(tmp_path):
+    server = binary_cache.make_server(str(tmp_path / "served"), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        remote = HttpStore(f"http://127.0.0.1:{server.server_address[1]}")
+        install_path, key_info = _artifact(tmp_path)
+        assert push_artifact(remote, "tool", key_info, install_path, str(tmp_path / "builder"))
+        assert os.path.isfile(tmp_path / "served" / "tool" / f"{key_info['key']}.tar.gz")
+        assert remote.exists(artifact_paths("tool", key_info["key"])["meta"])
+
+        local = DirectoryStore(str(tmp_path / "local"))
+        assert fetch_artifact(local, [remote], "tool", key_info["key"])["sha256"]
+        assert fetch_artifact(local, [remote], "tool", "0" * 64) is None
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_tampered_artifacts_are_rejected(tmp_path, monkeypatch):
+    install_path, key_info = _artifact(tmp_path)
+    remote = DirectoryStore(str(tmp_path / "remote"))
+    push_artifact(remote, "tool", key_info, install_path, str(tmp_path / "builder"))
+
+    archive = remote._path(artifact_paths("tool", key_info["key"])["archive"])
+    with tarfile.open(archive, "w:gz") as tar:
+        tar.add(str(tmp_path / "builder"), arcname=".")
+    with pytest.raises(CacheError, match="sha256"):
+        fetch_artifact(DirectoryStore(str(tmp_path / "local")), [remote], "tool", key_info["key"])
+
+    # With a secret, unsigned metadata is rejected, signed is accepted
+    monkeypatch.setenv(binary_cache.SECRET_ENV, "s3cret")
+    with pytest.raises(CacheError, match="signature"):
+        fetch_artifact(DirectoryStore(str(tmp_path / "local2")), [remote], "tool", key_info["key"])
+    push_artifact(remote, "tool", key_info, install_path, str(tmp_path / "builder"), force=True)
+    assert fetch_artifact(DirectoryStore(str(tmp_path / "local3")), [remote], "tool", key_info["key"])
+
+
+def test_install_from_cache(tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    builder = _api(tmp_path, top_name="ci", global_config={"binary_cache": cache_dir, "binary_cache_push": True})
+    builder.install_dependency_chain(["a", "b"])
+    keys = _keys(builder)
+    for name in ("a", "b"):
+        assert os.path.isfile(os.path.join(cache_dir, name, f"{keys[name]}.json"))
+        assert builder.lock.get_installed_package(name)[binary_cache.KEY_FIELD] == keys[name]
+
+    def no_builds(self):
+        raise AssertionError("built instead of taking from the cache")
+
+    monkeypatch.setattr(SimulatedMaker, "build", no_builds)
+    dev = _api(tmp_path, top_name="dev", global_config={"binary_cache": cache_dir})
+    dev.install_dependency_chain(["a", "b"])
+    for name in ("a", "b"):
+        install_path = dev.lock.get_installed_package(name)["install_path"]
+        assert install_path.startswith(dev.top_dir)
+        assert os.listdir(install_path)
+        assert dev.lock.get_installed_package(name)[binary_cache.KEY_FIELD] == keys[name]
+    assert os.path.isdir(os.path.join(local_cache_dir(dev.top_dir), "a"))
+
+
+def test_cli_push_pull_key(tmp_path):
+    api = _api(tmp_path)
+    api.install_dependency_chain(["a", "b"])
+    runner = CliRunner()
+    cache_dir = str(tmp_path / "cache")
+
+    result = runner.invoke(cli, ["cache", "push", "--to", cache_dir], obj=api)
+    assert result.exit_code == 0, result.output
+    assert result.output.count("pushed") == 2
+    result = runner.invoke(cli, ["cache", "push", "a", "--to", cache_dir], obj=api)
+    assert "already in the cache" in result.output
+
+    dev = _api(tmp_path, top_name="dev")
+    result = runner.invoke(cli, ["cache", "pull", "--from", cache_dir], obj=dev)
+    assert result.exit_code == 0, result.output
+    assert os.path.isdir(os.path.join(local_cache_dir(dev.top_dir), "b"))
+
+    result = runner.invoke(cli, ["cache", "key", "b"], obj=dev)
+    assert _keys(dev)["b"] in result.output
+    assert "prerequisites" in result.output
+
+
+def test_prefetch_package_level_cache(tmp_path, capsys):
+    cache_dir = str(tmp_path / "cache")
+    builder = _api(tmp_path, top_name="ci", a_config={"binary_cache": cache_dir, "binary_cache_push": True})
+    builder.install_dependency_chain(["a"])
+    key = builder.binary_cache_key("a")["key"]
+    capsys.readouterr()
+
+    dev = _api(tmp_path, top_name="dev", a_config={"binary_cache": cache_dir})
+    found = dev.prefetch_binary_cache(["a", "b"])
+    assert found["a"]["key"] == key
+    assert "1 of 1 packages found" in capsys.readouterr().out
+    assert os.path.isfile(os.path.join(local_cache_dir(dev.top_dir), "a", f"{key}.tar.gz"))
+
+
+def test_rpath_mode_survives_cache_restore(tmp_path, monkeypatch):
+    """RPATH builds taken from the cache or switched to as a version still get no LD_LIBRARY_PATH"""
+    original_install = SimulatedMaker.install
+
+    def rpath_install(self):
+        self.config["install_rpath"] = "$ORIGIN/../lib"
+        original_install(self)
+    monkeypatch.setattr(SimulatedMaker, "install", rpath_install)
+
+    cache_dir = str(tmp_path / "cache")
+    builder = _api(tmp_path, top_name="ci", global_config={"binary_cache": cache_dir, "binary_cache_push": True})
+    builder.install_dependency_chain(["a"])
+    assert builder.lock.get_installed_package("a")[RPATH_FIELD] == "$ORIGIN/../lib"
+
+    monkeypatch.setattr(SimulatedMaker, "build", lambda self: pytest.fail("built instead of taking from the cache"))
+    dev = _api(tmp_path, top_name="dev", global_config={"binary_cache": cache_dir})
+    dev.install_dependency_chain(["a"])
+    dep_data = dev.lock.get_installed_package("a")
+    assert dep_data[RPATH_FIELD] == "$ORIGIN/../lib"
+    assert "install_rpath" not in dep_data["built_with_config"]
+    assert is_rpath_installed(dep_data)
+
+    # Stored versions carry the field
+    dev.lock.store_version("a", "v1")
+    dev.lock.activate_version("a", "v1")
+    assert is_rpath_installed(dev.lock.get_installed_package("a"))
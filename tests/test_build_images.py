@@ -0,0 +1,67 @@
+import importlib.util
+import os
+import sys
+import time
+from datetime import datetime
+
+_spec = importlib.util.spec_from_file_location(
+    "build_images", os.path.join(os.path.dirname(__file__), "..", "docker", "build_images.py"))
+build_images = importlib.util.module_from_spec(_spec)
+sys.modules["build_images"] = build_images     # dataclasses look the module up
+_spec.loader.exec_module(build_images)
+
+
+def _specs(tmp_path):
+    # root -> (a, b), a -> c
+    chain = [("root", None), ("a", "root"), ("b", "root"), ("c", "a")]
+    return [build_images.ImageSpec(name=n, org="test", path=tmp_path, depends_on=d) for n, d in chain]
+
+
+def _fake_run(fail=()):
+    def run(cmd, *, dry_run=False, log_path=None, prefix=""):
+        start = datetime.now()
+        time.sleep(0.2)
+        if log_path:
+            log_path.parent.mkdir(parents=True, exist_ok=True)
+            log_path.write_text(" ".join(cmd))
+        return build_images.BuildResult("", "", 1 if prefix in fail else 0, start, datetime.now())
+    return run
+
+
+def test_dry_run_schedule(tmp_path):
+    builder = build_images.DockerBuilder(_specs(tmp_path), dry_run=True, log_dir=tmp_path / "logs")
+    assert builder.build_all() == 0
+    assert [r.image for r in builder.results][0] == "test/root:latest"
+    assert {r.image for r in builder.results} == {f"test/{n}:latest" for n in ("root", "a", "b", "c")}
+    assert all(r.action == "dry-run" for r in builder.results)
+    assert (tmp_path / "logs" / "c.log").is_file()
+    builder.print_summary()
+
+
+def test_independent_images_build_concurrently(tmp_path, monkeypatch):
+    monkeypatch.setattr(build_images, "_run", _fake_run())
+    builder = build_images.DockerBuilder(_specs(tmp_path), log_dir=tmp_path / "logs")
+    assert builder.build_all() == 0
+
+    results = {r.image.split("/")[1].split(":")[0]: r for r in builder.results}
+    # Children start after the parent, siblings overlap
+    assert results["a"].start >= results["root"].end
+    assert results["b"].start >= results["root"].end
+    assert results["c"].start >= results["a"].end
+    assert results["a"].start < results["b"].end and results["b"].start < results["a"].end
+    assert "docker buildx build" in (tmp_path / "logs" / "a.log").read_text()
+
+
+def test_max_parallel_and_failures(tmp_path, monkeypatch):
+    monkeypatch.setattr(build_images, "_run", _fake_run(fail=("a",)))
+    builder = build_images.DockerBuilder(_specs(tmp_path), max_parallel=1)
+    assert builder.build_all() == 1
+
+    results = {r.image.split("/")[1].split(":")[0]: r for r in builder.results}
+    assert results["a"].retcode == 1
+    assert results["b"].retcode == 0
+    assert results["c"].action == "skipped"
+
+    # One at a time
+    ordered = sorted((r for r in builder.results if r.action != "skipped"), key=lambda r: r.start)
+    assert all(prev.end <= cur.start for prev, cur in zip(ordered, ordered[1:]))
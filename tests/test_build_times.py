@@ -0,0 +1,126 @@
+import json
+
+import pytest
+
+from edpm.engine.build_times import (BuildTimeDB, MAX_SAMPLES, _amdahl, db_path, format_duration, format_total,
+                                     remaining_paths)
+from edpm.engine.cooperative import CooperativeInstaller
+from edpm.engine.lockfile import LockfileConfig
+from edpm.engine.api import EdpmApi
+
+from benchmarks.synthetic import make_plan
+
+
+def _stages(build):
+    return {"fetch": 1.0, "patch": 0.0, "build": build, "install": 1.0, "post_install": 0.0}
+
+
+def test_record_and_estimate_median(tmp_path):
+    db = BuildTimeDB(str(tmp_path / ".edpm" / "build-times.json"))
+    for build in (10, 30, 20):
+        db.record("root", "v6", 8, _stages(build))
+    assert db.estimate("root", "v6", 8) == pytest.approx(22.0)
+
+    # Another instance reads what was saved
+    assert BuildTimeDB(db.path).estimate("root", "v6", 8) == pytest.approx(22.0)
+    assert db.estimate("geant4", "v11", 8) is None
+
+
+def test_record_keeps_last_samples(tmp_path):
+    db = BuildTimeDB(str(tmp_path / "times.json"))
+    for build in range(MAX_SAMPLES + 3):
+        db.record("acts", "v38", 4, _stages(build))
+    samples = db.data["acts"]["v38"]["4"]
+    assert len(samples) == MAX_SAMPLES
+    assert samples[-1]["build"] == MAX_SAMPLES + 2
+
+
+def test_estimate_other_threads_and_versions(tmp_path):
+    db = BuildTimeDB(str(tmp_path / "times.json"))
+    db.record("root", "v6", 1, _stages(98))     # 100 s in total with 1 thread
+
+    assert db.estimate("root", "v6", 4) == pytest.approx(_amdahl(100, 1, 4))
+    assert db.estimate("root", "v6", 4) < 100
+    # Another version is the fallback
+    assert db.estimate("root", "v7", 1) == pytest.approx(100)
+
+
+def test_amdahl():
+    assert _amdahl(100, 4, 4) == pytest.approx(100)
+    assert _amdahl(100, 1, 2) == pytest.approx(55)
+    assert _amdahl(55, 2, 1) == pytest.approx(100)
+
+
+def test_remaining_paths_critical_path_first():
+    prerequisites = {"root": [], "fmt": [], "geant4": ["root"], "app": ["fmt"]}
+    estimates = {"root": 1000.0, "fmt": 10.0, "geant4": 500.0, "app": None}
+    paths = remaining_paths(["fmt", "root", "geant4", "app"], prerequisites, estimates, default=60)
+
+    assert paths["geant4"] == 500
+    assert paths["root"] == 1500
+    assert paths["app"] == 60
+    assert paths["fmt"] == 70
+    assert max(["fmt", "root"], key=paths.get) == "root"
+
+
+def test_remaining_paths_long_chain():
+    names = [f"p{i}" for i in range(3000)]
+    prerequisites = {name: names[i - 1:i] for i, name in enumerate(names)}
+    paths = remaining_paths(names, prerequisites, {}, default=1)
+    assert paths["p0"] == 3000
+
+
+def test_format_duration():
+    assert format_duration(None) == "unknown"
+    assert format_duration(42.4) == "42s"
+    assert format_duration(125) == "2m05s"
+    assert format_duration(2 * 3600 + 7 * 60) == "2h07m"
+
+
+def test_format_total():
+    assert format_total([30, 95]) == "~2m05s"
+    assert format_total([30, None]) == ">= 30s"
+    assert format_total([None, None]) == "unknown"
+
+
+def _simulated_api(tmp_path, count):
+    top_dir = tmp_path / "top"
+    make_plan(count, make="simulate", fetch="simulate").save(str(tmp_path / "plan.edpm.yaml"))
+    lock = LockfileConfig()
+    lock.file_path = str(tmp_path / "plan-lock.edpm.yaml")
+    lock.top_dir = str(top_dir)
+    lock.save()
+    api = EdpmApi(str(tmp_path / "plan.edpm.yaml"), lock.file_path)
+    api.load_all()
+    return api
+
+
+def test_install_records_build_times(tmp_path, capsys):
+    api = _simulated_api(tmp_path, 2)
+    names = [p.name for p in api.plan.packages()]
+    assert api.estimate_build_times(names) == {name: None for name in names}
+
+    api.install_dependency_chain(names)
+    with open(db_path(api.top_dir)) as f:
+        data = json.load(f)
+    assert sorted(data) == names
+    assert all(value is not None for value in api.estimate_build_times(names).values())
+    assert "[2/2]" in capsys.readouterr().out
+
+    # The second run knows the total
+    api.install_dependency_chain(names, force=True)
+    assert "Estimated time:" in capsys.readouterr().out
+
+
+def test_cooperative_priority(tmp_path):
+    api = _simulated_api(tmp_path, 3)
+    names = [p.name for p in api.plan.packages()]
+    db = api.build_time_db()
+    threads = api.expected_build_threads(dict(api.plan.global_config()))
+    db.record(names[0], "v1.0", threads, _stages(5))
+    db.record(names[1], "v1.0", threads, _stages(5000))
+
+    installer = CooperativeInstaller(api, names, worker_id="w")
+    # The chain pkg0 -> pkg1 -> pkg2 has to start with pkg0, and pkg0 carries pkg1's time
+    assert installer.priority[names[0]] > installer.priority[names[1]] > installer.priority[names[2]]
+    assert installer.priority[names[0]] >= 5000
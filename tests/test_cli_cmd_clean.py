@@ -7,6 +7,7 @@ from click.testing import CliRunner
 from edpm.cli.clean import clean_command
 from edpm.engine.api import EdpmApi
 from edpm.engine.lockfile import LockfileConfig
+from edpm.engine.trash import trash_dir, empty_trash
 import click
 
 @click.group()
@@ -78,8 +79,8 @@ def mock_api(tmp_path):
 
 def test_clean_success(runner, mock_api):
     """
-    Test that clean_command removes 'mypkg' directories from disk when owned = True.
-    We mock shutil.rmtree to confirm it's called with the correct directories.
+    Test that clean_command moves 'mypkg' build and source directories to the trash when owned = True.
+    The actual deletion runs in background, so we mock start_background_delete
     """
     # 1) Capture directories from the lock before calling 'clean'
     mypkg_data = mock_api.lock.data["packages"]["mypkg"]
@@ -87,7 +88,7 @@ def test_clean_success(runner, mock_api):
     build_dir   = mypkg_data["built_with_config"]["build_path"]
     source_dir  = mypkg_data["built_with_config"]["source_path"]
 
-    with patch.object(shutil, 'rmtree', side_effect=MagicMock()) as mock_rmtree, \
+    with patch("edpm.cli.clean.start_background_delete") as mock_delete, \
             patch.object(mock_api.lock, 'save', side_effect=MagicMock()) as mock_lock_save, \
             patch.object(mock_api, 'save_generator_scripts', side_effect=MagicMock()) as mock_save_gens:
 
@@ -96,14 +97,20 @@ def test_clean_success(runner, mock_api):
         assert result.exit_code == 0
         assert "Cleaned 'mypkg'" in result.output
 
-        # 3) Verify the calls
-        # We expect rmtree calls for install_dir, build_dir, source_dir
-        calls = [call.args[0] for call in mock_rmtree.call_args_list]
-        assert build_dir in calls
-        assert source_dir in calls
+        # 3) Build and source dirs are in the trash, install dir is untouched
+        assert not os.path.exists(build_dir)
+        assert not os.path.exists(source_dir)
+        assert os.path.isdir(install_dir)
+        trash = trash_dir(mock_api.top_dir)
+        assert len(os.listdir(trash)) == 2
+        mock_delete.assert_called_once_with(mock_api.top_dir)
 
         mock_save_gens.assert_called_once()
 
+        # 4) Background worker
+        empty_trash(trash)
+        assert os.listdir(trash) == []
+
 def test_clean_missing_install(runner, mock_api):
     """
     If the install_path is empty or the folder is missing, we show an error but do not rmtree anything.
@@ -136,3 +143,23 @@ def test_clean_not_owned(runner, mock_api):
         assert result.exit_code == 0
         assert "is not owned by EDPM. Remove manually" in result.output
         mock_rmtree.assert_not_called()
+
+def test_clean_remove_error(runner, mock_api):
+    """
+    A directory that can't be moved to the trash is reported, the other one is still removed
+    """
+    source_dir = mock_api.lock.data["packages"]["mypkg"]["built_with_config"]["source_path"]
+
+    def failing_remove(path, top_dir):
+        if path == source_dir:
+            raise PermissionError(13, "Permission denied")
+        shutil.rmtree(path)
+
+    with patch("edpm.cli.clean.remove_dir", side_effect=failing_remove), \
+            patch("edpm.cli.clean.start_background_delete"), \
+            patch.object(mock_api, 'save_generator_scripts', side_effect=MagicMock()):
+        result = runner.invoke(cli, ["clean", "mypkg"], obj=mock_api)
+        assert result.exit_code == 0, result.output
+        assert "Error removing" in result.output and "Permission denied" in result.output
+        assert not os.path.exists(mock_api.lock.data["packages"]["mypkg"]["built_with_config"]["build_path"])
+        assert "Cleaned 'mypkg'" in result.output
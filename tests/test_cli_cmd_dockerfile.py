@@ -0,0 +1,96 @@
+import click
+import pytest
+from click.testing import CliRunner
+
+from edpm.cli.dockerfile import dockerfile_command
+from edpm.engine.api import EdpmApi
+from edpm.engine.planfile import PlanFile
+
+
+@click.group()
+@click.pass_context
+def cli(ctx):
+    pass
+
+
+cli.add_command(dockerfile_command)
+
+
+def _plan(eicrecon_branch="v1.0"):
+    return PlanFile({
+        "global": {"config": {"cxx_standard": 20}},
+        "packages": [
+            "clhep@CLHEP_2_4_7_1",
+            {"acts": {"fetch": "git", "url": "https://github.com/acts-project/acts.git", "version": "v44.4.0"}},
+            {"eicrecon": {"fetch": "git", "url": "https://github.com/eic/EICrecon.git", "branch": eicrecon_branch}},
+            {"root": {"existing": "/opt/root"}},
+        ]
+    })
+
+
+def _invoke(plan, *args):
+    api = EdpmApi()
+    api.plan = plan
+    result = CliRunner().invoke(cli, ["dockerfile", *args], obj=api)
+    assert result.exit_code == 0, result.output
+    return result.output
+
+
+def _layers(text):
+    """{package: layer text}"""
+    layers = {}
+    for block in text.split("\n\n"):
+        if block.startswith("### ") and "(config" in block:
+            layers[block.split()[1]] = block
+    return layers
+
+
+def test_one_layer_per_package():
+    text = _invoke(_plan())
+    layers = _layers(text)
+    assert list(layers) == ["clhep", "acts", "eicrecon"]
+    assert "# root: skipped" in text
+
+    # A layer has only its own plan entry, sources/build/ccache are cache mounts
+    acts = layers["acts"]
+    assert "edpm install acts" in acts
+    assert "acts-project" in acts and "EICrecon" not in acts
+    assert "--mount=type=cache,id=edpm-src-acts-v44.4.0-" in acts
+    assert "target=/opt/software/acts/build" in acts
+    assert "id=edpm-ccache" in acts
+
+    # Final stage copies only top_dir, without edpm state
+    runtime = text[text.index("AS runtime"):]
+    assert "COPY --from=build /opt/software /opt/software" in runtime
+    assert text.index("RUN rm -rf /opt/software/.edpm") < text.index("AS runtime")
+    assert text.index("RUN rm -rf /opt/software/.edpm") > text.index("edpm install eicrecon")
+
+
+def test_package_change_changes_only_its_layer():
+    before = _layers(_invoke(_plan("v1.0")))
+    after = _layers(_invoke(_plan("v1.1")))
+    assert before["clhep"] == after["clhep"]
+    assert before["acts"] == after["acts"]
+    assert before["eicrecon"] != after["eicrecon"]
+
+
+def test_output_file_and_options(tmp_path):
+    out = tmp_path / "Dockerfile"
+    _invoke(_plan(), "-o", str(out), "--base", "eicdev/ubuntu-root:latest", "--no-ccache", "--top-dir", "/container/app")
+    text = out.read_text()
+    assert "ARG BASE_IMAGE=eicdev/ubuntu-root:latest" in text
+    assert "ccache" not in text
+    assert "edpm --top-dir=/container/app" in text
+
+
+def test_default_base_gets_build_tools():
+    text = _invoke(_plan())
+    build = text[:text.index("### Plan global section")]
+    assert "ARG BASE_IMAGE=ubuntu:24.04" in build
+    # Tools are installed only if missing, edpm goes to a venv (PEP 668)
+    assert "command -v c++" in build and "apt-get install -y --no-install-recommends" in build
+    assert "build-essential" in build and "python3-venv" in build
+    assert "python3 -m venv --system-site-packages /opt/edpm-venv" in build
+    assert "ENV PATH=/opt/edpm-venv/bin:$PATH" in build
+    assert "RUN python3 -m pip install" not in build
+    assert build.index("build-essential") < build.index("ccache &&")
@@ -0,0 +1,132 @@
+import os
+
+import click
+import pytest
+from click.testing import CliRunner
+
+from edpm.cli.export import export_command
+from edpm.engine.api import EdpmApi
+from edpm.engine.export import export_packages
+from edpm.engine.lockfile import LockfileConfig
+from edpm.engine.planfile import PlanFile
+
+
+@click.group()
+@click.pass_context
+def cli(ctx):
+    pass
+
+
+cli.add_command(export_command)
+
+
+def _write(path, text="x"):
+    os.makedirs(os.path.dirname(str(path)), exist_ok=True)
+    with open(str(path), "w") as f:
+        f.write(text)
+
+
+def _package(top_dir, name):
+    app_path = top_dir / name
+    _write(app_path / "src" / "file.cpp")
+    _write(app_path / "build" / "file.o")
+    _write(app_path / "install" / "bin" / name, "#!/bin/sh")
+    _write(app_path / "install" / "lib" / f"lib{name}.so.1")
+    os.symlink(str(app_path / "install" / "lib" / f"lib{name}.so.1"),
+               str(app_path / "install" / "lib" / f"lib{name}.so"))
+    return {
+        "install_path": str(app_path / "install"),
+        "owned": True,
+        "manifest": {"files": {}},
+        "built_with_config": {
+            "fetch": "git",
+            "source_path": str(app_path / "src"),
+            "build_path": str(app_path / "build"),
+            "install_path": str(app_path / "install"),
+        },
+    }
+
+
+@pytest.fixture
+def api(tmp_path):
+    top_dir = tmp_path / "top"
+    plan_file = tmp_path / "plan.edpm.yaml"
+    plan_file.write_text("global: {}\npackages: []\n")
+    api = EdpmApi(plan_file=str(plan_file), lock_file=str(tmp_path / "plan-lock.edpm.yaml"))
+    api.plan = PlanFile({
+        "global": {},
+        "packages": [
+            {"mypkg": {"fetch": "git", "environment": [{"prepend": {"PATH": "$install_path/bin"}}]}},
+            {"root": {"existing": "/opt/root"}},
+        ]
+    })
+    api.lock = LockfileConfig()
+    api.lock.file_path = api.lock_file
+    api.lock.data = {
+        "top_dir": str(top_dir),
+        "packages": {
+            "mypkg": _package(top_dir, "mypkg"),
+            "root": {"install_path": "/opt/root", "owned": False},
+        },
+    }
+    return api
+
+
+def test_export_install_only(tmp_path, api):
+    target = tmp_path / "deploy"
+    lock, stats = export_packages(api.lock, str(target), install_only=True)
+
+    assert os.path.isfile(target / "mypkg" / "install" / "bin" / "mypkg")
+    assert not os.path.exists(target / "mypkg" / "src")
+    assert not os.path.exists(target / "mypkg" / "build")
+    assert stats["mypkg"].files == 2
+
+    # Absolute symlinks point into the new root
+    link = os.readlink(str(target / "mypkg" / "install" / "lib" / "libmypkg.so"))
+    assert link == str(target / "mypkg" / "install" / "lib" / "libmypkg.so.1")
+
+    # Paths in the lock are rewritten, existing packages are kept as is
+    mypkg = lock.get_installed_package("mypkg")
+    assert lock.top_dir == str(target)
+    assert mypkg["install_path"] == str(target / "mypkg" / "install")
+    assert mypkg["built_with_config"]["source_path"] == str(target / "mypkg" / "src")
+    assert "manifest" not in mypkg
+    assert lock.get_installed_package("root")["install_path"] == "/opt/root"
+
+    # The source lock is untouched
+    assert api.lock.get_installed_package("mypkg")["install_path"] == str(tmp_path / "top" / "mypkg" / "install")
+
+
+def test_export_full_with_hardlinks(tmp_path, api):
+    target = tmp_path / "deploy"
+    _, stats = export_packages(api.lock, str(target), install_only=False, hardlink=True)
+
+    assert os.path.isfile(target / "mypkg" / "src" / "file.cpp")
+    assert os.path.isfile(target / "mypkg" / "build" / "file.o")
+    assert stats["mypkg"].linked == stats["mypkg"].files == 4
+    src = os.stat(str(tmp_path / "top" / "mypkg" / "install" / "bin" / "mypkg"))
+    dst = os.stat(str(target / "mypkg" / "install" / "bin" / "mypkg"))
+    assert src.st_ino == dst.st_ino
+
+
+def test_cli_export(tmp_path, api):
+    target = tmp_path / "deploy"
+    result = CliRunner().invoke(cli, ["export", "--install-only", str(target)], obj=api)
+    assert result.exit_code == 0, result.output
+    assert "mypkg" in result.output
+
+    assert os.path.isfile(target / "plan.edpm.yaml")
+    lock = LockfileConfig()
+    lock.load(str(target / "plan-lock.edpm.yaml"))
+    assert lock.top_dir == str(target)
+    assert lock.get_installed_package("mypkg")["install_path"] == str(target / "mypkg" / "install")
+
+    env_text = (target / "env.sh").read_text()
+    assert str(target / "mypkg" / "install" / "bin") in env_text
+    assert str(tmp_path / "top") not in env_text
+    assert os.path.isfile(target / "EDPMToolchain.cmake")
+
+
+def test_cli_export_to_top_dir_fails(tmp_path, api):
+    result = CliRunner().invoke(cli, ["export", str(tmp_path / "top")], obj=api)
+    assert result.exit_code != 0
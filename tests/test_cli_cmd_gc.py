@@ -0,0 +1,142 @@
+import os
+import time
+
+import click
+import pytest
+from click.testing import CliRunner
+from unittest.mock import patch
+
+from edpm.cli.gc import gc_command
+from edpm.engine.api import EdpmApi
+from edpm.engine.gc import scan_sizes, plan_gc, human_size
+from edpm.engine.lockfile import LockfileConfig
+from edpm.engine.trash import trash_dir, empty_trash, remove_dir
+
+
+@click.group()
+@click.pass_context
+def cli(ctx):
+    pass
+
+
+cli.add_command(gc_command)
+
+
+def _write(path, size):
+    os.makedirs(os.path.dirname(str(path)), exist_ok=True)
+    with open(str(path), "wb") as f:
+        f.write(b"x" * size)
+
+
+def _package(tmp_path, name, fetch="git", mtime=None, owned=True):
+    app_path = tmp_path / name
+    _write(app_path / "src" / "a" / "file.cpp", 10000)
+    _write(app_path / "build" / "obj" / "file.o", 20000)
+    _write(app_path / "install" / "lib" / "lib.so", 5000)
+    if mtime:
+        os.utime(str(app_path / "build"), (mtime, mtime))
+    return {
+        "install_path": str(app_path / "install"),
+        "owned": owned,
+        "built_with_config": {
+            "fetch": fetch,
+            "url": f"https://example.com/{name}.git",
+            "path": "/local/sources",
+            "source_path": str(app_path / "src"),
+            "build_path": str(app_path / "build"),
+        },
+    }
+
+
+def test_scan_sizes(tmp_path):
+    _write(tmp_path / "tree" / "a" / "b" / "file", 100000)
+    _write(tmp_path / "tree" / "top", 100000)
+    sizes = scan_sizes([str(tmp_path / "tree"), str(tmp_path / "nonexistent")], threads=2)
+    assert sizes[str(tmp_path / "tree")] >= 200000
+    assert sizes[str(tmp_path / "nonexistent")] == 0
+
+
+def test_human_size():
+    assert human_size(100) == "100 B"
+    assert human_size(1536) == "1.5 KB"
+    assert human_size(3 * 1024 ** 3) == "3.0 GB"
+
+
+def test_plan_gc_policies(tmp_path):
+    now = time.time()
+    packages = {
+        "old": _package(tmp_path, "old", mtime=now - 1000),
+        "new": _package(tmp_path, "new", mtime=now),
+        "local": _package(tmp_path, "local", fetch="filesystem", mtime=now - 2000),
+        "external": _package(tmp_path, "external", mtime=now - 3000, owned=False),
+    }
+    to_remove = {(item["package"], item["kind"]) for item in plan_gc(packages, keep_builds=1, drop_sources=True)}
+
+    # The newest build is kept, sources of local packages can't be restored, not owned is untouched
+    assert to_remove == {("old", "build"), ("local", "build"), ("old", "src")}
+
+    to_remove = plan_gc(packages, keep_builds=5, drop_sources=False)
+    assert to_remove == []
+
+
+def test_plan_gc_keeps_sources_of_kept_builds(tmp_path):
+    """An out-of-source build dir is good for incremental rebuilds only with its sources"""
+    now = time.time()
+    packages = {name: _package(tmp_path, name, mtime=now - age) for name, age in
+                (("a", 0), ("b", 100), ("c", 200))}
+    to_remove = plan_gc(packages, keep_builds=2, drop_sources=True)
+    assert {(item["package"], item["kind"]) for item in to_remove} == {("c", "build"), ("c", "src")}
+
+    to_remove = plan_gc(packages, keep_builds=0, drop_sources=True)
+    assert {item["package"] for item in to_remove if item["kind"] == "src"} == {"a", "b", "c"}
+
+
+@pytest.fixture
+def api(tmp_path):
+    api = EdpmApi(plan_file=str(tmp_path / "plan.edpm.yaml"), lock_file=str(tmp_path / "plan-lock.edpm.yaml"))
+    api.lock = LockfileConfig()
+    api.lock.file_path = str(tmp_path / "plan-lock.edpm.yaml")
+    api.lock.data = {"top_dir": str(tmp_path), "packages": {"mypkg": _package(tmp_path, "mypkg")}}
+    return api
+
+
+def test_cli_gc_dry_run(tmp_path, api):
+    result = CliRunner().invoke(cli, ["gc", "--dry-run", "--keep-builds", "0"], obj=api)
+    assert result.exit_code == 0, result.output
+    assert "mypkg" in result.output
+    assert "Would remove" in result.output
+    assert os.path.isdir(tmp_path / "mypkg" / "build")
+
+
+def test_cli_gc_moves_to_trash(tmp_path, api):
+    with patch("edpm.cli.gc.start_background_delete") as mock_delete:
+        result = CliRunner().invoke(cli, ["gc", "--keep-builds", "0"], obj=api)
+    assert result.exit_code == 0, result.output
+    mock_delete.assert_called_once_with(str(tmp_path))
+
+    assert not os.path.exists(tmp_path / "mypkg" / "build")
+    assert not os.path.exists(tmp_path / "mypkg" / "src")
+    assert os.path.isdir(tmp_path / "mypkg" / "install")
+    assert len(os.listdir(trash_dir(str(tmp_path)))) == 2
+
+    empty_trash(trash_dir(str(tmp_path)))
+    assert os.listdir(trash_dir(str(tmp_path))) == []
+
+
+def test_cli_gc_continues_after_remove_error(tmp_path, api):
+    """A dir that can't be removed is reported, the rest is removed and the trash is still emptied"""
+    src_dir = str(tmp_path / "mypkg" / "src")
+
+    def failing_remove(path, top_dir):
+        if path == src_dir:
+            raise PermissionError(13, "Permission denied")
+        remove_dir(path, top_dir)
+
+    with patch("edpm.cli.gc.remove_dir", side_effect=failing_remove), \
+            patch("edpm.cli.gc.start_background_delete") as mock_delete:
+        result = CliRunner().invoke(cli, ["gc", "--keep-builds", "0"], obj=api)
+    assert result.exit_code == 0, result.output
+    assert "Error removing" in result.output and "Permission denied" in result.output
+    assert not os.path.exists(tmp_path / "mypkg" / "build")
+    assert os.path.isdir(src_dir)
+    mock_delete.assert_called_once_with(str(tmp_path))
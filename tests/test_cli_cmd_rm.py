@@ -66,7 +66,7 @@ def mock_api():
 @patch('os.path.exists', return_value=True)
 def test_rm_owned_package_auto(mock_exists, runner, mock_api):
     """Test removing an owned package with default auto mode"""
-    with patch('shutil.rmtree') as mock_rmtree:
+    with patch('edpm.cli.rm.remove_dir') as mock_remove, patch('edpm.cli.rm.start_background_delete'):
         result = runner.invoke(cli, ["rm", "test-pkg"], obj=mock_api)
 
         # Check command output
@@ -82,13 +82,13 @@ def test_rm_owned_package_auto(mock_exists, runner, mock_api):
         mock_api.save_generator_scripts.assert_called_once()
 
         # Verify folders were removed
-        assert mock_rmtree.call_count == 3  # install, source, build folders
+        assert mock_remove.call_count == 3  # install, source, build folders
 
 
 @patch('os.path.exists', return_value=True)
 def test_rm_nonowned_package_auto(mock_exists, runner, mock_api):
     """Test removing a non-owned package with default auto mode - should not remove folders"""
-    with patch('shutil.rmtree') as mock_rmtree:
+    with patch('edpm.cli.rm.remove_dir') as mock_remove, patch('edpm.cli.rm.start_background_delete'):
         result = runner.invoke(cli, ["rm", "existing-pkg"], obj=mock_api)
 
         # Check command output
@@ -105,13 +105,13 @@ def test_rm_nonowned_package_auto(mock_exists, runner, mock_api):
         mock_api.save_generator_scripts.assert_called_once()
 
         # Verify folders were NOT removed
-        mock_rmtree.assert_not_called()
+        mock_remove.assert_not_called()
 
 
 @patch('os.path.exists', return_value=True)
 def test_rm_nonowned_package_all(mock_exists, runner, mock_api):
     """Test removing a non-owned package with --all flag - should remove folders"""
-    with patch('shutil.rmtree') as mock_rmtree:
+    with patch('edpm.cli.rm.remove_dir') as mock_remove, patch('edpm.cli.rm.start_background_delete'):
         result = runner.invoke(cli, ["rm", "existing-pkg", "--all"], obj=mock_api)
 
         # Check command output
@@ -125,13 +125,13 @@ def test_rm_nonowned_package_all(mock_exists, runner, mock_api):
         mock_api.save_generator_scripts.assert_called_once()
 
         # Verify folder was removed (despite not being owned)
-        mock_rmtree.assert_called_once_with("/external/path/existing-pkg")
+        mock_remove.assert_called_once_with("/external/path/existing-pkg", mock_api.top_dir)
 
 
 @patch('os.path.exists', return_value=True)
 def test_rm_lock_only(mock_exists, runner, mock_api):
     """Test removing just the lock entry with --lock flag"""
-    with patch('shutil.rmtree') as mock_rmtree:
+    with patch('edpm.cli.rm.remove_dir') as mock_remove, patch('edpm.cli.rm.start_background_delete'):
         result = runner.invoke(cli, ["rm", "test-pkg", "--lock"], obj=mock_api)
 
         # Check command output
@@ -144,7 +144,7 @@ def test_rm_lock_only(mock_exists, runner, mock_api):
         mock_api.save_generator_scripts.assert_called_once()
 
         # Verify folders were NOT removed
-        mock_rmtree.assert_not_called()
+        mock_remove.assert_not_called()
 
 
 def test_rm_package_not_found(runner, mock_api):
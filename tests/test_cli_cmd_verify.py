@@ -0,0 +1,121 @@
+import os
+
+import click
+import pytest
+from click.testing import CliRunner
+from ruamel.yaml import YAML
+
+from edpm.cli.verify import verify_command
+from edpm.engine.api import EdpmApi
+from edpm.engine.manifest import build_manifest, verify_manifest
+
+
+@click.group()
+@click.pass_context
+def cli(ctx):
+    pass
+
+
+cli.add_command(verify_command)
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(str(path)), exist_ok=True)
+    with open(str(path), "w") as f:
+        f.write(text)
+
+
+@pytest.fixture
+def install_tree(tmp_path):
+    install = tmp_path / "mypkg-install"
+    _write(install / "bin" / "tool", "tool")
+    _write(install / "lib" / "libfoo.so", "libfoo")
+    _write(install / "include" / "foo.h", "header")
+    return install
+
+
+def test_verify_manifest_quick_and_full(install_tree):
+    manifest = build_manifest(str(install_tree))
+    assert verify_manifest(manifest).ok
+
+    os.remove(str(install_tree / "bin" / "tool"))
+    _write(install_tree / "include" / "foo.h", "changed header")
+    _write(install_tree / "lib" / "libbar.so", "bar")
+
+    result = verify_manifest(manifest)
+    assert result.missing == [os.path.join("bin", "tool")]
+    assert result.modified == [os.path.join("include", "foo.h")]
+    assert result.extra == [os.path.join("lib", "libbar.so")]
+
+
+def test_verify_full_detects_same_size_change(install_tree):
+    manifest = build_manifest(str(install_tree))
+    lib = str(install_tree / "lib" / "libfoo.so")
+    st = os.stat(lib)
+    _write(lib, "libFOO")
+    os.utime(lib, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+    # Same size and mtime: only hashes show the change
+    assert verify_manifest(manifest).ok
+    assert verify_manifest(manifest, full=True).modified == [os.path.join("lib", "libfoo.so")]
+
+
+@pytest.fixture
+def api(tmp_path, install_tree):
+    plan_path = tmp_path / "plan.edpm.yaml"
+    lock_path = tmp_path / "plan-lock.edpm.yaml"
+    yaml = YAML()
+    with open(plan_path, "w") as f:
+        yaml.dump({"global": {"config": {}}, "packages": ["mypkg"]}, f)
+    with open(lock_path, "w") as f:
+        yaml.dump({"top_dir": str(tmp_path),
+                   "packages": {"mypkg": {"install_path": str(install_tree)}}}, f)
+    api = EdpmApi(plan_file=str(plan_path), lock_file=str(lock_path))
+    api.load_all()
+    return api
+
+
+def test_cli_verify(api, install_tree):
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ["verify"], obj=api)
+    assert result.exit_code == 0
+    assert "no manifest" in result.output
+
+    result = runner.invoke(cli, ["verify", "--record"], obj=api)
+    assert result.exit_code == 0, result.output
+    assert api.lock.get_installed_package("mypkg")["manifest"]
+
+    result = runner.invoke(cli, ["verify", "--full"], obj=api)
+    assert result.exit_code == 0, result.output
+    assert "mypkg" in result.output and "OK" in result.output
+
+    os.remove(str(install_tree / "bin" / "tool"))
+    result = runner.invoke(cli, ["verify"], obj=api)
+    assert result.exit_code == 1
+    assert "1 missing, 0 modified, 0 extra" in result.output
+
+
+def test_cli_verify_packages_in_parallel(tmp_path):
+    """Packages are checked concurrently, reported in order. One thread is enough (no deadlock)"""
+    names = ["zlib", "acts", "mypkg", "fmt"]
+    packages = {}
+    for name in names:
+        _write(tmp_path / name / "lib" / f"lib{name}.so", name)
+        packages[name] = {"install_path": str(tmp_path / name)}
+    yaml = YAML()
+    with open(tmp_path / "plan.edpm.yaml", "w") as f:
+        yaml.dump({"global": {"config": {}}, "packages": names}, f)
+    with open(tmp_path / "plan-lock.edpm.yaml", "w") as f:
+        yaml.dump({"top_dir": str(tmp_path), "packages": packages}, f)
+    api = EdpmApi(plan_file=str(tmp_path / "plan.edpm.yaml"), lock_file=str(tmp_path / "plan-lock.edpm.yaml"))
+    api.load_all()
+
+    runner = CliRunner()
+    assert runner.invoke(cli, ["verify", "--record"], obj=api).exit_code == 0
+    os.remove(str(tmp_path / "acts" / "lib" / "libacts.so"))
+
+    result = runner.invoke(cli, ["verify", "-j", "1", *names], obj=api)
+    assert result.exit_code == 1
+    lines = [line for line in result.output.splitlines() if not line.startswith(" ")]
+    assert lines == ["zlib: OK", "acts: 1 missing, 0 modified, 0 extra", "mypkg: OK", "fmt: OK"]
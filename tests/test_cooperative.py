@@ -0,0 +1,139 @@
+import json
+import multiprocessing
+import os
+import time
+
+import pytest
+from ruamel.yaml import YAML
+from unittest.mock import patch
+
+from edpm.engine.api import EdpmApi
+from edpm.engine.cooperative import CooperativeInstaller, Lease, queue_dir
+from edpm.engine.lockfile import LockfileConfig
+from edpm.engine.planfile import PlanFile
+from edpm.engine.recipe import Recipe
+
+
+class SlowRecipe(Recipe):
+    """Pretends to build: creates install dir and records who built it and when"""
+
+    def preconfigure(self):
+        self.config["install_path"] = os.path.join(self.config["app_path"], "install")
+
+    def run_full_pipeline(self):
+        start = time.time()
+        if self.config.get("fail"):
+            raise OSError("build failed with return code 2")
+        time.sleep(0.2)
+        os.makedirs(self.config["install_path"], exist_ok=True)
+        record = os.path.join(self.config["app_path"], f"built-{os.getpid()}-{time.time()}.json")
+        with open(record, "w") as f:
+            json.dump({"pid": os.getpid(), "start": start, "end": time.time()}, f)
+
+
+PLAN = {
+    "global": {"config": {}},
+    "packages": [
+        {"a": {"fetch": "filesystem", "path": "/tmp"}},
+        {"b": {"fetch": "filesystem", "path": "/tmp", "depends_on": ["a"]}},
+        {"c": {"fetch": "filesystem", "path": "/tmp", "depends_on": "a"}},
+        {"d": {"fetch": "filesystem", "path": "/tmp"}},     # default: everything before it
+    ]
+}
+
+
+def _write_files(tmp_path, plan):
+    yaml = YAML()
+    with open(tmp_path / "plan.edpm.yaml", "w") as f:
+        yaml.dump(plan, f)
+    with open(tmp_path / "plan-lock.edpm.yaml", "w") as f:
+        yaml.dump({"file_version": 1, "top_dir": str(tmp_path), "packages": {}}, f)
+
+
+def _worker(tmp_path, worker_id):
+    """One 'node'"""
+    os.chdir(str(tmp_path))
+    api = EdpmApi(plan_file=str(tmp_path / "plan.edpm.yaml"), lock_file=str(tmp_path / "plan-lock.edpm.yaml"))
+    api.load_all()
+    names = [p.name for p in api.plan.packages()]
+    with patch.object(api.recipe_manager, "create_recipe", side_effect=lambda name, cfg: SlowRecipe(cfg)), \
+            patch("edpm.engine.generators.environment_generator.EnvironmentGenerator.save_environment_with_infile"):
+        installer = CooperativeInstaller(api, names, worker_id=worker_id,
+                                         lease_timeout=5, heartbeat_interval=0.5, poll_interval=0.05)
+        installer.run()
+
+
+def _run_workers(tmp_path, count):
+    ctx = multiprocessing.get_context("fork")
+    processes = [ctx.Process(target=_worker, args=(tmp_path, f"node{i}")) for i in range(count)]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join(timeout=60)
+        assert p.exitcode == 0
+
+
+def _build_records(tmp_path, name):
+    app_path = tmp_path / name
+    if not app_path.is_dir():
+        return []
+    return [json.loads((app_path / f).read_text()) for f in os.listdir(app_path) if f.startswith("built-")]
+
+
+def test_package_dependencies():
+    plan = PlanFile(dict(PLAN))
+    assert plan.package_dependencies() == {"a": [], "b": ["a"], "c": ["a"], "d": ["a", "b", "c"]}
+
+
+def test_lease_exclusive_and_stale(tmp_path):
+    path = str(tmp_path / "pkg.lease")
+    first = Lease(path, "node0", lease_timeout=60, heartbeat_interval=10)
+    second = Lease(path, "node1", lease_timeout=60, heartbeat_interval=10)
+    assert first.acquire()
+    assert not second.acquire()
+
+    # The owner died: no heartbeats, the lease gets stale and can be taken over
+    first._stop.set()
+    old = time.time() - 120
+    os.utime(path, (old, old))
+    assert second.acquire()
+    second.release()
+    assert not os.path.exists(path)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_cooperative_install_processes(tmp_path):
+    _write_files(tmp_path, PLAN)
+    _run_workers(tmp_path, 3)
+
+    # Every package is built exactly once
+    records = {name: _build_records(tmp_path, name) for name in "abcd"}
+    assert all(len(r) == 1 for r in records.values()), records
+
+    # Prerequisites were finished before dependents started
+    for name in "bc":
+        assert records[name][0]["start"] >= records["a"][0]["end"]
+    assert records["d"][0]["start"] >= max(records[n][0]["end"] for n in "abc")
+
+    # All packages are published to the shared lock
+    lock = LockfileConfig()
+    lock.load(str(tmp_path / "plan-lock.edpm.yaml"))
+    assert all(lock.is_installed(name) for name in "abcd")
+    assert all(os.path.exists(os.path.join(queue_dir(str(tmp_path)), f"{n}.done")) for n in "abcd")
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_cooperative_install_failure_blocks_dependents(tmp_path):
+    plan = {"global": {"config": {}},
+            "packages": [{"a": {"fetch": "filesystem", "path": "/tmp", "fail": True}},
+                         {"b": {"fetch": "filesystem", "path": "/tmp", "depends_on": ["a"]}},
+                         {"c": {"fetch": "filesystem", "path": "/tmp", "depends_on": []}}]}
+    _write_files(tmp_path, plan)
+    _run_workers(tmp_path, 2)
+
+    lock = LockfileConfig()
+    lock.load(str(tmp_path / "plan-lock.edpm.yaml"))
+    assert not lock.is_installed("a")
+    assert not lock.is_installed("b")
+    assert lock.is_installed("c")
+    assert os.path.exists(os.path.join(queue_dir(str(tmp_path)), "a.failed"))
@@ -184,3 +184,45 @@ def test_cmake_presets_in_out(setup_test_environment):
     # If you want to ensure the generator added an “edpm” preset:
     # assert "edpm" in preset_names
 
+
+
+def test_cmake_toolchain_consolidated_prefix_and_dir_hints(tmp_path):
+    """
+    CMAKE_PREFIX_PATH entries from all packages go to one list(PREPEND ...),
+    and each exported *Config.cmake gets a direct <Package>_DIR hint.
+    """
+    root_install = tmp_path / "root-install"
+    (root_install / "cmake").mkdir(parents=True)
+    (root_install / "cmake" / "ROOTConfig.cmake").write_text("")
+    dd4hep_install = tmp_path / "dd4hep-install"
+    (dd4hep_install / "lib" / "cmake" / "DD4hep").mkdir(parents=True)
+    (dd4hep_install / "lib" / "cmake" / "DD4hep" / "DD4hepConfig.cmake").write_text("")
+    (dd4hep_install / "lib" / "cmake" / "DD4hep" / "DD4hepConfigVersion.cmake").write_text("")
+
+    api = _make_minimal_api()
+    api.recipe_manager.load_installers()
+    api.lock.data["packages"] = {
+        "root": {"install_path": str(root_install)},
+        "dd4hep": {"install_path": str(dd4hep_install)},
+    }
+
+    cm_gen = CmakeGenerator(plan=api.plan, lock=api.lock, recipe_manager=api.recipe_manager)
+    text = cm_gen.build_toolchain_text()
+
+    assert text.count("CMAKE_PREFIX_PATH") == 1
+    assert "list(INSERT" not in text
+    assert f'    "{root_install / "cmake"}"\n' in text
+    assert f'    "{dd4hep_install / "cmake"}"\n' in text
+    assert f'set(ROOT_DIR "{root_install / "cmake"}" CACHE PATH "Set by EDPM")' in text
+    assert f'set(DD4hep_DIR "{dd4hep_install / "lib" / "cmake" / "DD4hep"}" CACHE PATH "Set by EDPM")' in text
+    assert "DD4hepConfigVersion_DIR" not in text
+
+    # Precedence as with list(INSERT ... 0 ...) per package in name order: root before dd4hep
+    assert "CMake 3.15" in text
+    assert text.index(str(root_install / "cmake")) < text.index(str(dd4hep_install / "cmake"))
+
+    import json
+    presets = json.loads(cm_gen.build_presets_json())
+    cache_vars = presets["configurePresets"][0]["cacheVariables"]
+    assert cache_vars["CMAKE_PREFIX_PATH"]["value"].split(";")[0] == str(root_install / "cmake")
+    assert cache_vars["ROOT_DIR"]["value"] == str(root_install / "cmake")
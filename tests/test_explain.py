@@ -0,0 +1,132 @@
+import json
+import os
+
+import click
+import pytest
+from click.testing import CliRunner
+
+from edpm.cli.install import install_command
+from edpm.engine.api import EdpmApi
+from edpm.engine.binary_cache import DirectoryStore, push_artifact
+from edpm.engine.explain import DEFAULT_ESTIMATE, explain_install
+from edpm.engine.lockfile import LockfileConfig
+from edpm.engine.planfile import PlanFile
+
+
+@click.group()
+@click.pass_context
+def cli(ctx):
+    pass
+
+
+cli.add_command(install_command)
+
+
+@pytest.fixture
+def api(tmp_path):
+    """a <- b, a <- c, existing 'sys', a is installed"""
+    top_dir = tmp_path / "top"
+    (top_dir / "a" / "install").mkdir(parents=True)
+    plan = PlanFile({"global": {"config": {"build_threads": 4}}, "packages": [
+        {"a": {"fetch": "git", "make": "cmake", "url": "https://example.com/a.git", "branch": "main"}},
+        {"b": {"fetch": "git", "make": "cmake", "url": "https://example.com/b.git", "branch": "v1",
+               "depends_on": ["a"]}},
+        {"c": {"fetch": "simulate", "make": "simulate", "depends_on": ["a"]}},
+        {"sys": {"existing": "/usr"}},
+    ]})
+    plan.save(str(tmp_path / "plan.edpm.yaml"))
+
+    lock = LockfileConfig()
+    lock.file_path = str(tmp_path / "plan-lock.edpm.yaml")
+    lock.top_dir = str(top_dir)
+    lock.update_package("a", {"install_path": str(top_dir / "a" / "install"), "owned": True})
+    lock.save()
+
+    api = EdpmApi(str(tmp_path / "plan.edpm.yaml"), lock.file_path)
+    api.load_all()
+    return api
+
+
+def _by_name(result):
+    return {p["name"]: p for p in result["packages"]}
+
+
+def test_actions_and_stages(api):
+    top_dir = api.top_dir
+    os.makedirs(os.path.join(top_dir, "b", "src"))
+    open(os.path.join(top_dir, "b", "src", "CMakeLists.txt"), "w").close()
+    os.makedirs(os.path.join(top_dir, "b", "build"))
+    open(os.path.join(top_dir, "b", "build", "CMakeCache.txt"), "w").close()
+
+    packages = _by_name(explain_install(api, ["a", "b", "c", "sys"]))
+    assert packages["a"]["action"] == "installed"
+    assert packages["sys"]["action"] == "reference"
+    assert packages["b"]["action"] == packages["c"]["action"] == "build"
+
+    assert packages["b"]["stages"]["fetch"].startswith("skip")
+    assert packages["b"]["stages"]["configure"].startswith("reuse CMakeCache.txt")
+    assert packages["b"]["config"]["build_path"] == os.path.join(top_dir, "b", "build")
+    assert packages["b"]["config"]["build_threads"] == 4
+    assert packages["c"]["stages"]["build"] == "simulate 0.0s"
+
+    # Nothing was created or run
+    assert not os.path.exists(os.path.join(top_dir, "c"))
+
+
+def test_force_rebuilds_installed(api):
+    packages = _by_name(explain_install(api, ["a"], force=True))
+    assert packages["a"]["action"] == "build"
+    assert packages["a"]["stages"]["fetch"].startswith("git clone https://example.com/a.git")
+
+
+def test_schedule_and_estimates(api):
+    db = api.build_time_db()
+    db.record("b", "v1", 4, {"build": 300.0})
+
+    schedule = explain_install(api, ["a", "b", "c", "sys"], force=True)["schedule"]
+    assert schedule["waves"] == [["a"], ["b", "c"]]
+    assert schedule["unknown"] == ["a", "c"]
+    assert schedule["sequential"] == pytest.approx(300 + 2 * DEFAULT_ESTIMATE)
+    assert schedule["critical_path"] == pytest.approx(300 + DEFAULT_ESTIMATE)
+    assert schedule["critical_chain"] == ["a", "b"]
+
+
+def test_cli_explain_text_and_json(api):
+    runner = CliRunner()
+    result = runner.invoke(cli, ["install", "--explain"], obj=api)
+    assert result.exit_code == 0, result.output
+    assert "Install plan" in result.output
+    assert "wave 1: b, c" in result.output
+    assert not api.lock.is_installed("b")
+
+    result = runner.invoke(cli, ["install", "--explain", "--json"], obj=api)
+    assert result.exit_code == 0, result.output
+    data = json.loads(result.output)
+    assert [p["action"] for p in data["packages"]] == ["installed", "build", "build", "reference"]
+    assert data["schedule"]["waves"] == [["b", "c"]]
+
+
+def test_nothing_to_install(api, capsys):
+    api.install_dependency_chain(["a"], explain=True)
+    assert "Nothing to install!" in capsys.readouterr().out
+
+
+def test_cached_packages_are_not_scheduled(api, tmp_path):
+    # c is in the binary cache: an artifact pushed with its key
+    cache_dir = str(tmp_path / "cache")
+    api.plan.global_config()["binary_cache"] = cache_dir
+    install_path = tmp_path / "built"
+    install_path.mkdir()
+    (install_path / "file.txt").write_text("x")
+    c_key = api.binary_cache_key("c")
+    push_artifact(DirectoryStore(cache_dir), "c", c_key, str(install_path), str(tmp_path))
+
+    result = explain_install(api, ["a", "c"])
+    packages = _by_name(result)
+    assert packages["c"]["action"] == "cached"
+    assert packages["c"]["estimate"] == 0.0
+    assert packages["c"]["detail"].startswith(c_key["key"][:12])
+    assert result["schedule"]["waves"] == []
+
+    # --force builds anyway
+    assert _by_name(explain_install(api, ["c"], force=True))["c"]["action"] == "build"
@@ -0,0 +1,69 @@
+import os
+
+from edpm.engine.install_index import (index_install_tree, get_library_dirs,
+                                       get_cmake_config_dirs, INDEX_KEY)
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(str(path)), exist_ok=True)
+    with open(str(path), "w") as f:
+        f.write("")
+
+
+def test_index_install_tree(tmp_path):
+    _touch(tmp_path / "bin" / "tool")
+    _touch(tmp_path / "lib" / "libfoo.so")
+    _touch(tmp_path / "lib" / "libfoo.so.1.2")
+    _touch(tmp_path / "lib" / "libfoo.a")
+    _touch(tmp_path / "lib" / "cmake" / "Foo" / "FooConfig.cmake")
+    _touch(tmp_path / "lib" / "cmake" / "Foo" / "FooConfigVersion.cmake")
+    _touch(tmp_path / "share" / "bar" / "cmake" / "bar-config.cmake")
+    _touch(tmp_path / "include" / "foo.h")
+    os.symlink(str(tmp_path / "lib"), str(tmp_path / "lib64"))
+
+    index = index_install_tree(str(tmp_path))
+
+    assert index["bin_dirs"] == ["bin"]
+    assert index["lib_dirs"] == ["lib", "lib64"]
+    assert index["include_dirs"] == ["include"]
+    # lib64 => lib symlink is not listed twice
+    assert index["shared_libs"] == [os.path.join("lib", "libfoo.so"), os.path.join("lib", "libfoo.so.1.2")]
+    assert index["cmake_configs"] == {
+        "Foo": os.path.join("lib", "cmake", "Foo", "FooConfig.cmake"),
+        "bar": os.path.join("share", "bar", "cmake", "bar-config.cmake"),
+    }
+
+
+def test_index_missing_install_path(tmp_path):
+    index = index_install_tree(str(tmp_path / "nonexistent"))
+    assert index["lib_dirs"] == []
+    assert index["cmake_configs"] == {}
+
+
+def test_lookups_use_index_without_probing(tmp_path):
+    # The install path doesn't exist, so results can only come from the index
+    install_path = str(tmp_path / "nonexistent")
+    dep_data = {
+        "install_path": install_path,
+        INDEX_KEY: {"lib_dirs": ["lib64"], "cmake_configs": {"Foo": "lib64/cmake/Foo/FooConfig.cmake"}},
+    }
+    assert get_library_dirs(dep_data) == [os.path.join(install_path, "lib64")]
+    assert get_cmake_config_dirs(dep_data) == {"Foo": os.path.join(install_path, "lib64", "cmake", "Foo")}
+
+
+def test_lookups_fall_back_to_disk(tmp_path):
+    _touch(tmp_path / "lib" / "cmake" / "Foo" / "FooConfig.cmake")
+    dep_data = {"install_path": str(tmp_path)}
+    assert get_library_dirs(dep_data) == [str(tmp_path / "lib")]
+    assert get_cmake_config_dirs(dep_data) == {"Foo": str(tmp_path / "lib" / "cmake" / "Foo")}
+
+
+def test_recipes_take_lib_dirs_from_index(tmp_path):
+    from edpm.recipes.eicrecon import EicreconRecipe
+    from edpm.recipes.jana4ml4fpga import Jana4ml4fpgaRecipe
+
+    install_path = str(tmp_path / "nonexistent")
+    dep_data = {"install_path": install_path, INDEX_KEY: {"lib_dirs": ["lib64"]}}
+    for recipe in (EicreconRecipe, Jana4ml4fpgaRecipe):
+        ld_paths = [step.value for step in recipe.gen_env(dep_data) if getattr(step, "name", "") == "LD_LIBRARY_PATH"]
+        assert ld_paths == [os.path.join(install_path, "lib64")]
@@ -0,0 +1,49 @@
+import hashlib
+import os
+
+from edpm.engine.manifest import build_manifest, save_manifest, load_manifest, hash_file, list_files
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(str(path)), exist_ok=True)
+    with open(str(path), "w") as f:
+        f.write(text)
+
+
+def test_build_manifest(tmp_path):
+    _write(tmp_path / "bin" / "tool", "tool")
+    _write(tmp_path / "lib" / "libfoo.so", "libfoo")
+    os.symlink("libfoo.so", str(tmp_path / "lib" / "libfoo.so.1"))
+
+    manifest = build_manifest(str(tmp_path), threads=2)
+
+    files = manifest["files"]
+    assert sorted(files) == [os.path.join("bin", "tool"),
+                             os.path.join("lib", "libfoo.so"),
+                             os.path.join("lib", "libfoo.so.1")]
+    assert files[os.path.join("bin", "tool")]["size"] == 4
+    assert files[os.path.join("bin", "tool")]["hash"] == hashlib.sha256(b"tool").hexdigest()
+    # Symlinks are recorded by their target, not followed
+    assert files[os.path.join("lib", "libfoo.so.1")]["hash"].startswith("link:")
+
+
+def test_build_manifest_exclude_shared(tmp_path):
+    _write(tmp_path / "lib" / "liba.so", "a")
+    _write(tmp_path / "lib" / "libb.so", "b")
+    manifest = build_manifest(str(tmp_path), exclude=[os.path.join("lib", "liba.so")])
+    assert list(manifest["files"]) == [os.path.join("lib", "libb.so")]
+
+
+def test_manifest_save_load(tmp_path):
+    _write(tmp_path / "install" / "file.txt", "content")
+    manifest = build_manifest(str(tmp_path / "install"))
+    manifest_path = str(tmp_path / ".edpm" / "manifests" / "pkg.json")
+    save_manifest(manifest, manifest_path)
+    assert load_manifest(manifest_path) == manifest
+
+
+def test_list_files_does_not_follow_dir_links(tmp_path):
+    _write(tmp_path / "lib" / "liba.so", "a")
+    os.symlink(str(tmp_path / "lib"), str(tmp_path / "lib64"))
+    assert list_files(str(tmp_path)) == [os.path.join("lib", "liba.so"), "lib64"]
+    assert hash_file(str(tmp_path / "lib64")).startswith("link:")
@@ -0,0 +1,108 @@
+import os
+
+import pytest
+
+import edpm.engine.makers as makers
+import edpm.engine.parallelism as parallelism
+from edpm.engine.generators.steps import CmakePrefixPath, EnvPrepend
+from edpm.engine.install_index import index_install_tree, INDEX_KEY
+from edpm.engine.makers import MesonMaker, make_maker
+from edpm.engine.recipe_manager import RecipeManager
+
+
+@pytest.fixture
+def commands(monkeypatch):
+    """Records commands instead of running them"""
+    executed = []
+
+    def run(command, env_file=None):
+        executed.append(command)
+        if command.startswith("meson setup"):
+            build_path = command.split('"')[-4]
+            os.makedirs(os.path.join(build_path, "meson-private"), exist_ok=True)
+            open(os.path.join(build_path, "meson-private", "coredata.dat"), "w").close()
+
+    monkeypatch.setattr(makers, "run", run)
+    monkeypatch.setattr(parallelism, "run", run)
+    return executed
+
+
+def _config(tmp_path, **extra):
+    env_file = tmp_path / "env.sh"
+    env_file.write_text("")
+    return {
+        "make": "meson",
+        "source_path": str(tmp_path / "src"),
+        "build_path": str(tmp_path / "build"),
+        "install_path": str(tmp_path / "install"),
+        "env_file_bash": str(env_file),
+        "build_threads": 3,
+        **extra,
+    }
+
+
+def _maker(config):
+    maker = make_maker(config)
+    maker.preconfigure()
+    return maker
+
+
+def test_build_types(tmp_path):
+    assert isinstance(make_maker(_config(tmp_path)), MesonMaker)
+    assert "--buildtype=debugoptimized" in _maker(_config(tmp_path)).config["setup_options"]
+    assert "--buildtype=release" in _maker(_config(tmp_path, cmake_build_type="Release")).config["setup_options"]
+    maker = _maker(_config(tmp_path, cmake_build_type="Release", meson_build_type="plain", meson_flags="-Dtests=false"))
+    assert maker.config["setup_options"].endswith("--libdir=lib --buildtype=plain -Dtests=false")
+
+
+def test_setup_once_then_reconfigure_on_change(tmp_path, commands):
+    maker = _maker(_config(tmp_path))
+    assert maker.setup_state() == "fresh"
+    maker.build()
+    maker.install()
+    assert commands[0].startswith("meson setup --prefix=")
+    assert commands[1] == f'meson compile -C "{tmp_path / "build"}" -j 3'
+    assert commands[2] == f'meson install -C "{tmp_path / "build"}" --no-rebuild'
+
+    # Same options: only ninja runs
+    commands.clear()
+    maker = _maker(_config(tmp_path))
+    assert maker.setup_state() == "reuse"
+    maker.build()
+    assert [c.split()[1] for c in commands] == ["compile"]
+
+    # Changed options
+    commands.clear()
+    maker = _maker(_config(tmp_path, meson_flags="-Dtests=false"))
+    assert maker.explain()["configure"].startswith("meson setup --reconfigure")
+    maker.build()
+    assert commands[0].startswith("meson setup --reconfigure")
+
+
+def test_foreign_build_dir_is_wiped(tmp_path):
+    os.makedirs(tmp_path / "build" / "meson-private")
+    (tmp_path / "build" / "meson-private" / "coredata.dat").write_text("")
+    assert _maker(_config(tmp_path)).setup_state() == "wipe"
+
+
+def test_gen_env_for_composed_package(tmp_path):
+    install_path = tmp_path / "install"
+    for path in ("bin", "lib/pkgconfig", "share/pkgconfig"):
+        os.makedirs(install_path / path)
+    dep_data = {
+        "install_path": str(install_path),
+        "built_with_config": {"make": "meson"},
+        INDEX_KEY: index_install_tree(str(install_path)),
+    }
+    assert dep_data[INDEX_KEY]["pkgconfig_dirs"] == ["lib/pkgconfig", "share/pkgconfig"]
+
+    actions = RecipeManager().gen_env("mylib", dep_data)
+    prepends = [(a.name, a.value) for a in actions if isinstance(a, EnvPrepend) and not isinstance(a, CmakePrefixPath)]
+    assert ("PATH", str(install_path / "bin")) in prepends
+    assert ("LD_LIBRARY_PATH", str(install_path / "lib")) in prepends
+    assert ("PKG_CONFIG_PATH", str(install_path / "lib" / "pkgconfig")) in prepends
+    assert ("PKG_CONFIG_PATH", str(install_path / "share" / "pkgconfig")) in prepends
+    assert any(isinstance(a, CmakePrefixPath) for a in actions)
+
+    # Other makers add nothing on their own
+    assert RecipeManager().gen_env("mylib", {**dep_data, "built_with_config": {"make": "cmake"}}) == []
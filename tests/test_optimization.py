@@ -0,0 +1,144 @@
+import os
+
+import pytest
+
+from edpm.engine import optimization
+from edpm.engine.api import EdpmApi
+from edpm.engine.commands import run
+from edpm.engine.lockfile import LockfileConfig
+from edpm.engine.makers import make_maker
+from edpm.engine.optimization import LOCK_FIELD, cmake_flags, native_flag, resolve_profile
+from edpm.engine.planfile import PlanFile
+
+
+@pytest.fixture(autouse=True)
+def no_env_flags(monkeypatch):
+    for var in ("CFLAGS", "CXXFLAGS", "LDFLAGS"):
+        monkeypatch.delenv(var, raising=False)
+
+
+def _config(tmp_path, make, **extra):
+    env_file = tmp_path / "env.sh"
+    env_file.write_text("")
+    return {
+        "make": make,
+        "app_name": "tool",
+        "app_path": str(tmp_path),
+        "source_path": str(tmp_path / "src"),
+        "build_path": str(tmp_path / "build"),
+        "install_path": str(tmp_path / "install"),
+        "env_file_bash": str(env_file),
+        "edpm_dir": str(tmp_path / ".edpm"),
+        "build_threads": 2,
+        **extra,
+    }
+
+
+def _maker(config):
+    maker = make_maker(config)
+    maker.preconfigure()
+    return maker
+
+
+def test_resolve_profile(tmp_path):
+    assert resolve_profile({}) is None
+    assert resolve_profile({"optimization_profile": "portable"})["cflags"] == ""
+
+    profile = resolve_profile({"optimization_profile": "lto-native"})
+    assert profile["build_type"] == "Release" and profile["lto"]
+    assert native_flag() in profile["cflags"].split()
+
+    custom = {"optimization_profile": "avx2",
+              "optimization_profiles": {"avx2": {"cflags": "-march=haswell", "lto": True}}}
+    assert resolve_profile(custom)["cflags"] == "-march=haswell"
+
+    with pytest.raises(ValueError, match="Unknown optimization_profile"):
+        resolve_profile({"optimization_profile": "fastest"})
+
+    pgo = resolve_profile({"optimization_profile": "native", "pgo": "generate", "edpm_dir": "/top/.edpm",
+                           "app_name": "acts"})
+    assert "-fprofile-generate=/top/.edpm/pgo/acts" in pgo["cflags"].split()
+    assert "-fprofile-generate=/top/.edpm/pgo/acts" in pgo["ldflags"].split()
+
+
+def test_cmake(tmp_path, monkeypatch):
+    # No profile: the command is unchanged
+    command = _maker(_config(tmp_path, "cmake")).config["configure_cmd"]
+    assert "-DCMAKE_BUILD_TYPE=RelWithDebInfo" in command
+    assert "CMAKE_INTERPROCEDURAL_OPTIMIZATION" not in command
+
+    monkeypatch.setenv("CXXFLAGS", "-pipe")
+    config = _config(tmp_path, "cmake", optimization_profile="lto-native", cmake_build_type="RelWithDebInfo",
+                     cmake_flags="-DCMAKE_CXX_FLAGS=-O1")
+    command = _maker(config).config["configure_cmd"]
+    assert "-DCMAKE_BUILD_TYPE=Release " in command
+    assert "-DCMAKE_INTERPROCEDURAL_OPTIMIZATION=ON" in command
+    assert f"-DCMAKE_CXX_FLAGS='-pipe {native_flag()}'" in command
+    # Recipe flags come later and win
+    assert command.index(f"-DCMAKE_CXX_FLAGS='-pipe") < command.index("-DCMAKE_CXX_FLAGS=-O1")
+    assert _maker(config).explain()["configure"].endswith("lto-native profile")
+
+
+def test_flags_survive_the_shell(tmp_path):
+    """Commands run as bash -c "source env && ...", the flags must stay one word each"""
+    out = tmp_path / "args.txt"
+    flags = cmake_flags(resolve_profile({"optimization_profile": "native"}))
+    run(f"printf '%s\\n' {flags} > {out}", env_file=_config(tmp_path, "cmake")["env_file_bash"])
+    args = out.read_text().splitlines()
+    assert len(args) == 6
+    assert f"-DCMAKE_C_FLAGS={native_flag()}" in args
+
+
+def test_autotools(tmp_path):
+    maker = _maker(_config(tmp_path, "autotools", optimization_profile="lto-native"))
+    command = maker._configure_cmd("")
+    assert f"CFLAGS='-O3 -DNDEBUG {native_flag()} -flto'" in command
+    assert "LDFLAGS='" in command and "-flto'" in command
+    assert maker.config["autotools_config_cache"].endswith("-lto-native.cache")
+
+    plain = _maker(_config(tmp_path, "autotools"))
+    assert "CFLAGS" not in plain._configure_cmd("")
+    assert plain.config["autotools_config_cache"] != maker.config["autotools_config_cache"]
+
+
+def test_meson(tmp_path):
+    options = _maker(_config(tmp_path, "meson", optimization_profile="lto-native",
+                             meson_build_type="debug")).config["setup_options"]
+    assert "--buildtype=release" in options
+    assert "-Db_lto=true" in options
+    assert f"-Dcpp_args={native_flag()}" in options
+
+
+def _api(tmp_path, name, profile=""):
+    config = {"build_threads": 2, "binary_cache": str(tmp_path / "cache")}
+    if profile:
+        config["optimization_profile"] = profile
+    plan = PlanFile({"global": {"config": config},
+                     "packages": [{"a": {"fetch": "simulate", "make": "simulate"}}]})
+    plan.save(str(tmp_path / f"{name}.edpm.yaml"))
+    lock = LockfileConfig()
+    lock.file_path = str(tmp_path / f"{name}-lock.edpm.yaml")
+    lock.top_dir = str(tmp_path / name)
+    lock.save()
+    api = EdpmApi(str(tmp_path / f"{name}.edpm.yaml"), lock.file_path)
+    api.load_all()
+    return api
+
+
+def test_cache_key_and_lock(tmp_path, monkeypatch):
+    plain = _api(tmp_path, "plain").binary_cache_key("a")
+    portable = _api(tmp_path, "portable", "portable").binary_cache_key("a")
+    native = _api(tmp_path, "native", "native").binary_cache_key("a")
+    assert len({plain["key"], portable["key"], native["key"]}) == 3
+    assert "optimization" not in plain["inputs"]
+    assert "cpu" not in portable["inputs"]["optimization"]
+
+    # Native builds are only reused on the same CPU
+    assert native["inputs"]["optimization"]["cpu"]
+    monkeypatch.setattr(optimization, "host_cpu_id", lambda: "other cpu")
+    assert _api(tmp_path, "native2", "native").binary_cache_key("a")["key"] != native["key"]
+
+    api = _api(tmp_path, "installed", "native")
+    api.install_dependency_chain(["a"])
+    assert api.lock.get_installed_package("a")[LOCK_FIELD]["name"] == "native"
+    assert os.path.isdir(api.lock.get_installed_package("a")["install_path"])
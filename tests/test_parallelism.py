@@ -0,0 +1,144 @@
+import pytest
+
+from edpm.engine import parallelism
+from edpm.engine.makers import CmakeMaker
+from edpm.engine.parallelism import (GB, auto_build_threads, resolve_build_threads, memory_pressure,
+                                     available_memory, run_adaptive_build)
+from edpm.recipes.acts import ActsRecipe
+from edpm.recipes.geant4 import Geant4Recipe
+from edpm.recipes.root import RootRecipe
+
+
+@pytest.fixture
+def machine(monkeypatch):
+    """16 CPUs, 8 GB available"""
+    monkeypatch.setattr(parallelism, "detect_cpus", lambda: 16)
+    monkeypatch.setattr(parallelism, "available_memory", lambda: 8 * GB)
+
+
+def test_auto_build_threads():
+    assert auto_build_threads(1.0, cpus=16, memory=64 * GB) == 16     # CPU bound
+    assert auto_build_threads(2.0, cpus=16, memory=8 * GB) == 4       # memory bound
+    assert auto_build_threads(4.0, cpus=16, memory=1 * GB) == 1       # at least one
+
+
+def test_auto_build_threads_memory_unknown(monkeypatch):
+    monkeypatch.setattr(parallelism, "available_memory", lambda: None)
+    assert auto_build_threads(2.0, cpus=8) == 8
+
+
+def test_resolve_build_threads(machine):
+    assert resolve_build_threads({}) == 8
+    assert resolve_build_threads({"build_threads": "auto", "build_job_memory_gb": 2.0}) == 4
+    assert resolve_build_threads({"build_threads": "6", "build_job_memory_gb": 2.0}) == 6
+
+
+def test_cmake_maker_threads(machine, tmp_path):
+    config = {"build_path": str(tmp_path / "build"), "install_path": str(tmp_path / "install"),
+              "source_path": str(tmp_path / "src"), "build_job_memory_gb": 4.0}
+    maker = CmakeMaker(dict(config))
+    maker.preconfigure()
+    assert maker.config["build_threads"] == 2
+    assert maker.config["adaptive_build_threads"] is True
+    assert maker.config["build_cmd"].endswith("--parallel 2")
+
+    maker = CmakeMaker(dict(config, build_threads=3))
+    maker.preconfigure()
+    assert maker.config["build_threads"] == 3
+    assert maker.config["adaptive_build_threads"] is False
+
+
+def test_proc_readers(monkeypatch):
+    files = {
+        "/proc/pressure/memory": "some avg10=12.50 avg60=3.00 avg300=1.00 total=100\n"
+                                 "full avg10=1.00 avg60=0.00 avg300=0.00 total=10",
+        "/proc/meminfo": "MemTotal:       16000000 kB\nMemAvailable:    4000000 kB",
+        "/sys/fs/cgroup/memory.max": str(3 * GB),
+        "/sys/fs/cgroup/memory.current": str(1 * GB),
+    }
+    monkeypatch.setattr(parallelism, "_read", lambda path: files.get(path, ""))
+    assert memory_pressure() == 12.5
+    assert parallelism.is_under_pressure()
+    assert available_memory() == 2 * GB     # cgroup limit is lower than MemAvailable
+
+    assert parallelism.oom_kills() is None
+    files["/proc/vmstat"] = "pgfault 100\noom_kill 3"
+    assert parallelism.oom_kills() == 3
+    files["/sys/fs/cgroup/memory.events"] = "low 0\nhigh 0\nmax 2\noom 1\noom_kill 1"
+    assert parallelism.oom_kills() == 1     # our cgroup first
+
+
+def _fake_run(monkeypatch, fail_times, return_code=137, oom_counter=None):
+    """Fake build that fails fail_times. oom_counter: None if unknown, else [count] incremented on a failure"""
+    commands = []
+    monkeypatch.setattr(parallelism, "oom_kills", lambda: oom_counter[0] if oom_counter else None)
+
+    def run(command, env_file=None):
+        commands.append(command)
+        if len(commands) <= fail_times:
+            if oom_counter:
+                oom_counter[0] += 1
+            raise OSError(f"Command failed with return code {return_code}")
+    monkeypatch.setattr(parallelism, "run", run)
+    return commands
+
+
+def test_adaptive_build_retries_oom_kills(monkeypatch):
+    # make returns 2 when the OOM killer took a compiler, the counter tells it
+    commands = _fake_run(monkeypatch, fail_times=2, return_code=2, oom_counter=[5])
+    monkeypatch.setattr(parallelism, "is_under_pressure", lambda: False)
+    threads = run_adaptive_build(lambda n: f"make -j {n}", 8, monitor_interval=0.01)
+    assert threads == 2
+    assert commands == ["make -j 8", "make -j 4", "make -j 2"]
+
+
+def test_adaptive_build_no_oom_kill_is_not_retried(monkeypatch):
+    # Counter didn't grow: a compile error, even if memory was under pressure
+    commands = []
+    monkeypatch.setattr(parallelism, "oom_kills", lambda: 5)
+    monkeypatch.setattr(parallelism, "is_under_pressure", lambda: True)
+
+    def run(command, env_file=None):
+        commands.append(command)
+        raise OSError("Command failed with return code 2")
+    monkeypatch.setattr(parallelism, "run", run)
+    with pytest.raises(OSError):
+        run_adaptive_build(lambda n: f"make -j {n}", 8, monitor_interval=0.01)
+    assert commands == ["make -j 8"]
+
+
+def test_adaptive_build_without_counters(monkeypatch):
+    # SIGKILL under pressure counts as an OOM kill
+    commands = _fake_run(monkeypatch, fail_times=2)
+    monkeypatch.setattr(parallelism, "is_under_pressure", lambda: True)
+    assert run_adaptive_build(lambda n: f"make -j {n}", 8, monitor_interval=0.01) == 2
+    assert commands == ["make -j 8", "make -j 4", "make -j 2"]
+
+    # Other failures under pressure are not
+    commands = _fake_run(monkeypatch, fail_times=1, return_code=2)
+    with pytest.raises(OSError):
+        run_adaptive_build(lambda n: f"make -j {n}", 8, monitor_interval=0.01)
+    assert commands == ["make -j 8"]
+
+
+def test_adaptive_build_fails_without_pressure(monkeypatch):
+    commands = _fake_run(monkeypatch, fail_times=1)
+    monkeypatch.setattr(parallelism, "is_under_pressure", lambda: False)
+    with pytest.raises(OSError):
+        run_adaptive_build(lambda n: f"make -j {n}", 8, monitor_interval=0.01)
+    assert commands == ["make -j 8"]
+
+
+def test_pinned_build_is_not_retried(monkeypatch):
+    _fake_run(monkeypatch, fail_times=1, oom_counter=[0])
+    monkeypatch.setattr(parallelism, "is_under_pressure", lambda: True)
+    with pytest.raises(OSError):
+        run_adaptive_build(lambda n: f"make -j {n}", 8, adaptive=False, monitor_interval=0.01)
+
+
+def test_heavy_recipes_declare_job_memory():
+    root = RootRecipe({"app_path": "/tmp/root"}).config
+    assert root["build_job_memory_gb"] == 2.0
+    assert "-Dhttp=ON" in root["cmake_flags"]
+    assert Geant4Recipe({"app_path": "/tmp/geant4"}).config["build_job_memory_gb"] == 1.5
+    assert ActsRecipe({"app_path": "/tmp/acts"}).config["build_job_memory_gb"] == 3.0
@@ -0,0 +1,145 @@
+import os
+import shutil
+import sys
+import textwrap
+
+import pytest
+
+import edpm.engine.makers as makers
+from edpm.engine.generators.steps import EnvPrepend
+from edpm.engine.install_index import index_install_tree, INDEX_KEY
+from edpm.engine.makers import PipMaker, make_maker
+from edpm.engine.recipe_manager import RecipeManager
+
+# A package with an in-tree PEP 517 backend that zips the wheel itself,
+# so pip builds it without setuptools and without network access
+BACKEND = textwrap.dedent('''
+    import os, zipfile
+
+    NAME, VERSION = "edpmdemo", "0.1"
+    DIST_INFO = f"{NAME}-{VERSION}.dist-info"
+
+    def build_wheel(wheel_directory, config_settings=None, metadata_directory=None):
+        wheel = f"{NAME}-{VERSION}-py3-none-any.whl"
+        with zipfile.ZipFile(os.path.join(wheel_directory, wheel), "w") as zf:
+            zf.write("edpmdemo.py", "edpmdemo.py")
+            zf.writestr(f"{DIST_INFO}/METADATA", f"Metadata-Version: 2.1\\nName: {NAME}\\nVersion: {VERSION}\\n")
+            zf.writestr(f"{DIST_INFO}/WHEEL", "Wheel-Version: 1.0\\nGenerator: test\\nRoot-Is-Purelib: true\\nTag: py3-none-any\\n")
+            zf.writestr(f"{DIST_INFO}/entry_points.txt", "[console_scripts]\\nedpmdemo = edpmdemo:main\\n")
+            zf.writestr(f"{DIST_INFO}/RECORD", "")
+        return wheel
+''')
+
+PYPROJECT = textwrap.dedent('''
+    [build-system]
+    requires = []
+    build-backend = "backend"
+    backend-path = ["."]
+''')
+
+
+def _source(path):
+    os.makedirs(path)
+    with open(os.path.join(path, "backend.py"), "w") as f:
+        f.write(BACKEND)
+    with open(os.path.join(path, "pyproject.toml"), "w") as f:
+        f.write(PYPROJECT)
+    with open(os.path.join(path, "edpmdemo.py"), "w") as f:
+        f.write("def main():\n    print('demo')\n")
+
+
+def _config(tmp_path, name="edpmdemo", **extra):
+    env_file = tmp_path / "env.sh"
+    env_file.write_text("")
+    app_path = tmp_path / name
+    return {
+        "make": "pip",
+        "fetch": "filesystem",
+        "app_name": name,
+        "source_path": str(app_path / "src"),
+        "build_path": str(app_path / "build"),
+        "install_path": str(app_path / "install"),
+        "env_file_bash": str(env_file),
+        "edpm_dir": str(tmp_path / ".edpm"),
+        "python_executable": sys.executable,
+        "pip_no_deps": True,
+        **extra,
+    }
+
+
+def _build(config):
+    maker = make_maker(config)
+    maker.preconfigure()
+    maker.build()
+    maker.install()
+    return maker
+
+
+@pytest.fixture
+def commands(monkeypatch):
+    executed = []
+    real_run = makers.run
+
+    def run(command, env_file=None):
+        executed.append(command)
+        real_run(command, env_file)
+
+    monkeypatch.setattr(makers, "run", run)
+    return executed
+
+
+def test_build_install_and_reuse_wheel(tmp_path, commands):
+    config = _config(tmp_path)
+    _source(config["source_path"])
+    maker = _build(config)
+
+    assert isinstance(maker, PipMaker)
+    wheel_cache = tmp_path / ".edpm" / "wheels"
+    assert os.listdir(wheel_cache) == ["edpmdemo-0.1-py3-none-any.whl"]
+    index = index_install_tree(config["install_path"])
+    assert len(index["python_dirs"]) == 1
+    assert os.path.isfile(os.path.join(config["install_path"], index["python_dirs"][0], "edpmdemo.py"))
+    assert any("pip wheel" in c for c in commands)
+
+    # Unchanged sources: no wheel build, install from the cache
+    commands.clear()
+    shutil.rmtree(config["install_path"])
+    maker = _build(_config(tmp_path))
+    assert [c.split()[3] for c in commands] == ["install"]
+    assert "--no-index" in commands[0]
+    assert os.path.isfile(os.path.join(config["install_path"], index["python_dirs"][0], "edpmdemo.py"))
+    assert maker.explain()["build"].startswith("skip, wheels cached")
+
+    # Changed sources are rebuilt
+    with open(os.path.join(config["source_path"], "edpmdemo.py"), "a") as f:
+        f.write("# changed\n")
+    assert not make_maker(_config(tmp_path)).is_cached()
+
+
+def test_requirement_without_fetch(tmp_path):
+    config = _config(tmp_path, name="pyhepmc", version="2.13.4")
+    del config["fetch"]
+    maker = make_maker(config)
+    maker.preconfigure()
+    assert maker.config["pip_requirement"] == "pyhepmc==2.13.4"
+    assert maker.explain()["build"] == "pip wheel pyhepmc==2.13.4"
+
+    config = _config(tmp_path, pip_requirement="pyhepmc>=2.13")
+    del config["fetch"]
+    assert make_maker(config).explain()["build"] == "pip wheel pyhepmc>=2.13"
+
+
+def test_gen_env(tmp_path):
+    install_path = tmp_path / "install"
+    os.makedirs(install_path / "bin")
+    os.makedirs(install_path / "lib" / "python3.11" / "site-packages")
+    dep_data = {
+        "install_path": str(install_path),
+        "built_with_config": {"make": "pip"},
+        INDEX_KEY: index_install_tree(str(install_path)),
+    }
+    actions = [(a.name, a.value) for a in RecipeManager().gen_env("tool", dep_data) if isinstance(a, EnvPrepend)]
+    assert actions == [
+        ("PATH", str(install_path / "bin")),
+        ("PYTHONPATH", str(install_path / "lib" / "python3.11" / "site-packages")),
+    ]
@@ -14,7 +14,7 @@ def test_planfile_init_empty():
 
     # default config
     cfg = pf.global_config()
-    assert cfg["build_threads"] == 4
+    assert cfg["build_threads"] == "auto"
     assert cfg["cxx_standard"] == 17
     assert pf.data["global"]["environment"] == []
 
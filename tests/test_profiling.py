@@ -0,0 +1,46 @@
+import os
+import time
+
+from click.testing import CliRunner
+
+from edpm.cli import edpm_cli
+from edpm.engine.profiling import PhaseTimer
+
+
+def test_phase_timer():
+    timer = PhaseTimer()
+    for _ in range(2):
+        with timer.phase("load plan"):
+            time.sleep(0.01)
+    timer.add("save lock", 0.5)
+
+    assert timer.counts == {"load plan": 2, "save lock": 1}
+    assert timer.totals["load plan"] >= 0.02
+    report = timer.report(total=1.0)
+    assert "load plan" in report and "x2" in report
+    assert "50.0%" in report
+    assert "(other)" in report
+
+
+def _plan(tmp_path):
+    plan_file = tmp_path / "plan.edpm.yaml"
+    plan_file.write_text("global: {}\npackages: []\n")
+    return ["--plan", str(plan_file), "--lock", str(tmp_path / "plan-lock.edpm.yaml")]
+
+
+def test_cli_profile_to_file(tmp_path):
+    profile_file = tmp_path / "out.pstats"
+    result = CliRunner().invoke(edpm_cli, [*_plan(tmp_path), f"--profile={profile_file}", "env", "bash"])
+    assert result.exit_code == 0, result.output
+    assert os.path.isfile(profile_file)
+    assert "Phases:" in result.stderr
+    assert "load plan" in result.stderr
+    assert "EDPM environment script" in result.stdout
+
+
+def test_cli_profile_default_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    result = CliRunner().invoke(edpm_cli, [*_plan(tmp_path), "--profile"])
+    assert result.exit_code == 0, result.output
+    assert os.path.isfile(tmp_path / "edpm.pstats")
+    assert "load lock" in result.stderr
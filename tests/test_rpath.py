@@ -0,0 +1,124 @@
+import os
+import platform
+
+import pytest
+
+from edpm.engine.lockfile import LockfileConfig
+from edpm.engine.makers import CmakeMaker
+from edpm.engine.planfile import PlanFile
+from edpm.engine.recipe_manager import RecipeManager
+from edpm.engine.generators.environment_generator import EnvironmentGenerator
+
+ORIGIN = "@loader_path" if platform.system() == "Darwin" else "$ORIGIN"
+
+
+@pytest.fixture
+def rpath_config(tmp_path):
+    top_dir = tmp_path / "top"
+    return {
+        "use_rpath": True,
+        "app_path": str(top_dir / "mylib"),
+        "source_path": str(top_dir / "mylib" / "src"),
+        "build_path": str(top_dir / "mylib" / "build"),
+        "install_path": str(top_dir / "mylib" / "mylib-install"),
+        "rpath_dirs": [
+            str(top_dir / "clhep" / "clhep-install" / "lib"),
+            "/opt/external/lib64",
+        ],
+    }
+
+
+def test_cmake_maker_rpath_entries(rpath_config):
+    """Dependencies under top_dir are $ORIGIN-relative, external ones stay absolute"""
+    maker = CmakeMaker(rpath_config)
+    maker.preconfigure()
+
+    entries = rpath_config["install_rpath"].split(";")
+    assert entries[0] == f"{ORIGIN}/../lib"
+    assert f"{ORIGIN}/../../../clhep/clhep-install/lib" in entries
+    assert "/opt/external/lib64" in entries
+
+    # RPATH settings go through the initial cache file
+    assert f"-C {rpath_config['rpath_cache_file']}" in rpath_config["configure_cmd"]
+
+
+def test_cmake_maker_rpath_entries_versioned(rpath_config, tmp_path):
+    """With versioned_installs app_path is top_dir/name/key, top_dir comes from edpm_dir"""
+    top_dir = tmp_path / "top"
+    app_path = top_dir / "mylib" / "v1-abc123"
+    rpath_config.update({
+        "versioned_installs": True,
+        "edpm_dir": str(top_dir / ".edpm"),
+        "app_path": str(app_path),
+        "install_path": str(app_path / "mylib-install"),
+        "rpath_dirs": [str(top_dir / "clhep" / "v2-def456" / "clhep-install" / "lib")],
+    })
+    maker = CmakeMaker(rpath_config)
+    maker.preconfigure()
+
+    entries = rpath_config["install_rpath"].split(";")
+    assert f"{ORIGIN}/../../../../clhep/v2-def456/clhep-install/lib" in entries
+
+
+def test_cmake_maker_writes_rpath_cache(rpath_config):
+    maker = CmakeMaker(rpath_config)
+    maker.preconfigure()
+    os.makedirs(rpath_config["build_path"])
+    maker._write_rpath_cache()
+
+    with open(rpath_config["rpath_cache_file"]) as f:
+        content = f.read()
+    assert f'set(CMAKE_INSTALL_RPATH "{ORIGIN}/../lib;' in content
+    assert "CMAKE_INSTALL_RPATH_USE_LINK_PATH ON" in content
+
+
+def test_cmake_maker_no_rpath_by_default(rpath_config):
+    rpath_config.pop("use_rpath")
+    maker = CmakeMaker(rpath_config)
+    maker.preconfigure()
+    assert "install_rpath" not in rpath_config
+    assert " -C " not in rpath_config["configure_cmd"]
+
+
+def test_env_skips_library_paths_for_rpath_packages(tmp_path):
+    install_path = tmp_path / "clhep-install"
+    install_path.mkdir()
+
+    plan = PlanFile({"global": {"config": {}}, "packages": ["clhep"]})
+    lock = LockfileConfig()
+    lock.data["packages"]["clhep"] = {
+        "install_path": str(install_path),
+        "built_with_config": {},
+    }
+    recipe_manager = RecipeManager()
+    recipe_manager.load_installers()
+    env_gen = EnvironmentGenerator(plan, lock, recipe_manager)
+
+    # Regular install has LD_LIBRARY_PATH
+    assert "LD_LIBRARY_PATH" in env_gen.build_env_text("bash")
+
+    # RPATH install leaves it out but keeps other variables
+    lock.data["packages"]["clhep"]["built_with_config"]["install_rpath"] = f"{ORIGIN}/../lib"
+    text = env_gen.build_env_text("bash")
+    assert "LD_LIBRARY_PATH" not in text
+    assert "CLHEP_LIB_DIR" in text
+
+
+def test_env_keeps_plan_library_paths_for_rpath_packages(tmp_path):
+    """Only recipe paths are dropped, LD_LIBRARY_PATH set in the plan 'environment:' stays"""
+    install_path = tmp_path / "clhep-install"
+    (install_path / "lib").mkdir(parents=True)
+
+    plan = PlanFile({"global": {"config": {}}, "packages": [
+        {"clhep": {"environment": [{"prepend": {"LD_LIBRARY_PATH": "/opt/plugins/lib"}}]}},
+    ]})
+    lock = LockfileConfig()
+    lock.data["packages"]["clhep"] = {
+        "install_path": str(install_path),
+        "built_with_config": {"install_rpath": f"{ORIGIN}/../lib"},
+    }
+    recipe_manager = RecipeManager()
+    recipe_manager.load_installers()
+    text = EnvironmentGenerator(plan, lock, recipe_manager).build_env_text("bash")
+    assert "export LD_LIBRARY_PATH=/opt/plugins/lib" in text
+    assert f"LD_LIBRARY_PATH={install_path}" not in text
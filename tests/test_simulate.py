@@ -0,0 +1,59 @@
+import os
+import time
+
+import pytest
+
+from edpm.engine.fetchers import make_fetcher, SimulatedFetcher
+from edpm.engine.makers import make_maker, SimulatedMaker
+from edpm.engine.simulate import simulate_work, write_files
+
+
+def _count_files(path):
+    return sum(len(files) for _, _, files in os.walk(path))
+
+
+def test_factories():
+    assert isinstance(make_fetcher({"fetch": "simulate"}), SimulatedFetcher)
+    assert isinstance(make_maker({"make": "simulate"}), SimulatedMaker)
+
+
+def test_simulated_steps_write_files(tmp_path):
+    config = {
+        "app_name": "mypkg",
+        "source_path": str(tmp_path / "src"),
+        "build_path": str(tmp_path / "build"),
+        "install_path": str(tmp_path / "install"),
+        "simulate_fetch_files": 150,
+        "simulate_build_files": 5,
+        "simulate_install_files": 4,
+        "simulate_file_size": 10,
+    }
+    make_fetcher({"fetch": "simulate", **config}).fetch()
+    maker = make_maker({"make": "simulate", **config})
+    maker.build()
+    maker.install()
+
+    assert _count_files(tmp_path / "src") == 150
+    assert _count_files(tmp_path / "build") == 5
+    assert os.path.isfile(tmp_path / "install" / "bin" / "mypkg")
+    assert os.path.isfile(tmp_path / "install" / "lib" / "libmypkg_1.so")
+    assert os.path.isfile(tmp_path / "install" / "include" / "mypkg" / "mypkg_1.h")
+    assert os.path.isfile(tmp_path / "install" / "lib" / "cmake" / "Mypkg" / "MypkgConfig.cmake")
+
+
+@pytest.mark.parametrize("mode", ["sleep", "cpu"])
+def test_simulate_work_time(mode):
+    start = time.perf_counter()
+    simulate_work(0.1, mode)
+    assert time.perf_counter() - start >= 0.1
+
+
+def test_simulate_work_bad_mode():
+    with pytest.raises(ValueError):
+        simulate_work(0.1, "gpu")
+
+
+def test_write_files_size(tmp_path):
+    write_files(str(tmp_path), 3, size=7, suffix=".o")
+    assert sorted(os.listdir(tmp_path / "d000")) == ["file00000.o", "file00001.o", "file00002.o"]
+    assert os.path.getsize(tmp_path / "d000" / "file00002.o") == 7
@@ -0,0 +1,85 @@
+import json
+import threading
+
+from click.testing import CliRunner
+
+from edpm.cli import edpm_cli
+from edpm.engine.tracing import Tracer, span, start_trace, stop_trace, merge_traces
+
+
+def _spans(data, category=None):
+    return [e for e in data["traceEvents"] if e["ph"] == "X" and (category is None or e["cat"] == category)]
+
+
+def test_span_without_trace_is_noop():
+    with span("nothing"):
+        pass
+
+
+def _in_thread():
+    with span("in thread"):
+        pass
+
+
+def test_tracer_tracks_per_thread():
+    tracer = start_trace("test")
+    try:
+        with span("outer", "package", version="1.0"):
+            with span("threaded"):
+                thread = threading.Thread(target=_in_thread, name="worker-1")
+                thread.start()
+                thread.join()
+    finally:
+        stop_trace()
+
+    data = tracer.to_json()
+    names = {e["name"]: e for e in _spans(data)}
+    assert set(names) == {"outer", "threaded", "in thread"}
+    assert names["outer"]["args"] == {"version": "1.0"}
+    assert names["in thread"]["tid"] != names["outer"]["tid"]
+    outer, threaded = names["outer"], names["threaded"]
+    assert outer["ts"] <= threaded["ts"] and threaded["ts"] + threaded["dur"] <= outer["ts"] + outer["dur"]
+    thread_names = {e["args"]["name"] for e in data["traceEvents"] if e["name"] == "thread_name"}
+    assert thread_names == {"main", "worker-1"}
+
+
+def test_merge_traces(tmp_path):
+    paths = []
+    for worker in ("node1", "node2"):
+        tracer = Tracer(f"edpm install {worker}", unique_id=worker)
+        with tracer.span("pkg", "package"):
+            pass
+        tracer.save(str(tmp_path / f"{worker}.json"))
+        paths.append(str(tmp_path / f"{worker}.json"))
+    merge_traces(paths, str(tmp_path / "all.json"))
+    data = json.loads((tmp_path / "all.json").read_text())
+    assert len({e["pid"] for e in _spans(data)}) == 2
+
+
+def test_install_trace(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    plan_file = tmp_path / "plan.edpm.yaml"
+    plan_file.write_text(
+        "global: {}\n"
+        "packages:\n"
+        "  - pkg1: {fetch: simulate, make: simulate, simulate_build_seconds: 0.01}\n"
+        "  - pkg2: {fetch: simulate, make: simulate}\n")
+    lock_file = tmp_path / "plan-lock.edpm.yaml"
+    args = ["--plan", str(plan_file), "--lock", str(lock_file), "--top-dir", str(tmp_path / "top")]
+    trace_file = tmp_path / "trace.json"
+
+    result = CliRunner().invoke(edpm_cli, [*args, "install", "--trace", str(trace_file)])
+    assert result.exit_code == 0, result.output
+
+    data = json.loads(trace_file.read_text())
+    packages = {e["name"]: e for e in _spans(data, "package")}
+    assert set(packages) == {"pkg1", "pkg2"}
+    stages = [e for e in _spans(data, "stage")]
+    assert {"fetch", "patch", "build", "install", "post_install"} <= {e["name"] for e in stages}
+    phases = {e["name"] for e in _spans(data, "phase")}
+    assert {"generate env", "save lock", "generate cmake"} <= phases
+
+    # Stages of pkg1 are inside the pkg1 span
+    pkg1 = packages["pkg1"]
+    build = next(e for e in stages if e["name"] == "build" and pkg1["ts"] <= e["ts"] <= pkg1["ts"] + pkg1["dur"])
+    assert build["dur"] >= 10000
@@ -0,0 +1,54 @@
+import os
+
+from edpm.engine.trash import trash_dir, move_to_trash, remove_dir, empty_trash, _worker
+
+
+def _make_tree(root, dirs=5, depth=3, files=3):
+    """Creates a tree with dirs**depth leaf directories"""
+    def fill(path, level):
+        os.makedirs(path, exist_ok=True)
+        for i in range(files):
+            with open(os.path.join(path, f"f{i}.txt"), "w") as f:
+                f.write("x")
+        if level < depth:
+            for i in range(dirs):
+                fill(os.path.join(path, f"d{i}"), level + 1)
+    fill(str(root), 1)
+    os.symlink("/nonexistent", os.path.join(str(root), "dangling"))
+
+
+def test_move_to_trash(tmp_path):
+    _make_tree(tmp_path / "pkg" / "build")
+    target = move_to_trash(str(tmp_path / "pkg" / "build"), str(tmp_path))
+    assert target.startswith(trash_dir(str(tmp_path)))
+    assert os.path.basename(target).startswith("build-")
+    assert not os.path.exists(tmp_path / "pkg" / "build")
+    assert os.path.isdir(target)
+
+
+def test_remove_dir_without_top_dir(tmp_path):
+    _make_tree(tmp_path / "build", depth=2)
+    assert remove_dir(str(tmp_path / "build"), "") is False
+    assert not os.path.exists(tmp_path / "build")
+
+
+def test_empty_trash_parallel(tmp_path):
+    for name in ("a", "b"):
+        _make_tree(tmp_path / name)
+        remove_dir(str(tmp_path / name), str(tmp_path))
+    trash = trash_dir(str(tmp_path))
+    assert len(os.listdir(trash)) == 2
+
+    empty_trash(trash, threads=4)
+    assert os.listdir(trash) == []
+
+
+def test_worker_picks_up_leftovers(tmp_path):
+    # A partially deleted tree left by an interrupted worker
+    trash = trash_dir(str(tmp_path))
+    leftover = os.path.join(trash, "build-12345678")
+    _make_tree(leftover)
+    for i in range(3):
+        os.remove(os.path.join(leftover, f"f{i}.txt"))
+    _worker(trash)
+    assert os.listdir(trash) == []
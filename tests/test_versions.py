@@ -0,0 +1,120 @@
+import os
+
+import click
+import pytest
+from click.testing import CliRunner
+from ruamel.yaml import YAML
+from unittest.mock import patch
+
+from edpm.cli.switch import switch_command
+from edpm.engine.api import EdpmApi
+from edpm.engine.recipe import Recipe
+from edpm.engine.versions import version_key, match_versions
+
+
+class DirRecipe(Recipe):
+    """Creates the install dir under app_path, like a real build would"""
+
+    def preconfigure(self):
+        self.config["install_path"] = os.path.join(self.config["app_path"], "install")
+
+    def run_full_pipeline(self):
+        os.makedirs(os.path.join(self.config["install_path"], "lib"), exist_ok=True)
+
+
+@click.group()
+@click.pass_context
+def cli(ctx):
+    pass
+
+
+cli.add_command(switch_command)
+
+
+def test_version_key():
+    key = version_key({"version": "v38", "cxx_standard": 17})
+    assert key.startswith("v38-")
+    assert key == version_key({"cxx_standard": 17, "version": "v38", "app_path": "/other/path"})
+    assert key != version_key({"version": "v38", "cxx_standard": 20})
+    assert version_key({}).startswith("default-")
+    assert version_key({"branch": "feature/x"}).startswith("feature_x-")
+
+
+def test_match_versions():
+    keys = ["v38-aaaaaaaa", "v38-bbbbbbbb", "v39-cccccccc"]
+    assert match_versions(keys, "v39") == ["v39-cccccccc"]
+    assert match_versions(keys, "v38") == ["v38-aaaaaaaa", "v38-bbbbbbbb"]
+    assert match_versions(keys, "v38-bbbbbbbb") == ["v38-bbbbbbbb"]
+    assert match_versions(keys, "v40") == []
+
+
+def _write_plan(path, version):
+    yaml = YAML()
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.dump({"global": {"config": {"versioned_installs": True}},
+                   "packages": [f"acts@{version}"]}, f)
+
+
+@pytest.fixture
+def api(tmp_path):
+    plan_path = str(tmp_path / "plan.edpm.yaml")
+    lock_path = str(tmp_path / "plan-lock.edpm.yaml")
+    _write_plan(plan_path, "v38")
+    api = EdpmApi(plan_file=plan_path, lock_file=lock_path)
+    api.load_all()
+    api.lock.top_dir = str(tmp_path)
+    return api
+
+
+def _install(api, version):
+    _write_plan(api.plan_file, version)
+    api.load_all()
+    with patch.object(api.recipe_manager, "create_recipe", side_effect=lambda name, cfg: DirRecipe(cfg)) as mock_create, \
+            patch("edpm.engine.generators.environment_generator.EnvironmentGenerator.save_environment_with_infile"):
+        api.install_dependency_chain(["acts"])
+    return mock_create
+
+
+def test_side_by_side_install_and_switch(tmp_path, api):
+    _install(api, "v38")
+    v38_path = api.lock.get_installed_package("acts")["install_path"]
+    assert v38_path.startswith(os.path.join(str(tmp_path), "acts", "v38-"))
+
+    _install(api, "v39")
+    v39_path = api.lock.get_installed_package("acts")["install_path"]
+    assert v39_path.startswith(os.path.join(str(tmp_path), "acts", "v39-"))
+    assert os.path.isdir(v38_path) and os.path.isdir(v39_path)
+    assert len(api.lock.get_versions("acts")) == 2
+
+    # Going back to v38 in the plan switches without a rebuild
+    mock_create = _install(api, "v38")
+    mock_create.assert_not_called()
+    assert api.lock.get_installed_package("acts")["install_path"] == v38_path
+
+    # 'edpm switch' repoints the lock entry and regenerates env files
+    with patch.object(api, "save_generator_scripts") as mock_save:
+        result = CliRunner().invoke(cli, ["switch", "acts@v39"], obj=api)
+    assert result.exit_code == 0, result.output
+    mock_save.assert_called_once()
+    assert api.lock.get_installed_package("acts")["install_path"] == v39_path
+    assert api.lock.get_active_version("acts").startswith("v39-")
+
+    # The lock file on disk has the switched entry
+    api.lock.load(api.lock_file)
+    assert api.lock.get_installed_package("acts")["install_path"] == v39_path
+    assert api.lock.get_versions("acts")[api.lock.get_active_version("acts")]["install_path"] == v39_path
+
+
+def test_switch_list_and_errors(api):
+    _install(api, "v38")
+
+    result = CliRunner().invoke(cli, ["switch", "acts"], obj=api)
+    assert result.exit_code == 0
+    assert "v38-" in result.output
+
+    result = CliRunner().invoke(cli, ["switch", "acts@v40"], obj=api)
+    assert result.exit_code != 0
+    assert "No version 'v40'" in result.output
+
+    result = CliRunner().invoke(cli, ["switch", "root@v6"], obj=api)
+    assert result.exit_code != 0
@@ -0,0 +1,134 @@
+import json
+import os
+
+import click
+import pytest
+from click.testing import CliRunner
+from ruamel.yaml import YAML
+
+from edpm.cli.view import view_group
+from edpm.engine.api import EdpmApi
+from edpm.engine.generators.cmake_generator import CmakeGenerator
+from edpm.engine.generators.steps import EnvPrepend, EnvSet, CmakePrefixPath
+from edpm.engine.lockfile import LockfileConfig
+from edpm.engine.planfile import PlanFile
+from edpm.engine.recipe_manager import RecipeManager
+from edpm.engine.view import View, rewrite_for_view
+
+
+@click.group()
+@click.pass_context
+def cli(ctx):
+    pass
+
+
+cli.add_command(view_group)
+
+
+def _make_install(path, files):
+    for rel in files:
+        full = os.path.join(str(path), rel)
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full, "w") as f:
+            f.write(rel)
+    return str(path)
+
+
+@pytest.fixture
+def installs(tmp_path):
+    return {
+        "liba": _make_install(tmp_path / "liba", ["bin/a", "lib/liba.so", "include/a.h", "share/doc/README"]),
+        "libb": _make_install(tmp_path / "libb", ["bin/b", "lib/libb.so", "share/doc/README"]),
+    }
+
+
+def test_view_links_and_conflicts(tmp_path, installs):
+    view = View(str(tmp_path / "view"))
+    linked, unlinked = view.update(installs)
+
+    assert linked == ["liba", "libb"]
+    assert unlinked == []
+    assert os.path.islink(tmp_path / "view" / "lib" / "liba.so")
+    assert os.readlink(tmp_path / "view" / "bin" / "b") == os.path.join(installs["libb"], "bin", "b")
+
+    # share/doc/README is provided by both. The first one wins
+    assert len(view.conflicts) == 1
+    assert view.conflicts[0].rel_path == os.path.join("share", "doc", "README")
+    assert view.conflicts[0].package == "libb"
+    assert view.conflicts[0].owner == "liba"
+
+
+def test_view_incremental_update(tmp_path, installs):
+    view = View(str(tmp_path / "view"))
+    view.update(installs)
+
+    # Reload from meta file, nothing changed => nothing relinked
+    view = View(str(tmp_path / "view"))
+    view.load()
+    assert view.update(installs) == ([], [])
+
+    # Only the changed package is relinked
+    installs["libb"] = _make_install(tmp_path / "libb-v2", ["bin/b2"])
+    view = View(str(tmp_path / "view"))
+    view.load()
+    assert view.update(installs) == (["libb"], ["libb"])
+    assert not os.path.lexists(tmp_path / "view" / "bin" / "b")
+    assert os.path.islink(tmp_path / "view" / "bin" / "b2")
+    assert os.path.islink(tmp_path / "view" / "bin" / "a")
+
+
+def test_view_remove(tmp_path, installs):
+    view = View(str(tmp_path / "view"))
+    view.update(installs)
+    view.remove()
+    assert not os.path.exists(tmp_path / "view")
+
+
+def test_rewrite_for_view_deduplicates():
+    seen = set()
+    actions = rewrite_for_view([EnvPrepend("PATH", "/top/a/bin"), EnvSet("A_DIR", "/top/a")],
+                               "/top/a", "/view", seen)
+    assert [(a.name, a.value) for a in actions] == [("PATH", "/view/bin"), ("A_DIR", "/top/a")]
+
+    actions = rewrite_for_view([EnvPrepend("PATH", "/top/b/bin"), CmakePrefixPath("/top/b")],
+                               "/top/b", "/view", seen)
+    assert [(a.name, a.value) for a in actions] == [("CMAKE_PREFIX_PATH", "/view")]
+
+
+def test_cli_view_create(tmp_path, installs):
+    plan_path = tmp_path / "plan.edpm.yaml"
+    lock_path = tmp_path / "plan-lock.edpm.yaml"
+    yaml = YAML()
+    with open(plan_path, "w") as f:
+        yaml.dump({"global": {"config": {}}, "packages": ["liba", "libb"]}, f)
+    with open(lock_path, "w") as f:
+        yaml.dump({"top_dir": str(tmp_path),
+                   "packages": {name: {"install_path": path} for name, path in installs.items()}}, f)
+
+    api = EdpmApi(plan_file=str(plan_path), lock_file=str(lock_path))
+    api.load_all()
+
+    result = CliRunner().invoke(cli, ["view", "create", str(tmp_path / "view")], obj=api)
+    assert result.exit_code == 0, result.output
+    assert api.lock.view_dir == str(tmp_path / "view")
+    assert os.path.islink(tmp_path / "view" / "bin" / "a")
+
+    result = CliRunner().invoke(cli, ["view", "rm"], obj=api)
+    assert result.exit_code == 0, result.output
+    assert api.lock.view_dir == ""
+    assert not os.path.exists(tmp_path / "view")
+
+
+def test_cmake_files_use_view(tmp_path):
+    """Toolchain and presets have the same view paths"""
+    lock = LockfileConfig()
+    lock.data["packages"]["fmt"] = {"install_path": _make_install(tmp_path / "fmt", ["lib/libfmt.a"])}
+    lock.view_dir = str(tmp_path / "view")
+    recipe_manager = RecipeManager()
+    recipe_manager.load_installers()
+    generator = CmakeGenerator(PlanFile({"global": {"config": {}}, "packages": ["fmt"]}), lock, recipe_manager)
+
+    presets = json.loads(generator.build_presets_json())
+    prefix_path = presets["configurePresets"][0]["cacheVariables"]["CMAKE_PREFIX_PATH"]["value"]
+    assert prefix_path == str(tmp_path / "view" / "lib" / "cmake" / "fmt")
+    assert f'"{prefix_path}"' in generator.build_toolchain_text()